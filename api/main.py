@@ -21,6 +21,7 @@ from sqlalchemy import create_engine, text
 import os, pandas as pd, subprocess, json
 from . import auth
 from .database import engine  
+from utils.grid import decode_grid_key, grid_key_range
 
 # -------------------------------------------------
 # FastAPI App Initialization
@@ -273,6 +274,31 @@ def get_cells():
     return pd.read_sql(query, engine).to_dict("records")
 
 
+@app.get("/api/grid_summary")
+def get_grid_summary(hours: int = 24, lat_min: float = None, lat_max: float = None,
+                     lon_min: float = None, lon_max: float = None):
+    """Aggregate recent KPIs per spatial grid square (int grid_key), optionally inside a bbox."""
+    where, params = ["grid_key IS NOT NULL", "ts >= now() - make_interval(hours => :hours)"], {"hours": hours}
+    if None not in (lat_min, lat_max, lon_min, lon_max):
+        params.update(grid_key_range(lat_min, lat_max, lon_min, lon_max))
+        where.append("grid_key BETWEEN :key_lo AND :key_hi "
+                     "AND grid_key % :cols BETWEEN :col_lo AND :col_hi")
+    query = text(f"""
+        SELECT grid_key,
+               COUNT(DISTINCT cell_id) AS cells,
+               AVG(rsrp_mean) AS rsrp_mean,
+               AVG(snr_mean) AS snr_mean,
+               AVG(dl_mbps_mean) AS dl_mbps_mean,
+               SUM(energy_kwh) AS energy_kwh
+        FROM cell_features
+        WHERE {" AND ".join(where)}
+        GROUP BY grid_key
+    """)
+    df = pd.read_sql(query, engine, params=params)
+    df["lat"], df["lon"] = decode_grid_key(df["grid_key"].to_numpy())
+    return df.to_dict("records")
+
+
 @app.get("/api/alerts")
 def get_alerts():
     """Categorize cells into severity levels."""
@@ -0,0 +1,86 @@
+"""
+=============================================================
+5G ENERGY OPTIMIZATION – BULK WRITE BENCHMARK
+-------------------------------------------------------------
+Compares `DataFrame.to_sql(method="multi")` with the COPY-based
+`utils.db.copy_dataframe` writer on synthetic `cell_clean_data`
+rows. Both write into a TEMP copy of `cell_clean_data` on the
+configured PostgreSQL database (POSTGRES_* env vars), so no
+pipeline table is touched.
+
+Usage:
+    $ python benchmarks/bench_bulk_write.py --sizes 10000 100000 1000000
+=============================================================
+"""
+
+import argparse
+import os
+import sys
+import time
+import numpy as np
+import pandas as pd
+from sqlalchemy import text
+
+# Jobs and utils are imported as top-level packages, like `python -m jobs.<job>`.
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.db import get_engine, copy_dataframe
+
+BENCH_TABLE = "bench_cell_clean_data"
+
+
+def make_rows(n: int, seed: int = 42) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    cells = rng.integers(1, 1000, n)
+    return pd.DataFrame({
+        "ts": pd.Timestamp("2020-01-01", tz="UTC") + pd.to_timedelta(np.arange(n) * 5, unit="s"),
+        "cell_id": cells.astype(str),
+        "latitude": 37.0 + rng.random(n) / 100,
+        "longitude": 27.0 + rng.random(n) / 100,
+        "speed": rng.uniform(0, 100, n),
+        "rsrp": rng.uniform(-110, -70, n),
+        "rsrq": rng.uniform(-15, -5, n),
+        "snr": rng.uniform(0, 25, n),
+        "cqi": rng.integers(1, 15, n),
+        "dl_mbps": np.abs(rng.normal(50, 20, n)),
+        "ul_mbps": np.abs(rng.normal(20, 5, n)),
+        "ping_avg_ms": rng.normal(40, 10, n),
+        "ping_loss_pct": rng.choice([0, 0, 0, 1], n),
+        "cellhex": [f"CELL{c:03d}" for c in cells],
+        "is_anomaly": False,
+    })
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    args = ap.parse_args()
+
+    eng = get_engine()
+    with eng.connect() as con:
+        con.execute(text(f"CREATE TEMP TABLE {BENCH_TABLE} (LIKE cell_clean_data INCLUDING DEFAULTS)"))
+        print(f"{'rows':>10} | {'to_sql multi':>22} | {'COPY':>22} | speedup")
+        for n in args.sizes:
+            df = make_rows(n)
+
+            t0 = time.perf_counter()
+            df.to_sql(BENCH_TABLE, con, if_exists="append", index=False, method="multi", chunksize=5000)
+            con.commit()
+            t_multi = time.perf_counter() - t0
+            con.execute(text(f"TRUNCATE {BENCH_TABLE}"))
+            con.commit()
+
+            t0 = time.perf_counter()
+            copy_dataframe(df, BENCH_TABLE, con)
+            con.commit()
+            t_copy = time.perf_counter() - t0
+            con.execute(text(f"TRUNCATE {BENCH_TABLE}"))
+            con.commit()
+
+            print(f"{n:>10,} | {t_multi:7.2f}s {n / t_multi:10,.0f} r/s | "
+                  f"{t_copy:7.2f}s {n / t_copy:10,.0f} r/s | {t_multi / t_copy:5.1f}x")
+    eng.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+"""
+=============================================================
+5G ENERGY OPTIMIZATION – FEATURE FRAME MEMORY BENCHMARK
+-------------------------------------------------------------
+Measures the memory of loading `cell_features` the way the
+training / inference jobs do (chunked read → concat → numeric
+model matrix → float32 array handed to the estimator), once with
+the raw dtypes pd.read_sql produces (str, float64, int64, bool)
+and the select_dtypes → fillna → astype chain, and once with the
+shared schema of `utils.schema` applied per chunk and X built by
+`utils.schema.model_matrix`.
+
+Rows are synthetic and shaped like `feature_job.FEATURE_COLS`
+as read from PostgreSQL; no database is needed. Each variant
+runs twice in fresh processes: once under tracemalloc for the
+traced peak, once untraced for the peak RSS (ru_maxrss), since
+tracemalloc's own bookkeeping would otherwise be counted in it.
+
+Usage:
+    $ python benchmarks/bench_feature_memory.py --rows 1000000 --cells 1000
+=============================================================
+"""
+
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tracemalloc
+import numpy as np
+import pandas as pd
+
+# Jobs and utils are imported as top-level packages, like `python -m jobs.<job>`.
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from jobs.feature_job import FEATURE_COLS
+from utils.schema import FEATURE_SCHEMA, apply_schema, concat_frames, model_matrix
+
+TEXT_VALUES = {
+    "operator": ["Turkcell", "Vodafone", "TurkTelekom"],
+    "net_mode": ["LTE", "NR", "LTE-A"],
+    "state": ["D", "I"],
+    "signal_class": ["Excellent", "Good", "Weak", "Very Weak"],
+    "trend_label": ["increase", "decrease", "stable"],
+}
+BOOL_COLS = ["is_weekend", "is_night", "is_peak_hour", "load_proxy"]
+INT_COLS = ["hour_of_day", "day_of_week", "day_type", "ping_loss_binary", "trend_class"]
+CHUNK_ROWS = 50_000
+
+
+def _decoded(values) -> np.ndarray:
+    """Object array of distinct str objects, as the driver decodes them per row."""
+    return np.array([v.encode().decode() for v in values], dtype=object)
+
+
+def make_chunk(start: int, n: int, cells: int, seed: int) -> pd.DataFrame:
+    """One read_sql-style chunk: object text, bool flags, float64 numerics."""
+    rng = np.random.default_rng(seed + start)
+    cell = rng.integers(0, cells, n)
+    cols = {}
+    for c in FEATURE_COLS:
+        if c == "ts":
+            cols[c] = pd.Timestamp("2020-01-01", tz="UTC") + pd.to_timedelta(start + np.arange(n), unit="s")
+        elif c == "cell_id":
+            cols[c] = _decoded(f"cell_{i:05d}" for i in cell)
+        elif c in ("cellhex", "nodehex", "lachex"):
+            cols[c] = _decoded(f"{c[:2].upper()}{i:05X}" for i in cell)
+        elif c == "grid_id":
+            cols[c] = _decoded(f"{37 + i % 50 / 1000:.3f}_{27 + i // 50 / 1000:.3f}" for i in cell)
+        elif c in TEXT_VALUES:
+            cols[c] = _decoded(np.array(TEXT_VALUES[c])[rng.integers(0, len(TEXT_VALUES[c]), n)])
+        elif c in BOOL_COLS:
+            cols[c] = rng.integers(0, 2, n).astype(bool)
+        elif c in INT_COLS:
+            cols[c] = rng.integers(0, 7, n)
+        else:
+            cols[c] = rng.normal(0, 50, n)
+    return pd.DataFrame(cols)
+
+
+def schema_chunks(chunks):
+    """utils.db.iter_query(..., schema=FEATURE_SCHEMA): typed chunks, released after use."""
+    for chunk in chunks:
+        chunk = apply_schema(chunk, FEATURE_SCHEMA)
+        yield chunk
+        del chunk
+
+
+def run_variant(variant: str, rows: int, cells: int, trace: bool) -> dict:
+    if trace:
+        tracemalloc.start()
+    chunks = (make_chunk(start, min(CHUNK_ROWS, rows - start), cells, seed=42)
+              for start in range(0, rows, CHUNK_ROWS))
+    if variant == "schema":       # utils.db.read_query(..., schema=FEATURE_SCHEMA)
+        df = concat_frames(schema_chunks(chunks))
+    else:                         # list of raw read_sql chunks + pd.concat
+        df = pd.concat(list(chunks), ignore_index=True)
+    frame_mb = df.memory_usage(deep=True).sum() / 1e6
+    if variant == "schema":       # utils.training / inference_job
+        X = model_matrix(df)
+    else:                         # select_dtypes → fillna → astype chain
+        X = df.select_dtypes(include=[np.number]).fillna(0).astype(np.float32)
+    x_cols = X.shape[1]
+    X_fit = X.to_numpy()          # what the estimator receives
+    del X_fit
+    if trace:
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        return {"frame_mb": frame_mb, "x_cols": x_cols, "traced_peak_mb": peak / 1e6}
+    return {"max_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024}
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--rows", type=int, default=1_000_000)
+    ap.add_argument("--cells", type=int, default=1_000)
+    ap.add_argument("--variant", choices=["raw", "schema"], help=argparse.SUPPRESS)
+    ap.add_argument("--trace", action="store_true", help=argparse.SUPPRESS)
+    args = ap.parse_args()
+
+    if args.variant:
+        print(json.dumps(run_variant(args.variant, args.rows, args.cells, args.trace)))
+        return
+
+    results = {}
+    for variant in ("raw", "schema"):
+        results[variant] = {}
+        for trace in (["--trace"], []):
+            out = subprocess.run([sys.executable, __file__, "--variant", variant, *trace,
+                                  "--rows", str(args.rows), "--cells", str(args.cells)],
+                                 capture_output=True, text=True, check=True)
+            results[variant].update(json.loads(out.stdout.strip().splitlines()[-1]))
+
+    print(f"rows={args.rows} cells={args.cells} columns={len(FEATURE_COLS)}")
+    print(f"{'':>8} | {'frame MB':>9} | {'traced peak MB':>14} | {'max RSS MB':>10} | X cols")
+    for v, r in results.items():
+        print(f"{v:>8} | {r['frame_mb']:9.1f} | {r['traced_peak_mb']:14.1f} | {r['max_rss_mb']:10.1f} | {r['x_cols']}")
+    raw, sch = results["raw"], results["schema"]
+    print(f"reduction: frame {1 - sch['frame_mb'] / raw['frame_mb']:.0%}, "
+          f"traced peak {1 - sch['traced_peak_mb'] / raw['traced_peak_mb']:.0%}, "
+          f"RSS {1 - sch['max_rss_mb'] / raw['max_rss_mb']:.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""
+=============================================================
+5G ENERGY OPTIMIZATION – ONLINE FEATURE ENGINE BENCHMARK
+-------------------------------------------------------------
+Feeds synthetic telemetry sample by sample through
+`utils.online_features.OnlineFeatureEngine`, reports the
+per-sample update latency, and checks every emitted column
+against the batch path (`feature_job.compute_features`) run
+on the same history.
+
+Forward-looking columns (dl_mbps_mean_fwd_*, trend_*) are
+excluded from the parity check: online they reflect the data
+available at arrival and are finalized by the batch rebuild.
+
+Usage:
+    $ python benchmarks/bench_online_features.py --cells 50 --samples 720
+=============================================================
+"""
+
+import argparse
+import os
+import sys
+import time
+import numpy as np
+import pandas as pd
+
+# Jobs and utils are imported as top-level packages, like `python -m jobs.<job>`.
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from jobs.feature_job import FEATURE_COLS, compute_features
+from utils.features import TARGET_HORIZONS, target_column
+from utils.online_features import OnlineFeatureEngine
+
+FORWARD_COLS = {"dl_mbps_mean_fwd_1h", "trend_delta_mbps", "trend_pct", "trend_label",
+                "trend_class", *(target_column(h) for h in TARGET_HORIZONS)}
+
+
+def make_samples(cells: int, samples: int, interval_sec: int = 15, seed: int = 42) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    n = cells * samples
+    ts = pd.Timestamp("2020-01-03 20:00", tz="UTC") + pd.to_timedelta(
+        np.tile(np.arange(samples) * interval_sec, cells) + rng.integers(0, 5, n), unit="s")
+    df = pd.DataFrame({
+        "ts": ts,
+        "cell_id": np.repeat([f"c{i:05d}" for i in range(cells)], samples),
+        "latitude": 37 + rng.random(n) / 100, "longitude": 27 + rng.random(n) / 100,
+        "speed": rng.uniform(0, 100, n), "operator": "Turkcell", "net_mode": "NR", "state": "D",
+        "rsrp": rng.uniform(-120, -70, n), "rsrq": rng.uniform(-20, -5, n),
+        "snr": rng.uniform(-5, 25, n), "rssi": rng.uniform(-90, -60, n),
+        "cqi": rng.integers(1, 15, n).astype(float),
+        "dl_mbps": np.abs(rng.normal(50, 20, n)), "ul_mbps": np.abs(rng.normal(20, 5, n)),
+        "ping_avg_ms": rng.normal(40, 10, n), "ping_min_ms": 30.0, "ping_max_ms": 50.0,
+        "ping_loss_pct": rng.choice([0.0, 0.0, 1.0], n),
+        "cellhex": "CE", "nodehex": "NO", "lachex": "LA",
+        "nrx_rsrp": np.nan, "nrx_rsrq": np.nan,
+    })
+    df.loc[rng.random(n) < 0.02, "dl_mbps"] = np.nan
+    return df.sort_values("ts", kind="mergesort").reset_index(drop=True)
+
+
+def max_diff(online: pd.DataFrame, batch: pd.DataFrame):
+    """Largest abs difference over numeric columns and mismatch count over the rest."""
+    cols = [c for c in FEATURE_COLS if c not in FORWARD_COLS and c not in ("ts", "cell_id")]
+    num, worst, mismatched = 0.0, None, {}
+    for c in cols:
+        a, b = online[c], batch[c]
+        if c in ("is_weekend", "is_night", "is_peak_hour", "load_proxy") or a.dtype == object:
+            bad = int((a.astype(str) != b.astype(str)).sum())
+            if bad: mismatched[c] = bad
+            continue
+        a = pd.to_numeric(a, errors="coerce").to_numpy(float)
+        b = pd.to_numeric(b, errors="coerce").to_numpy(float)
+        nan_bad = int((np.isnan(a) != np.isnan(b)).sum())
+        if nan_bad: mismatched[c] = nan_bad
+        d = np.nanmax(np.abs(a - b)) if np.isfinite(a).any() else 0.0
+        if d > num: num, worst = d, c
+    return num, worst, mismatched
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--cells", type=int, default=50)
+    ap.add_argument("--samples", type=int, default=720)
+    args = ap.parse_args()
+
+    df = make_samples(args.cells, args.samples)
+    records = df.to_dict("records")
+
+    engine = OnlineFeatureEngine()
+    lat = np.empty(len(records))
+    rows = []
+    for i, rec in enumerate(records):
+        t0 = time.perf_counter()
+        rows.append(engine.update(rec))
+        lat[i] = time.perf_counter() - t0
+    online = pd.DataFrame(rows, columns=FEATURE_COLS)
+
+    t0 = time.perf_counter()
+    batch = compute_features(df)
+    t_batch = time.perf_counter() - t0
+
+    key = ["cell_id", "ts"]
+    online = online.sort_values(key).reset_index(drop=True)
+    batch = batch.sort_values(key).reset_index(drop=True)
+    d, worst, mismatched = max_diff(online, batch)
+
+    print(f"samples={len(df):,} cells={args.cells} skipped={engine.skipped}")
+    print(f"online update: mean {lat.mean() * 1e6:.1f} µs | p50 {np.percentile(lat, 50) * 1e6:.1f} µs | "
+          f"p99 {np.percentile(lat, 99) * 1e6:.1f} µs | {len(df) / lat.sum():,.0f} samples/s")
+    print(f"batch compute_features: {t_batch:.2f}s ({len(df) / t_batch:,.0f} rows/s)")
+    print(f"parity vs batch: max abs diff {d:.3e} ({worst}) | mismatched non-numeric/NaN: {mismatched or 'none'}")
+
+
+if __name__ == "__main__":
+    main()
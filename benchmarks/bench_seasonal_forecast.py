@@ -0,0 +1,66 @@
+"""
+=============================================================
+5G ENERGY OPTIMIZATION – SEASONAL FORECAST TIER BENCHMARK
+-------------------------------------------------------------
+Fits the vectorized seasonal tier (utils/seasonal_forecast.py)
+to synthetic 15-minute throughput series for a whole fleet and
+reports, per model:
+
+    • fit + 672-step forecast time for all cells at once
+    • MAE on the held-out last week
+    • empirical coverage of the 95% interval
+
+The synthetic cells have a daily cycle (random level, amplitude
+and phase), a weekend uplift and Gaussian noise.
+
+Usage:
+    $ python benchmarks/bench_seasonal_forecast.py --cells 1000 5000
+=============================================================
+"""
+
+import argparse
+import os
+import sys
+import time
+import numpy as np
+
+# Jobs and utils are imported as top-level packages, like `python -m jobs.<job>`.
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils import seasonal_forecast as sf
+
+MODELS = {"seasonal_naive": sf.seasonal_naive, "seasonal_mean": sf.seasonal_mean,
+          "holt_winters": sf.holt_winters}
+
+
+def make_fleet(cells: int, days: int, seed: int = 42) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    t = np.arange(days * sf.SEASON)
+    level = rng.uniform(20, 80, (cells, 1))
+    amp = rng.uniform(5, 20, (cells, 1))
+    phase = rng.uniform(0, 2 * np.pi, (cells, 1))
+    weekend = 3.0 * (t % (7 * sf.SEASON) >= 5 * sf.SEASON)
+    return level + amp * np.sin(2 * np.pi * t / sf.SEASON + phase) + weekend + rng.normal(0, 2, (cells, len(t)))
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--cells", type=int, nargs="+", default=[1_000, 5_000])
+    ap.add_argument("--history-days", type=int, default=28)
+    args = ap.parse_args()
+
+    for cells in args.cells:
+        Y = make_fleet(cells, args.history_days + 7)
+        train, test = Y[:, :-sf.STEPS], Y[:, -sf.STEPS:]
+        print(f"cells={cells:,} history={args.history_days}d steps={sf.STEPS}")
+        for name, fn in MODELS.items():
+            t0 = time.perf_counter()
+            y_hat, lower, upper = fn(train, sf.SEASON, sf.STEPS)
+            el = time.perf_counter() - t0
+            cover = ((test >= lower) & (test <= upper)).mean()
+            print(f"  {name:<15}: {el:6.2f}s ({cells / el:>10,.0f} cells/s) | "
+                  f"MAE {np.abs(y_hat - test).mean():.2f} | 95% coverage {cover:.3f}")
+
+
+if __name__ == "__main__":
+    main()
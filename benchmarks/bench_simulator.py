@@ -0,0 +1,83 @@
+"""
+=============================================================
+5G ENERGY OPTIMIZATION – SIMULATOR GENERATOR BENCHMARK
+-------------------------------------------------------------
+Rows/sec of the synthetic telemetry generators in
+jobs/simulator_job.py, without any database writes:
+
+    • loop        → generate_sample() per cell + pd.DataFrame(list)
+                    (timed on at most --loop-cells cells per tick)
+    • vectorized  → generate_ticks() for one tick of all cells
+    • vectorized  → generate_ticks() for --ticks ticks in one call
+    • realistic   → TickGenerator(profile="realistic") for --ticks
+                    ticks (diurnal/weekly load, correlated radio,
+                    bursts/outages; see SIM_PROFILE)
+
+Also prints the column means of both generators, so a change
+in the sampled distributions shows up next to the speed-up.
+
+Usage:
+    $ python benchmarks/bench_simulator.py --cells 10000 100000
+=============================================================
+"""
+
+import argparse
+import os
+import sys
+import time
+import numpy as np
+import pandas as pd
+
+# Jobs and utils are imported as top-level packages, like `python -m jobs.<job>`.
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from jobs.simulator_job import generate_sample, generate_ticks, cell_labels, TickGenerator
+
+CHECK_COLS = ["rsrp", "snr", "cqi", "dl_mbps", "ul_mbps", "ping_avg_ms", "ping_loss_pct"]
+
+
+def timed(fn, repeat: int = 3):
+    best, out = float("inf"), None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        out = fn()
+        best = min(best, time.perf_counter() - t0)
+    return best, out
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--cells", type=int, nargs="+", default=[10_000, 100_000])
+    ap.add_argument("--ticks", type=int, default=12)
+    ap.add_argument("--loop-cells", type=int, default=10_000)
+    args = ap.parse_args()
+
+    ts = pd.Timestamp("2020-01-01", tz="UTC")
+    rng = np.random.default_rng(42)
+    for cells in args.cells:
+        loop_cells = min(cells, args.loop_cells)
+        t_loop, df_loop = timed(lambda: pd.DataFrame([generate_sample(c, ts) for c in range(1, loop_cells + 1)]), 1)
+
+        t_labels, labels = timed(lambda: cell_labels(range(1, cells + 1)), 1)
+        t_tick, df_tick = timed(lambda: generate_ticks(None, [ts], rng, labels))
+        stamps = pd.date_range(ts, periods=args.ticks, freq="5s")
+        t_many, df_many = timed(lambda: generate_ticks(None, stamps, rng, labels))
+
+        t_prof, gen = timed(lambda: TickGenerator(cells, seed=42, profile="realistic"), 1)
+        t_real, df_real = timed(lambda: gen.ticks(stamps, rng))
+
+        print(f"cells={cells:,}")
+        print(f"  loop        : {loop_cells / t_loop:>12,.0f} rows/s  ({loop_cells:,} rows in {t_loop:.2f}s)")
+        print(f"  vectorized  : {cells / t_tick:>12,.0f} rows/s  (1 tick, {t_tick * 1e3:.1f} ms; "
+              f"labels built once in {t_labels * 1e3:.0f} ms)")
+        print(f"  vectorized  : {len(df_many) / t_many:>12,.0f} rows/s  ({args.ticks} ticks, {t_many:.2f}s)")
+        print(f"  realistic   : {len(df_real) / t_real:>12,.0f} rows/s  ({args.ticks} ticks, {t_real:.2f}s; "
+              f"profiles built once in {t_prof * 1e3:.0f} ms)")
+        print(f"  speed-up    : {(cells / t_tick) / (loop_cells / t_loop):.0f}x per tick")
+        means = pd.DataFrame({"loop": df_loop[CHECK_COLS].astype(float).mean(),
+                              "vectorized": df_many[CHECK_COLS].astype(float).mean()})
+        print("  column means:", ", ".join(f"{c} {r.loop:.2f}/{r.vectorized:.2f}" for c, r in means.iterrows()))
+
+
+if __name__ == "__main__":
+    main()
@@ -10,40 +10,86 @@ into cleaned, engineered features for AI/ML-based traffic forecasting and energy
 Core Functions:
 ---------------
 1. **Excel Ingestion & Cleaning**
-   - Loads raw Excel files with network metrics.
-   - Cleans timestamps, numeric/text fields, and removes invalid rows.
+   - Streams raw Excel (openpyxl read-only), CSV or Parquet exports in row batches
+     (`INGEST_BATCH_ROWS`), so memory stays bounded regardless of file size.
+   - `EXCEL_PATH` may point to a single file or a directory; files already ingested
+     are skipped using a manifest of content hashes (`INGEST_MANIFEST`).
+   - Missing KPIs are filled with the per-file mean: a first pass writes `cell_raw` and
+     keeps running sums, a second pass writes `cell_clean_data`, so the result does not
+     depend on the batch size.
+   - Cleans timestamps (vectorized decode of the `YYYY.MM.DD_HH.MM.SS` export layout,
+     per-row fallback only for outliers), numeric/text fields, and removes invalid rows.
    - Writes results into `cell_raw` and `cell_clean_data` tables in PostgreSQL.
 
 2. **Feature Engineering Pipeline**
    - Aggregates signal KPIs (RSRP, SNR, CQI, throughput, etc.).
-   - Generates lag/rolling statistics (15m, 30m, 1h, 3h).
+   - Generates lag/rolling statistics (15m, 30m, 1h, 3h) in a single sorted pass from a
+     declarative spec (`utils.features.FEATURE_SPEC`, or the YAML file in `FEATURE_SPEC_FILE`)
+     compiled into a deduplicated plan. Spec outputs beyond the standard columns are
+     written too (added to `cell_features` as double precision on first use).
+     With `--prune` (`FEATURE_PRUNE`) only the columns in the feature lists of active
+     models (`model_registry` + `models/feature_list_*.pkl`) are computed.
    - Adds temporal features (hour, weekday, weekend, peak-hour flags).
-   - Computes network health classification (`Excellent`, `Good`, `Weak`, `Very Weak`).
+   - Assigns each row to a ~300 m grid square: `grid_key` (indexed int64, reversible via
+     `utils.grid.decode_grid_key`) plus its "<row>_<col>" text form in `grid_id`;
+     rows written in the old grid_id format are backfilled by a one-time migration.
+   - Computes network health classification (`Excellent`, `Good`, `Weak`, `Very Weak`)
+     with a vectorized classifier; thresholds configurable via `SIGNAL_*` env vars.
    - Detects load/traffic trends and calculates estimated energy consumption (kWh).
 
 3. **Database Output**
-   - Writes final processed data to `cell_features` table.
+   - Upserts final processed data into `cell_features` on (cell_id, ts): COPY into a
+     staging table, then `INSERT ... ON CONFLICT DO UPDATE` (`utils.db.upsert_dataframe`).
+   - Also appends each chunk to the Parquet feature store (`utils.feature_store`,
+     date/cell-bucket partitions) unless `FEATURE_STORE_WRITE=false`. Every cycle then
+     compacts partitions that collected `FEATURE_STORE_COMPACT_FILES` part files, and
+     a finished build records the ts range the store now mirrors (`coverage`).
    - Enables downstream ML training and energy policy simulation.
 
 Technical Notes:
 ----------------
 - Database: PostgreSQL (via SQLAlchemy)
-- Feature Horizon: Configurable via `HORIZON_MINUTES` (default: 15)
+- Feature Horizon: Configurable via `HORIZON_MINUTES` (default: 15) for `dl_mbps_mean_fwd_1h`;
+  `dl_mbps_mean_fwd_15m/60m/240m` are always written as well, so training can pick a
+  horizon without rebuilding features. Targets are resolved with one searchsorted per
+  cell block (`utils.features.forward_targets`): last known value at or before ts + h.
 - Rolling trend thresholds controlled by env vars `TREND_PCT_UP`, `TREND_PCT_DOWN`
-- Safe re-runnable script — deletes overlapping timestamps before insert
+- Safe re-runnable script — re-emitted rows are merged in place; unchanged rows are not rewritten
+- Schema changes for existing databases (new columns, de-duplication of (cell_id, ts)
+  before the unique upsert key is built, indexes) run once at start-up as named
+  migrations (`FEATURE_MIGRATIONS`, recorded in `schema_migrations`), not per cycle.
 - Can run once or loop continuously with `--loop` flag for periodic feature updates
+- Incremental by default: a persisted high-water mark (`job_watermark` table)
+  limits each cycle to rows newer than the last processed timestamp, plus a
+  warm-up lookback (`FEATURE_WARMUP_MINUTES`, default 3h; a longer rolling window
+  in the active plan raises it).
+  Rows within the longest forward horizon of the watermark (`TARGET_LOOKBACK_MINUTES`)
+  are recomputed, since their `*_fwd_*` targets were incomplete when first written.
+  Use `--full` to force a rebuild from the first timestamp.
+- Chunked processing (`--chunk-minutes` / `FEATURE_CHUNK_MINUTES`) carries a per-cell
+  tail buffer (the warm-up lookback, and at least the plan's deepest lag in rows)
+  between chunks, so the output does not depend on the chunk size; it only bounds
+  peak memory.
+- `--workers N` (`FEATURE_WORKERS`) splits cells by `hashtext(cell_id) % N` across a
+  process pool; each worker reads, computes and writes its own partition.
 """
 
 import os
+import json
 import time
+import hashlib
 import argparse
 import pandas as pd
 import numpy as np
 import re
 from datetime import timedelta
 from sqlalchemy import text
-from utils.db import get_engine
-from sqlalchemy import Boolean
+from utils.db import (get_engine, get_watermark, set_watermark, copy_dataframe, upsert_dataframe,
+                      apply_migrations)
+from utils.features import (compute_plan, compile_plan, forward_targets, target_column,
+                            FULL_PLAN, FeaturePlan, TARGET_HORIZONS)
+from utils import feature_store
+from utils.grid import GRID_SIZE_M, grid_key, grid_label, grid_step, grid_cols
 
 
 HORIZON_MINUTES = int(os.getenv("HORIZON_MINUTES", "15"))
@@ -52,13 +98,78 @@ TREND_PCT_DOWN  = float(os.getenv("TREND_PCT_DOWN", "-0.10"))
 TREND_ABS_MIN   = float(os.getenv("TREND_ABS_MIN",  "1.0"))
 EPS             = 1e-6
 
+FEATURE_WARMUP_MINUTES = int(os.getenv("FEATURE_WARMUP_MINUTES", "180"))
+FEATURE_CHUNK_MINUTES  = int(os.getenv("FEATURE_CHUNK_MINUTES", "1440"))
+FEATURE_WORKERS        = int(os.getenv("FEATURE_WORKERS", "1"))
+# Longest forward target: rows this close to the newest sample are still
+# incomplete, so chunks hold them back and incremental runs recompute them.
+TARGET_LOOKBACK_MINUTES = max(TARGET_HORIZONS + (HORIZON_MINUTES,))
+FEATURE_PRUNE          = os.getenv("FEATURE_PRUNE", "false").lower() == "true"
+WATERMARK_JOB          = "feature_job"
+FEATURE_STORE_WRITE    = os.getenv("FEATURE_STORE_WRITE", "true").lower() == "true"
+FEATURE_KEYS           = ["cell_id", "ts"]
+FEATURE_KEY_DDL        = ("CREATE UNIQUE INDEX IF NOT EXISTS uq_cell_features_cellid_ts "
+                          "ON cell_features (cell_id, ts)")
+FEATURE_COLUMN_DDL     = ("ALTER TABLE cell_features ADD COLUMN IF NOT EXISTS grid_key bigint, "
+                          + ", ".join(f"ADD COLUMN IF NOT EXISTS {target_column(h)} double precision"
+                                      for h in TARGET_HORIZONS))
+FEATURE_GRID_INDEX_DDL = ("CREATE INDEX IF NOT EXISTS idx_cell_features_grid_key "
+                          "ON cell_features (grid_key, ts)")
+# Earlier versions appended overlapping rows on every rerun, so deployed tables
+# can hold several rows per (cell_id, ts); keep the last written one (highest
+# ctid) before the unique index is built.
+FEATURE_DEDUP_SQL      = """
+    DELETE FROM cell_features
+    WHERE ctid IN (
+        SELECT ctid FROM (
+            SELECT ctid, row_number() OVER (PARTITION BY cell_id, ts ORDER BY ctid DESC) AS rn
+            FROM cell_features
+        ) d
+        WHERE d.rn > 1
+    )
+"""
+# Rows written before grid_key existed carry no key and the old rounded-coordinate
+# grid_id ("<lat/step>_<lon/step>"); recompute both in the "<row>_<col>" form of
+# utils.grid (float8 arithmetic, same as grid_key()) so the table has one format.
+FEATURE_GRID_BACKFILL_SQL = """
+    UPDATE cell_features f
+    SET grid_key = g.key, grid_id = g.label
+    FROM (
+        SELECT id, key, (key / :cols) || '_' || (key % :cols) AS label
+        FROM (
+            SELECT id, floor((latitude::float8 + 90) / CAST(:step AS float8))::bigint * :cols
+                       + floor((longitude::float8 + 180) / CAST(:step AS float8))::bigint AS key
+            FROM cell_features
+            WHERE latitude IS NOT NULL AND longitude IS NOT NULL
+        ) k
+    ) g
+    WHERE f.id = g.id
+      AND (f.grid_key, f.grid_id) IS DISTINCT FROM (g.key, g.label)
+"""
+FEATURE_GRID_CLEAR_SQL = """
+    UPDATE cell_features SET grid_key = NULL, grid_id = NULL
+    WHERE (latitude IS NULL OR longitude IS NULL)
+      AND (grid_key IS NOT NULL OR grid_id IS NOT NULL)
+"""
+GRID_PARAMS = {"step": grid_step(), "cols": grid_cols()}
+# Applied once per database (utils.db.apply_migrations) at job start-up.
+# The grid backfill is tied to GRID_SIZE_M: changing it needs a new migration name.
+FEATURE_MIGRATIONS = [
+    ("cell_features_keys_v1", [FEATURE_COLUMN_DDL, FEATURE_DEDUP_SQL, FEATURE_KEY_DDL,
+                               FEATURE_GRID_INDEX_DDL]),
+    (f"cell_features_grid_{GRID_SIZE_M}m_v1", [(FEATURE_GRID_BACKFILL_SQL, GRID_PARAMS),
+                                              (FEATURE_GRID_CLEAR_SQL, {})]),
+]
+
+INGEST_BATCH_ROWS = int(os.getenv("INGEST_BATCH_ROWS", "50000"))
+INGEST_MANIFEST   = os.getenv("INGEST_MANIFEST", "data/ingest_manifest.json")
+INGEST_EXTENSIONS = (".xlsx", ".xlsm", ".csv", ".parquet")
+
 pd.set_option('future.no_silent_downcasting', True)
 
-def grid_id(lat: pd.Series, lon: pd.Series, size_m=300) -> pd.Series:
-    lat_step = 0.003 if size_m == 300 else 0.005
-    lon_step = 0.003 if size_m == 300 else 0.005
-    return (np.round(lat / lat_step, 3).astype(str) + "_" +
-            np.round(lon / lon_step, 3).astype(str))
+def grid_id(lat: pd.Series, lon: pd.Series, size_m=GRID_SIZE_M) -> pd.Series:
+    """Text label of the grid square ("<row>_<col>"); see utils.grid.grid_key."""
+    return grid_label(grid_key(lat, lon, size_m), size_m)
 
 def fix_timestamp(val: str) -> str:
     if not isinstance(val, str):
@@ -68,43 +179,241 @@ def fix_timestamp(val: str) -> str:
     val = re.sub(r"(\d{2})\.(\d{2})\.(\d{2})", r"\1:\2:\3", val)
     return val
 
-def classify_signal_row(row):
+# Native export layout, e.g. "2023.05.14_13.45.07".
+TS_LAYOUT_RE = re.compile(r"^\d{4}\.\d{2}\.\d{2}_\d{2}\.\d{2}\.\d{2}$")
+
+def _parse_layout(raw: pd.Series) -> pd.Series:
+    """Decode fixed-width TS_LAYOUT strings digit-wise; anything else becomes NaT."""
+    arr = raw.to_numpy(dtype=object)
+    ok = ((raw.str.len() == 19) & raw.str.isascii()).to_numpy(dtype=bool, copy=True)
+    b = np.frombuffer(np.where(ok, arr, "0000.00.00_00.00.00").astype("S19").tobytes(),
+                      dtype=np.uint8).reshape(-1, 19).astype(np.int64)
+    sep = b[:, [4, 7, 10, 13, 16]]
+    d = b[:, [0, 1, 2, 3, 5, 6, 8, 9, 11, 12, 14, 15, 17, 18]] - ord("0")
+    ok &= (sep == np.array([ord("."), ord("."), ord("_"), ord("."), ord(".")])).all(axis=1)
+    ok &= ((d >= 0) & (d <= 9)).all(axis=1)
+    year  = d[:, 0] * 1000 + d[:, 1] * 100 + d[:, 2] * 10 + d[:, 3]
+    month = d[:, 4] * 10 + d[:, 5]
+    day   = d[:, 6] * 10 + d[:, 7]
+    hms   = (d[:, 8] * 10 + d[:, 9]) * 3600 + (d[:, 10] * 10 + d[:, 11]) * 60 + d[:, 12] * 10 + d[:, 13]
+    # seconds == 60 rolls over into the next minute, as pd.to_datetime does
+    ok &= (month >= 1) & (month <= 12) & (day >= 1) & (d[:, 8] * 10 + d[:, 9] <= 23) \
+          & (d[:, 10] * 10 + d[:, 11] <= 59) & (d[:, 12] * 10 + d[:, 13] <= 60)
+
+    first = ((year - 1970) * 12 + np.clip(month, 1, 12) - 1).astype("datetime64[M]").astype("datetime64[D]")
+    date = first + (day - 1)
+    ok &= date.astype("datetime64[M]") == first               # rejects e.g. Feb 30
+    secs = date.astype("datetime64[s]") + hms
+    secs[~ok] = np.datetime64("NaT")
+    return pd.Series(pd.DatetimeIndex(secs).as_unit("us").tz_localize("UTC"), index=raw.index)
+
+def parse_timestamps(s: pd.Series) -> pd.Series:
+    """Vectorized replacement for `.map(fix_timestamp)` + `pd.to_datetime`.
+
+    The layout is detected once from the first non-null value: if it is the
+    native export layout the whole column is parsed with an explicit format,
+    otherwise the fix_timestamp rewrite is applied with vectorized `.str`
+    operations. Only values the bulk parse could not read go through the
+    per-row fallback.
+    """
+    if pd.api.types.is_datetime64_any_dtype(s):
+        return pd.to_datetime(s, errors="coerce", utc=True)
+    raw = s.astype(str)
+    valid = s.notna() & ~raw.isin(["", "nan", "NaT", "None"])
+    if not valid.any():
+        return pd.Series(pd.NaT, index=s.index, dtype="datetime64[ns, UTC]")
+
+    if TS_LAYOUT_RE.match(raw[valid].iloc[0]):
+        out = _parse_layout(raw)
+    else:
+        fixed = (raw.str.replace("_", " ", regex=False)
+                    .str.replace(r"(\d{4})\.(\d{2})\.(\d{2})", r"\1-\2-\3", regex=True)
+                    .str.replace(r"(\d{2})\.(\d{2})\.(\d{2})", r"\1:\2:\3", regex=True))
+        out = pd.to_datetime(fixed, errors="coerce", utc=True)
+
+    outliers = valid & out.isna()
+    if outliers.any():
+        out[outliers] = pd.to_datetime(raw[outliers].map(fix_timestamp), errors="coerce",
+                                       utc=True, format="mixed")
+    return out
+
+SIGNAL_CLASSES = ["Very Weak", "Weak", "Good", "Excellent"]
+
+# Signal classification thresholds (dBm / dB); overridable via env vars.
+SIGNAL_THRESHOLDS = {
+    "rsrp_excellent": float(os.getenv("SIGNAL_RSRP_EXCELLENT", "-80")),
+    "rsrp_good":      float(os.getenv("SIGNAL_RSRP_GOOD",      "-95")),
+    "rsrp_weak":      float(os.getenv("SIGNAL_RSRP_WEAK",      "-110")),
+    "snr_good":       float(os.getenv("SIGNAL_SNR_GOOD",       "10")),   # fallback when RSRP is missing
+    "snr_weak":       float(os.getenv("SIGNAL_SNR_WEAK",       "0")),
+    "rsrq_up":        float(os.getenv("SIGNAL_RSRQ_UP",        "-10")),  # one class up
+    "snr_up":         float(os.getenv("SIGNAL_SNR_UP",         "10")),
+    "rsrq_down":      float(os.getenv("SIGNAL_RSRQ_DOWN",      "-15")),  # one class down
+    "snr_down":       float(os.getenv("SIGNAL_SNR_DOWN",       "0")),
+}
+
+def classify_signal_row(row, thresholds: dict = None):
+    t = thresholds or SIGNAL_THRESHOLDS
     rsrp = pd.to_numeric(row.get("rsrp_mean", np.nan), errors="coerce")
     rsrq = pd.to_numeric(row.get("rsrq_mean", np.nan), errors="coerce")
     snr  = pd.to_numeric(row.get("snr_mean",  np.nan), errors="coerce")
 
     def base_from_rsrp(v):
         if pd.isna(v): return "Unknown"
-        if v >= -80:   return "Excellent"
-        elif v >= -95: return "Good"
-        elif v >= -110:return "Weak"
-        else:          return "Very Weak"
+        if v >= t["rsrp_excellent"]: return "Excellent"
+        elif v >= t["rsrp_good"]:    return "Good"
+        elif v >= t["rsrp_weak"]:    return "Weak"
+        else:                        return "Very Weak"
 
     cls = base_from_rsrp(rsrp)
     if cls == "Unknown":
         if not pd.isna(snr):
-            if snr >= 10:   return "Good"
-            elif snr >= 0:  return "Weak"
-            else:           return "Very Weak"
+            if snr >= t["snr_good"]:   return "Good"
+            elif snr >= t["snr_weak"]: return "Weak"
+            else:                      return "Very Weak"
         return "Unknown"
 
-    order = ["Very Weak", "Weak", "Good", "Excellent"]
+    order = SIGNAL_CLASSES
     idx = order.index(cls)
 
-    if (not pd.isna(rsrq) and rsrq >= -10) or (not pd.isna(snr) and snr >= 10):
+    if (not pd.isna(rsrq) and rsrq >= t["rsrq_up"]) or (not pd.isna(snr) and snr >= t["snr_up"]):
         if idx < len(order) - 1: idx += 1
-    if (not pd.isna(rsrq) and rsrq <= -15) or (not pd.isna(snr) and snr <= 0):
+    if (not pd.isna(rsrq) and rsrq <= t["rsrq_down"]) or (not pd.isna(snr) and snr <= t["snr_down"]):
         if idx > 0: idx -= 1
 
     return order[idx]
 
+def _numeric_column(df: pd.DataFrame, col: str) -> np.ndarray:
+    if col not in df.columns:
+        return np.full(len(df), np.nan)
+    return pd.to_numeric(df[col], errors="coerce").to_numpy(dtype=float, na_value=np.nan)
+
+def classify_signal(df: pd.DataFrame, thresholds: dict = None) -> np.ndarray:
+    """Vectorized equivalent of `df.apply(classify_signal_row, axis=1)`."""
+    t = thresholds or SIGNAL_THRESHOLDS
+    rsrp = _numeric_column(df, "rsrp_mean")
+    rsrq = _numeric_column(df, "rsrq_mean")
+    snr  = _numeric_column(df, "snr_mean")
+
+    with np.errstate(invalid="ignore"):
+        # RSRP bins → 0=Very Weak, 1=Weak, 2=Good, 3=Excellent
+        idx = np.digitize(rsrp, [t["rsrp_weak"], t["rsrp_good"], t["rsrp_excellent"]])
+        up   = (rsrq >= t["rsrq_up"])   | (snr >= t["snr_up"])
+        down = (rsrq <= t["rsrq_down"]) | (snr <= t["snr_down"])
+        idx = np.minimum(idx + up, len(SIGNAL_CLASSES) - 1)
+        idx = np.maximum(idx - down, 0)
+
+        no_rsrp  = np.isnan(rsrp)
+        fallback = np.select([snr >= t["snr_good"], snr >= t["snr_weak"], snr < t["snr_weak"]],
+                             [2, 1, 0], default=len(SIGNAL_CLASSES))
+
+    labels = np.array(SIGNAL_CLASSES + ["Unknown"], dtype=object)
+    return labels[np.where(no_rsrp, fallback, idx)]
+
 def load_excel(path: str) -> pd.DataFrame:
     return pd.read_excel(path, engine="openpyxl")
 
+def iter_excel_batches(path: str, batch_rows: int = INGEST_BATCH_ROWS):
+    """Yield DataFrames of `batch_rows` rows from the first sheet (read-only mode)."""
+    from openpyxl import load_workbook
+    wb = load_workbook(path, read_only=True, data_only=True)
+    try:
+        rows = wb.worksheets[0].iter_rows(values_only=True)
+        header = next(rows, None)
+        if header is None:
+            return
+        header = [str(h).strip() if h is not None else f"col_{i}" for i, h in enumerate(header)]
+        batch = []
+        for r in rows:
+            batch.append(r)
+            if len(batch) >= batch_rows:
+                yield pd.DataFrame(batch, columns=header)
+                batch = []
+        if batch:
+            yield pd.DataFrame(batch, columns=header)
+    finally:
+        wb.close()
+
+def iter_source_batches(path: str, batch_rows: int = INGEST_BATCH_ROWS):
+    """Yield raw row batches from an Excel, CSV or Parquet export."""
+    ext = os.path.splitext(path)[1].lower()
+    if ext in (".xlsx", ".xlsm"):
+        yield from iter_excel_batches(path, batch_rows)
+    elif ext == ".csv":
+        yield from pd.read_csv(path, chunksize=batch_rows)
+    elif ext == ".parquet":
+        import pyarrow.parquet as pq
+        for rb in pq.ParquetFile(path).iter_batches(batch_size=batch_rows):
+            yield rb.to_pandas()
+    else:
+        raise ValueError(f"Unsupported ingestion file type: {path}")
+
+def file_sha256(path: str) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+def _load_manifest(path: str = INGEST_MANIFEST) -> dict:
+    if os.path.exists(path):
+        with open(path, "r") as f:
+            return json.load(f)
+    return {}
+
+def _save_manifest(manifest: dict, path: str = INGEST_MANIFEST):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp = f"{path}.tmp"
+    with open(tmp, "w") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp, path)
+
+def ingest_path(path: str, batch_rows: int = INGEST_BATCH_ROWS) -> int:
+    """Stream one export file (or every supported file in a directory) into
+    `cell_raw` / `cell_clean_data`, skipping files whose hash is in the manifest."""
+    if os.path.isdir(path):
+        files = sorted(os.path.join(path, f) for f in os.listdir(path)
+                       if f.lower().endswith(INGEST_EXTENSIONS))
+    else:
+        files = [path]
+
+    eng = get_engine()
+    manifest_path = INGEST_MANIFEST
+    manifest = _load_manifest(manifest_path)
+    total = 0
+    for fpath in files:
+        digest = file_sha256(fpath)
+        if digest in manifest:
+            print(f" Skipping {fpath}: already ingested ({manifest[digest]['rows']} rows).")
+            continue
+        # pass 1: raw rows + running sums for the per-file fill means
+        sums, counts = {}, {}
+        for batch in iter_source_batches(fpath, batch_rows):
+            write_cell_raw(batch, eng)
+            sub = _clean_frame(clean_and_prepare_excel(batch))
+            for c in CLEAN_FILL_COLS:
+                if c in sub.columns:
+                    sums[c] = sums.get(c, 0.0) + float(sub[c].sum())
+                    counts[c] = counts.get(c, 0) + int(sub[c].count())
+        fill_means = {c: sums[c] / counts[c] if counts[c] else np.nan for c in sums}
+
+        # pass 2: cleaned rows, filled with the means of the whole file
+        rows = 0
+        for batch in iter_source_batches(fpath, batch_rows):
+            clean = clean_and_prepare_excel(batch)
+            write_cell_clean(clean, eng, fill_means=fill_means)
+            rows += len(clean)
+            print(f"  {os.path.basename(fpath)}: +{len(clean)} cleaned rows (file total: {rows})")
+        manifest[digest] = {"path": fpath, "rows": rows,
+                            "ingested_at": pd.Timestamp.now(tz="UTC").isoformat()}
+        _save_manifest(manifest, manifest_path)
+        total += rows
+    eng.dispose()
+    return total
+
 def clean_and_prepare_excel(df: pd.DataFrame) -> pd.DataFrame:
     if "Timestamp" in df.columns:
-        df["Timestamp"] = df["Timestamp"].astype(str).map(fix_timestamp)
-        df["Timestamp"] = pd.to_datetime(df["Timestamp"], errors="coerce", utc=True)
+        df["Timestamp"] = parse_timestamps(df["Timestamp"])
 
     df = df.replace(["#REF!", "NULL", "-", ""], np.nan).infer_objects(copy=False)
 
@@ -124,7 +433,7 @@ def clean_and_prepare_excel(df: pd.DataFrame) -> pd.DataFrame:
     return df.dropna(subset=["Timestamp","CellID"])
 
 
-def write_cell_raw(df: pd.DataFrame):
+def write_cell_raw(df: pd.DataFrame, con=None):
     raw_cols = {
         "Timestamp":"raw_timestamp","Latitude":"raw_latitude","Longitude":"raw_longitude",
         "Speed":"raw_speed","Operatorname":"raw_operator","CellID":"raw_cellid",
@@ -138,9 +447,14 @@ def write_cell_raw(df: pd.DataFrame):
     sub = df[[c for c in raw_cols if c in df.columns]] \
             .rename(columns={k: raw_cols[k] for k in raw_cols if k in df.columns})
     if not sub.empty:
-        sub.to_sql("cell_raw", get_engine(), if_exists="append", index=False, method="multi", chunksize=5000)
+        copy_dataframe(sub, "cell_raw", con)
+
+CLEAN_FILL_COLS = ["rsrp","rsrq","snr","rssi","cqi","ping_avg_ms","ping_min_ms",
+                   "ping_max_ms","ping_stdev_ms","ping_loss_pct","dl_mbps","ul_mbps",
+                   "speed","nrx_rsrp","nrx_rsrq"]
 
-def write_cell_clean(df: pd.DataFrame):
+def _clean_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """Rename export columns to `cell_clean_data` names, coerce numerics, flag anomalies."""
     cols_map = {
         "Timestamp":"ts","CellID":"cell_id","Latitude":"latitude","Longitude":"longitude",
         "Speed":"speed","Operatorname":"operator","NetworkMode":"net_mode","State":"state",
@@ -166,216 +480,313 @@ def write_cell_clean(df: pd.DataFrame):
         sub.get("speed",pd.Series(dtype=float)).between(0,200)
     )
     sub["is_anomaly"] = (~conds).fillna(False).astype(bool)
+    return sub
 
-    for c in ["rsrp","rsrq","snr","rssi","cqi","ping_avg_ms","ping_min_ms",
-              "ping_max_ms","ping_stdev_ms","ping_loss_pct","dl_mbps","ul_mbps",
-              "speed","nrx_rsrp","nrx_rsrq"]:
+def write_cell_clean(df: pd.DataFrame, con=None, fill_means: dict = None):
+    """Write cleaned rows; gaps are filled with `fill_means` (default: this frame's means)."""
+    sub = _clean_frame(df)
+    for c in CLEAN_FILL_COLS:
         if c in sub.columns:
-            sub[c] = sub[c].fillna(sub[c].mean())
-
-    sub.to_sql("cell_clean_data", get_engine(),
-               if_exists="append", index=False, method="multi", chunksize=5000,
-               dtype={"is_anomaly": Boolean})
-
-
-def build_features_from_db(chunk_minutes: int = 1440):
-    import traceback
+            sub[c] = sub[c].fillna(sub[c].mean() if fill_means is None else fill_means.get(c, np.nan))
+
+    copy_dataframe(sub, "cell_clean_data", con)
+
+
+FEATURE_COLS = [
+    "ts","cell_id","latitude","longitude","operator","net_mode","state","speed",
+    "speed_mean","nrx_rsrp_mean","nrx_rsrq_mean","rssi_mean",
+    "grid_id","grid_key","grid_lat_bin","grid_lon_bin","hour_of_day","day_of_week",
+    "is_weekend","is_night","is_peak_hour","day_type",
+    "rsrp_mean","rsrq_mean","snr_mean","cqi_mean","ping_avg_mean","ping_loss_mean",
+    "dl_mbps_mean","ul_mbps_mean","rsrp_lag1","rsrp_lag3","rsrq_lag1","rsrq_lag3",
+    "snr_lag1","snr_lag3","ping_lag1","dl_lag1","rsrp_roll15m","rsrq_roll15m",
+    "snr_roll15m","ping_roll15m","dl_roll15m","ping_jitter_ms","ping_loss_binary",
+    "cellhex","nodehex","lachex","horizon_minutes","trend_label","latency_ms",
+    "signal_class","dl_mbps_mean_fwd_1h","load_proxy","trend_delta_mbps",
+    "trend_pct","trend_class","snr_30m_mean","snr_30m_std","snr_1h_mean","snr_1h_std","snr_3h_mean","snr_3h_std",
+    "dl_mbps_30m_mean","dl_mbps_30m_std","dl_mbps_30m_min","dl_mbps_30m_max",
+    "dl_mbps_1h_mean","dl_mbps_1h_std","dl_mbps_1h_min","dl_mbps_1h_max",
+    "dl_mbps_3h_mean","dl_mbps_3h_std","dl_mbps_3h_min","dl_mbps_3h_max",
+    "rsrp_30m_mean","rsrp_30m_std","rsrp_1h_mean","rsrp_1h_std","rsrp_3h_mean","rsrp_3h_std","energy_kwh", "baseline_energy",
+    *[target_column(h) for h in TARGET_HORIZONS],
+]
+
+
+def feature_columns(plan: FeaturePlan = None) -> list:
+    """FEATURE_COLS plus the plan's outputs that are not standard columns."""
+    plan = FULL_PLAN if plan is None else plan
+    return FEATURE_COLS + [c for c in plan.columns if c not in FEATURE_COLS]
+
+
+def feature_lookback(plan: FeaturePlan = None) -> pd.Timedelta:
+    """History a row's rolling windows need: the warm-up, or the plan's longest window."""
+    plan = FULL_PLAN if plan is None else plan
+    return max(pd.Timedelta(minutes=FEATURE_WARMUP_MINUTES), plan.max_window)
+
+
+def ensure_feature_columns(plan: FeaturePlan, con) -> None:
+    """Add the plan's non-standard outputs (spec-file features) to cell_features."""
+    extra = feature_columns(plan)[len(FEATURE_COLS):]
+    if extra:
+        con.execute(text("ALTER TABLE cell_features "
+                         + ", ".join(f'ADD COLUMN IF NOT EXISTS "{c}" double precision' for c in extra)))
+
+
+def compute_features(df: pd.DataFrame, plan: FeaturePlan = None) -> pd.DataFrame:
+    """Engineer the `cell_features` columns from `cell_clean_data` rows.
+
+    `plan` selects the lag / rolling columns to compute (default: all);
+    columns left out of it are written as NULL.
+    """
+    agg = df.copy()
+    agg["ts"] = pd.to_datetime(agg["ts"], utc=True)
+
+    agg["rsrp_mean"] = agg["rsrp"]
+    agg["rsrq_mean"] = agg["rsrq"]
+    agg["snr_mean"]  = agg["snr"]
+    agg["cqi_mean"]  = agg["cqi"]
+    agg["ping_avg_mean"]  = agg["ping_avg_ms"]
+    agg["ping_loss_mean"] = agg["ping_loss_pct"]
+    agg["dl_mbps_mean"]   = agg["dl_mbps"]
+    agg["ul_mbps_mean"]   = agg["ul_mbps"]
+    agg["speed_mean"]     = agg["speed"]
+    agg["nrx_rsrp_mean"]  = agg.get("nrx_rsrp", pd.Series(index=agg.index, dtype=float))
+    agg["nrx_rsrq_mean"]  = agg.get("nrx_rsrq", pd.Series(index=agg.index, dtype=float))
+    agg["rssi_mean"]      = agg["rssi"]
+
+    agg["ping_jitter_ms"]   = agg["ping_max_ms"] - agg["ping_min_ms"]
+    agg["latency_ms"]       = agg["ping_avg_ms"]
+    agg["ping_loss_binary"] = np.where(agg["ping_loss_pct"] > 0, 1, 0)
+
+    ts = pd.to_datetime(agg["ts"], utc=True)
+    agg["hour_of_day"]  = ts.dt.hour
+    agg["day_of_week"]  = ts.dt.dayofweek
+    agg["is_weekend"]   = agg["day_of_week"].isin([5,6])
+    agg["is_night"]     = agg["hour_of_day"].isin([0,1,2,3,4,5,23])
+    agg["is_peak_hour"] = agg["hour_of_day"].isin([8,9,10,18,19,20,21])
+    agg["day_type"]     = np.where(agg["day_of_week"] < 5, 0, 1)
+
+    agg["grid_key"]     = grid_key(agg["latitude"], agg["longitude"]).to_numpy()
+    agg["grid_id"]      = grid_label(agg["grid_key"]).to_numpy()
+    agg["grid_lat_bin"] = agg["latitude"].round(3)
+    agg["grid_lon_bin"] = agg["longitude"].round(3)
+
+
+    # lags + 15m/30m/1h/3h rolling stats in one sorted pass (utils.features)
+    agg = compute_plan(agg, plan)
+
+    agg["signal_class"] = classify_signal(agg)
+    agg["load_proxy"]   = True
+
+
+    # forward targets per cell block on the (cell_id, ts) order compute_plan returns
+    targets = forward_targets(agg, sorted(set(TARGET_HORIZONS) | {HORIZON_MINUTES}))
+    for h in TARGET_HORIZONS:
+        agg[target_column(h)] = targets[target_column(h)]
+    agg["dl_mbps_mean_fwd_1h"] = targets[target_column(HORIZON_MINUTES)]
+
+    agg["horizon_minutes"] = HORIZON_MINUTES
+    cur = pd.to_numeric(agg["dl_mbps_mean"], errors="coerce")
+    fut = pd.to_numeric(agg["dl_mbps_mean_fwd_1h"], errors="coerce")
+    agg["trend_delta_mbps"] = fut - cur
+    agg["trend_pct"] = (fut - cur) / cur.clip(lower=EPS)
+    agg["trend_label"] = np.where(agg["trend_pct"]>=TREND_PCT_UP,"Up",
+                          np.where(agg["trend_pct"]<=TREND_PCT_DOWN,"Down","Flat"))
+    agg["trend_class"] = agg["trend_label"].map({"Down":0,"Flat":1,"Up":2}).fillna(-1)
+    agg["energy_kwh"] = 0.05 + 0.002 * agg["dl_mbps_mean"]
+    agg["baseline_energy"] = agg["energy_kwh"] * 1.15
+
+    cols = feature_columns(plan)
+    for col in cols:
+        if col not in agg.columns: agg[col] = np.nan
+    agg = agg[cols]
+    return agg
+
+
+def _carry_tail(df: pd.DataFrame, emit_to: pd.Timestamp, plan: FeaturePlan = None) -> pd.DataFrame:
+    """Clean rows the next chunk still needs: everything not yet emitted plus,
+    per cell, the plan's longest rolling window (and at least its deepest lag
+    in rows) before it."""
+    plan = FULL_PLAN if plan is None else plan
+    keep = df["ts"] > emit_to - feature_lookback(plan)
+    lag_rows = df[~keep].groupby("cell_id").tail(plan.max_lag).index
+    return df[keep | df.index.isin(lag_rows)]
+
+
+PARTITION_SQL = "mod(abs(hashtext(cell_id)::bigint), :pn) = :pk"
+
+
+def _build_range(cur_start, hard_end, warmup_td, chunk_minutes: int,
+                 partition: tuple = None, track_watermark: bool = True,
+                 plan: FeaturePlan = None) -> int:
+    """Build and write features for [cur_start, hard_end]; `partition=(k, n)`
+    restricts the run to cells whose cell_id hash falls in bucket k of n."""
     eng = get_engine()
-    with eng.connect() as con:
-        row = con.execute(text("SELECT MIN(ts), MAX(ts), COUNT(*) FROM cell_clean_data")).fetchone()
-        min_ts, max_ts, total_cnt = row
-    if not min_ts or not max_ts or total_cnt == 0:
-        print("[SRC] cell_clean_data is empty. I'm exiting."); return
-
-    cur_start = pd.to_datetime(min_ts, utc=True)
-    hard_end  = pd.to_datetime(max_ts, utc=True)
-    chunk_td  = pd.Timedelta(minutes=chunk_minutes)
-    processed = 0
-
+    part_sql = f" AND {PARTITION_SQL}" if partition else ""
+    part_params = {"pk": partition[0], "pn": partition[1]} if partition else {}
+    tag = f"[P{partition[0]}/{partition[1]}] " if partition else ""
+
+    chunk_td   = pd.Timedelta(minutes=chunk_minutes)
+    horizon_td = pd.Timedelta(minutes=TARGET_LOOKBACK_MINUTES)
+    emit_from  = cur_start
+    carry      = None
+    processed  = 0
+
+    # Each chunk is computed together with the tail carried over from the
+    # previous one, so lags, rolling windows and the forward target never reset
+    # at a chunk boundary. Rows whose forward target still depends on samples
+    # beyond the chunk (ts > cur_end - longest horizon) are held back until the next one.
     while cur_start <= hard_end:
         cur_end = min(cur_start + chunk_td, hard_end)
         with eng.connect() as con:
-            df = pd.read_sql(text("""
+            df = pd.read_sql(text(f"""
                 SELECT DISTINCT ON (cell_id, ts) *
                 FROM cell_clean_data
-                WHERE ts >= :a AND ts <= :b
+                WHERE ts >= :a AND ts <= :b{part_sql}
                 ORDER BY cell_id, ts
-            """), con, params={"a": cur_start, "b": cur_end})
+            """), con, params={"a": cur_start - warmup_td, "b": cur_end, **part_params})
         cur_start = cur_end + pd.Timedelta(microseconds=1)
-        if df.empty: continue
+        warmup_td = pd.Timedelta(0)
 
+        frames = [f for f in (carry, df) if f is not None and not f.empty]
+        if not frames: continue
+        df = pd.concat(frames, ignore_index=True) if len(frames) > 1 else frames[0]
         df["ts"] = pd.to_datetime(df["ts"], utc=True)
-        agg = df.copy()
-
-       
-        agg["rsrp_mean"] = agg["rsrp"]
-        agg["rsrq_mean"] = agg["rsrq"]
-        agg["snr_mean"]  = agg["snr"]
-        agg["cqi_mean"]  = agg["cqi"]
-        agg["ping_avg_mean"]  = agg["ping_avg_ms"]
-        agg["ping_loss_mean"] = agg["ping_loss_pct"]
-        agg["dl_mbps_mean"]   = agg["dl_mbps"]
-        agg["ul_mbps_mean"]   = agg["ul_mbps"]
-        agg["speed_mean"]     = agg["speed"]
-        agg["nrx_rsrp_mean"]  = agg.get("nrx_rsrp", pd.Series(index=agg.index, dtype=float))
-        agg["nrx_rsrq_mean"]  = agg.get("nrx_rsrq", pd.Series(index=agg.index, dtype=float))
-        agg["rssi_mean"]      = agg["rssi"]
-
-        agg["ping_jitter_ms"]   = agg["ping_max_ms"] - agg["ping_min_ms"]
-        agg["latency_ms"]       = agg["ping_avg_ms"]
-        agg["ping_loss_binary"] = np.where(agg["ping_loss_pct"] > 0, 1, 0)
-
-        ts = pd.to_datetime(agg["ts"], utc=True)
-        agg["hour_of_day"]  = ts.dt.hour
-        agg["day_of_week"]  = ts.dt.dayofweek
-        agg["is_weekend"]   = agg["day_of_week"].isin([5,6])
-        agg["is_night"]     = agg["hour_of_day"].isin([0,1,2,3,4,5,23])
-        agg["is_peak_hour"] = agg["hour_of_day"].isin([8,9,10,18,19,20,21])
-        agg["day_type"]     = np.where(agg["day_of_week"] < 5, 0, 1)
-
-        agg["grid_id"]      = grid_id(agg["latitude"], agg["longitude"])
-        agg["grid_lat_bin"] = agg["latitude"].round(3)
-        agg["grid_lon_bin"] = agg["longitude"].round(3)
-
-
-        def _apply_lag_roll(g: pd.DataFrame) -> pd.DataFrame:
-            g = g.copy()
-            g["ts"] = pd.to_datetime(g["ts"], errors="coerce", utc=True)
-            g = g.sort_values("ts").set_index("ts")
-
-            g["rsrp_lag1"] = g["rsrp"].shift(1)
-            g["rsrp_lag3"] = g["rsrp"].shift(3)
-            g["rsrq_lag1"] = g["rsrq"].shift(1)
-            g["rsrq_lag3"] = g["rsrq"].shift(3)
-            g["snr_lag1"]  = g["snr"].shift(1)
-            g["snr_lag3"]  = g["snr"].shift(3)
-            g["ping_lag1"] = g["ping_avg_ms"].shift(1)
-            g["dl_lag1"]   = g["dl_mbps"].shift(1)
-
-            
-            g["rsrp_roll15m"] = g["rsrp"].rolling("15min").mean()
-            g["rsrq_roll15m"] = g["rsrq"].rolling("15min").mean()
-            g["snr_roll15m"]  = g["snr"].rolling("15min").mean()
-            g["ping_roll15m"] = g["ping_avg_ms"].rolling("15min").mean()
-            g["dl_roll15m"]   = g["dl_mbps"].rolling("15min").mean()
-
-            return g.reset_index()
-
-
-        def add_extra_rolling(g: pd.DataFrame) -> pd.DataFrame:
-            g = g.copy()
-            g["ts"] = pd.to_datetime(g["ts"], errors="coerce", utc=True)
-            g = g.sort_values("ts").set_index("ts")
-
-      
-            windows = {"30m": "30min", "1h": "1h", "3h": "3h"}
-            cols = ["dl_mbps", "rsrp", "snr"]
-
-            for col in cols:
-                if col not in g.columns:
-                    continue
-                for label, w in windows.items():
-                    g[f"{col}_{label}_mean"] = g[col].rolling(w, min_periods=1).mean()
-                    g[f"{col}_{label}_std"]  = g[col].rolling(w, min_periods=1).std()
-                    if col == "dl_mbps":  
-                        g[f"{col}_{label}_min"] = g[col].rolling(w, min_periods=1).min()
-                        g[f"{col}_{label}_max"] = g[col].rolling(w, min_periods=1).max()
-
-            return g.reset_index()
-
-        agg = agg.groupby("cell_id", group_keys=False).apply(_apply_lag_roll).reset_index(drop=True)
-
-        agg = agg.groupby("cell_id", group_keys=False).apply(add_extra_rolling).reset_index(drop=True)
-
-        agg["signal_class"] = agg.apply(classify_signal_row, axis=1)
-        agg["load_proxy"]   = True
-
-
-        future = agg[["cell_id","ts","dl_mbps_mean"]].copy()
-        future["ts"] -= pd.Timedelta(minutes=HORIZON_MINUTES)
-        future = future.rename(columns={"dl_mbps_mean":"dl_mbps_mean_fwd_1h"})
-        agg = pd.merge_asof(
-            agg.sort_values("ts"),
-            future.sort_values("ts"),
-            on="ts",
-            by="cell_id",
-            direction="backward",
-            tolerance=pd.Timedelta(minutes=240)  
-
-        )
-
-        agg["horizon_minutes"] = HORIZON_MINUTES
-        cur = pd.to_numeric(agg["dl_mbps_mean"], errors="coerce")
-        fut = pd.to_numeric(agg["dl_mbps_mean_fwd_1h"], errors="coerce")
-        agg["trend_delta_mbps"] = fut - cur
-        agg["trend_pct"] = (fut - cur) / cur.clip(lower=EPS)
-        agg["trend_label"] = np.where(agg["trend_pct"]>=TREND_PCT_UP,"Up",
-                              np.where(agg["trend_pct"]<=TREND_PCT_DOWN,"Down","Flat"))
-        agg["trend_class"] = agg["trend_label"].map({"Down":0,"Flat":1,"Up":2}).fillna(-1)
-        agg["energy_kwh"] = 0.05 + 0.002 * agg["dl_mbps_mean"]
-        agg["baseline_energy"] = agg["energy_kwh"] * 1.15
-        agg["dl_mbps_mean_fwd_1h"] = agg["dl_mbps_mean_fwd_1h"].fillna(method="ffill")
-        agg["dl_mbps_mean_fwd_1h"] = agg["dl_mbps_mean_fwd_1h"].fillna(agg["dl_mbps_mean"])
-
-        feature_cols = [
-            "ts","cell_id","latitude","longitude","operator","net_mode","state","speed",
-            "speed_mean","nrx_rsrp_mean","nrx_rsrq_mean","rssi_mean",
-            "grid_id","grid_lat_bin","grid_lon_bin","hour_of_day","day_of_week",
-            "is_weekend","is_night","is_peak_hour","day_type",
-            "rsrp_mean","rsrq_mean","snr_mean","cqi_mean","ping_avg_mean","ping_loss_mean",
-            "dl_mbps_mean","ul_mbps_mean","rsrp_lag1","rsrp_lag3","rsrq_lag1","rsrq_lag3",
-            "snr_lag1","snr_lag3","ping_lag1","dl_lag1","rsrp_roll15m","rsrq_roll15m",
-            "snr_roll15m","ping_roll15m","dl_roll15m","ping_jitter_ms","ping_loss_binary",
-            "cellhex","nodehex","lachex","horizon_minutes","trend_label","latency_ms",
-            "signal_class","dl_mbps_mean_fwd_1h","load_proxy","trend_delta_mbps",
-            "trend_pct","trend_class","snr_30m_mean","snr_30m_std","snr_1h_mean","snr_1h_std","snr_3h_mean","snr_3h_std",
-            "dl_mbps_30m_mean","dl_mbps_30m_std","dl_mbps_30m_min","dl_mbps_30m_max",
-            "dl_mbps_1h_mean","dl_mbps_1h_std","dl_mbps_1h_min","dl_mbps_1h_max",
-            "dl_mbps_3h_mean","dl_mbps_3h_std","dl_mbps_3h_min","dl_mbps_3h_max",
-            "rsrp_30m_mean","rsrp_30m_std","rsrp_1h_mean","rsrp_1h_std","rsrp_3h_mean","rsrp_3h_std","energy_kwh", "baseline_energy",
-
-
-        ]
-        for col in feature_cols:
-            if col not in agg.columns: agg[col] = np.nan
-        agg = agg[feature_cols]
-
-   
+        df = df.sort_values(["cell_id", "ts"], kind="mergesort").reset_index(drop=True)
+
+        emit_to = cur_end if cur_end >= hard_end else cur_end - horizon_td
+        carry = _carry_tail(df, emit_to, plan)
+        if emit_to < emit_from: continue
+
+        agg = compute_features(df, plan)
+        agg = agg[(agg["ts"] >= emit_from) & (agg["ts"] <= emit_to)]
+
         with eng.begin() as con:
-            con.execute(text("DELETE FROM cell_features WHERE ts BETWEEN :a AND :b"),
-                        {"a":cur_start,"b":cur_end})
-            agg.to_sql("cell_features", con, if_exists="append", index=False,
-                       method="multi", chunksize=5000,
-                       dtype={"is_weekend":Boolean,"is_night":Boolean,
-                              "is_peak_hour":Boolean,"load_proxy":Boolean})
+            changed = upsert_dataframe(agg, "cell_features", FEATURE_KEYS, con)
+            if track_watermark:
+                set_watermark(con, WATERMARK_JOB, emit_to)
+        if FEATURE_STORE_WRITE:
+            feature_store.write_features(agg)
+        emit_from = emit_to + pd.Timedelta(microseconds=1)
         processed += len(agg)
-        print(f" CHUNK ok: +{len(agg)} rows (acc: {processed})")
+        print(f" {tag}CHUNK ok: {len(agg)} rows, {changed} inserted/changed "
+              f"(acc: {processed}, carry: {len(carry)})")
+
+    eng.dispose()
+    return processed
+
+
+def _build_partition(args) -> int:
+    return _build_range(*args)
+
+
+def feature_plan(prune: bool = False) -> FeaturePlan:
+    """Full lag/rolling plan, or only what the active models' feature lists use."""
+    if not prune:
+        return FULL_PLAN
+    from utils.models import active_feature_columns
+    required = active_feature_columns()
+    if required is None:
+        print("[PLAN] Active model feature lists unavailable; computing all features.")
+        return FULL_PLAN
+    plan = compile_plan(required=required)
+    print(f"[PLAN] {len(plan.columns)}/{len(FULL_PLAN.columns)} lag/rolling columns "
+          f"required by active models.")
+    return plan
+
+
+def build_features_from_db(chunk_minutes: int = FEATURE_CHUNK_MINUTES, incremental: bool = True,
+                           workers: int = 1, prune: bool = False):
+    eng = get_engine()
+    with eng.begin() as con:
+        watermark = get_watermark(con, WATERMARK_JOB) if incremental else None
+        if watermark is None:
+            row = con.execute(text("SELECT MIN(ts), MAX(ts), COUNT(*) FROM cell_clean_data")).fetchone()
+        else:
+            row = con.execute(text("SELECT MIN(ts), MAX(ts), COUNT(*) FROM cell_clean_data WHERE ts > :w"),
+                              {"w": watermark}).fetchone()
+        min_ts, max_ts, total_cnt = row
+    if not min_ts or not max_ts or total_cnt == 0:
+        if watermark is None:
+            print("[SRC] cell_clean_data is empty. I'm exiting.")
+        else:
+            print(f"[SRC] No new rows since watermark {watermark}. Nothing to do.")
+        return
+
+    if watermark is None:
+        cur_start = pd.to_datetime(min_ts, utc=True)
+        warmup_td = pd.Timedelta(0)
+    else:
+        # Rows within TARGET_LOOKBACK_MINUTES of the watermark get new forward
+        # targets once newer samples exist, so they are recomputed too; rolling
+        # windows read an extra warm-up span but only rows >= cur_start are written.
+        cur_start = pd.to_datetime(watermark, utc=True) - pd.Timedelta(minutes=TARGET_LOOKBACK_MINUTES)
+        print(f"[SRC] Incremental run from watermark {watermark} ({total_cnt} new rows).")
+    hard_end = pd.to_datetime(max_ts, utc=True)
+
+    plan = feature_plan(prune)
+    if watermark is not None:
+        warmup_td = feature_lookback(plan)
+    with eng.begin() as con:
+        ensure_feature_columns(plan, con)
+    if workers <= 1:
+        processed = _build_range(cur_start, hard_end, warmup_td, chunk_minutes, plan=plan)
+    else:
+        # Cells are independent, so hash-partitioned workers need no overlap;
+        # the shared watermark is only advanced once every partition succeeded.
+        import multiprocessing as mp
+        tasks = [(cur_start, hard_end, warmup_td, chunk_minutes, (k, workers), False, plan)
+                 for k in range(workers)]
+        with mp.get_context("spawn").Pool(processes=workers) as pool:
+            processed = sum(pool.map(_build_partition, tasks))
+        with eng.begin() as con:
+            set_watermark(con, WATERMARK_JOB, hard_end)
+    eng.dispose()
+    if FEATURE_STORE_WRITE:
+        feature_store.mark_coverage(cur_start, hard_end, reset=watermark is None)
 
     print(f" DONE. Total features written: {processed}")
 
 
-def main(loop: bool):
+def main(loop: bool = False, full: bool = False, chunk_minutes: int = FEATURE_CHUNK_MINUTES,
+         workers: int = FEATURE_WORKERS, prune: bool = FEATURE_PRUNE):
     path = os.getenv("EXCEL_PATH")
     if path and os.path.exists(path):
         try:
-            raw_df = load_excel(path)
-            write_cell_raw(raw_df)
-            df = clean_and_prepare_excel(raw_df)
-            write_cell_clean(df)
-            print(f" Loaded {len(df)} cleaned rows into DB.")
+            n = ingest_path(path)
+            print(f" Loaded {n} cleaned rows into DB.")
         except Exception as e:
             print(f" Excel load skipped: {e}")
 
+    apply_migrations(FEATURE_MIGRATIONS)
+    incremental = not full
     while True:
         try:
-            build_features_from_db()
+            build_features_from_db(chunk_minutes=chunk_minutes, incremental=incremental,
+                                   workers=workers, prune=prune)
         except Exception as e:
             print(f" Feature build failed: {e}")
+        if FEATURE_STORE_WRITE:
+            try:
+                n = feature_store.compact()
+                if n: print(f" Compacted {n} feature store partitions.")
+            except Exception as e:
+                print(f" Feature store compaction failed: {e}")
         if not loop: break
+        incremental = True
         time.sleep(60)
 
 if __name__ == "__main__":
     ap = argparse.ArgumentParser()
     ap.add_argument("--loop", action="store_true")
+    ap.add_argument("--full", action="store_true",
+                    help="ignore the watermark and rebuild features from the first timestamp")
+    ap.add_argument("--chunk-minutes", type=int, default=FEATURE_CHUNK_MINUTES,
+                    help="source window per chunk; only affects peak memory, not the output")
+    ap.add_argument("--workers", type=int, default=FEATURE_WORKERS,
+                    help="process count; cells are split across workers by cell_id hash")
+    ap.add_argument("--prune", action="store_true", default=FEATURE_PRUNE,
+                    help="compute only lag/rolling columns used by active models (others stay NULL)")
     args = ap.parse_args()
-    main(loop=args.loop)
+    main(loop=args.loop, full=args.full, chunk_minutes=args.chunk_minutes, workers=args.workers,
+         prune=args.prune)
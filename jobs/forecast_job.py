@@ -14,18 +14,43 @@ Core Functions:
    - Applies **Prophet**, **ARIMA**, and **SARIMA** models to predict
      downlink throughput (`dl_mbps_mean`) for each cell.
    - Generates confidence intervals and handles missing or low-variance data.
+   - `--seasonal`: vectorized tier (utils/seasonal_forecast.py) fitting
+     seasonal-naive, seasonal-mean and additive Holt-Winters to all cells at
+     once on a (cells × time) matrix; each has its own `model_name`
+     (seasonal_naive / seasonal_mean / holt_winters) and a refresh replaces
+     that tier's previous rows. SEASONAL_HISTORY_DAYS (default 28) of history.
 
 2. **Parallel Processing**
-   - Utilizes Python’s `multiprocessing` for batch-based parallel forecasting.
-   - Adjustable process count and batch size for efficient CPU utilization.
+   - One long-lived `multiprocessing` pool; cells are handed out one at a
+     time, so idle workers pick up the next cell immediately.
+   - Workers are recycled every FORECAST_MAX_TASKS_PER_CHILD cells (Prophet
+     leaks memory) and each cell is bounded by FORECAST_CELL_TIMEOUT_SEC.
+   - Reports cells/sec and per-status counts at the end of the run.
+   - The parent fetches every series in one streamed query into shared memory
+     (contiguous ts / value arrays + per-cell offsets); workers attach once and
+     read slices without copying or opening their own read connections.
 
 3. **Database Integration**
    - Fetches cell data from the `cell_features` table.
    - Saves all forecast results (including model type and horizon) into
      `cell_forecast_ts` table.
-   - Skips already processed cells to prevent duplicate entries.
-
-4. **Performance Optimization**
+   - `cell_forecast_state` keeps, per (cell, model), the last training ts and a
+     fingerprint (points, mean, std) of the series; a run only re-forecasts
+     cells that are new, gained FORECAST_MIN_NEW_POINTS (default 96) points,
+     or whose new points (at least FORECAST_DRIFT_MIN_POINTS, default 4) have a
+     mean more than FORECAST_DRIFT_SIGMA (default 3.0) standard errors away
+     from the training mean.
+     A refresh replaces the cell's previous rows of that model. Failed fits and
+     models cut off by the per-cell timeout are recorded as well (status
+     "failed" / "timeout"), so they wait for new data like any other model.
+
+4. **Warm Start (ARIMA / SARIMA)**
+   - Fitted params and the final state-space state are stored per (cell, model)
+     in a compact artifact store (utils/forecast_store.py). Reruns filter only
+     the new points from the stored state, or re-estimate from the stored
+     `start_params` once FORECAST_REFIT_DAYS (default 7) of data has passed.
+
+5. **Performance Optimization**
    - Limits computation threads (`OMP_NUM_THREADS`, `MKL_NUM_THREADS`, etc.).
    - Ignores unnecessary warnings to streamline batch execution.
 
@@ -34,23 +59,31 @@ Technical Notes:
 - Models: Prophet, ARIMA, SARIMAX (statsmodels)
 - Forecast Interval: 15 minutes (configurable)
 - Horizon: 1 week (672 steps)
-- Safe re-run: Skips cells already forecasted
-- Batch control via `batch_size` and CPU scaling via `process_count`
+- Safe re-run: Skips cells whose forecasts are up to date (cell_forecast_state)
+- Configuration: FORECAST_WORKERS (default min(4, cpu/2)),
+  FORECAST_MAX_TASKS_PER_CHILD (default 20), FORECAST_CELL_TIMEOUT_SEC
+  (default 900, 0 = off)
 """
 
 
 import os
 import time
+import signal
+import argparse
 import warnings
 import pandas as pd
 import numpy as np
 import multiprocessing as mp
 from sqlalchemy import text
-from utils.db import get_engine
+from multiprocessing import shared_memory
+from utils.db import get_engine, copy_dataframe, iter_query
+from utils import seasonal_forecast as sf
 from prophet import Prophet
 from statsmodels.tsa.arima.model import ARIMA
 from statsmodels.tsa.statespace.sarimax import SARIMAX
+from statsmodels.tsa.statespace.kalman_filter import MEMORY_CONSERVE, MEMORY_NO_FORECAST_COV
 from statsmodels.tools.sm_exceptions import ConvergenceWarning
+from utils.forecast_store import load_artifact, save_artifact
 
 # === Performans sınırlamaları ===
 os.environ["OMP_NUM_THREADS"] = "1"
@@ -64,9 +97,108 @@ warnings.filterwarnings("ignore", category=FutureWarning)
 warnings.filterwarnings("ignore", category=UserWarning)
 warnings.filterwarnings("ignore", category=ConvergenceWarning)
 
+FORECAST_WORKERS = int(os.getenv("FORECAST_WORKERS", str(min(4, max(1, mp.cpu_count() // 2)))))
+FORECAST_MAX_TASKS_PER_CHILD = int(os.getenv("FORECAST_MAX_TASKS_PER_CHILD", "20"))   # recycle workers (Prophet/Stan leaks)
+FORECAST_CELL_TIMEOUT_SEC = int(os.getenv("FORECAST_CELL_TIMEOUT_SEC", "900"))        # 0 = no per-cell limit
+SEASONAL_HISTORY_DAYS = int(os.getenv("SEASONAL_HISTORY_DAYS", "28"))
+FORECAST_MIN_NEW_POINTS = int(os.getenv("FORECAST_MIN_NEW_POINTS", "96"))   # one day of 15-min points
+FORECAST_DRIFT_SIGMA = float(os.getenv("FORECAST_DRIFT_SIGMA", "3.0"))        # standard errors of the new-point mean
+FORECAST_DRIFT_MIN_POINTS = int(os.getenv("FORECAST_DRIFT_MIN_POINTS", "4"))   # one hour of 15-min points
+FORECAST_REFIT_DAYS = float(os.getenv("FORECAST_REFIT_DAYS", "7"))           # re-estimate params at least this often
+FORECAST_MEMORY = MEMORY_CONSERVE & ~MEMORY_NO_FORECAST_COV                   # keep only what forecasts/intervals need
+
+# Models fitted one cell at a time by the pool (the seasonal tier is refreshed separately).
+PER_CELL_MODELS = ("prophet", "arima", "sarima")
+
+# One row per (cell, model): what the current forecast was trained on.
+FORECAST_STATE_DDL = """
+    CREATE TABLE IF NOT EXISTS cell_forecast_state (
+        cell_id       TEXT NOT NULL,
+        model_name    TEXT NOT NULL,
+        last_train_ts TIMESTAMPTZ NOT NULL,
+        n_points      BIGINT,
+        mean_dl       DOUBLE PRECISION,
+        std_dl        DOUBLE PRECISION,
+        status        TEXT,
+        updated_at    TIMESTAMPTZ DEFAULT now(),
+        PRIMARY KEY (cell_id, model_name)
+    )
+"""
+FORECAST_INDEX_DDL = ("CREATE INDEX IF NOT EXISTS idx_cell_forecast_ts_cell_model "
+                      "ON cell_forecast_ts (cell_id, model_name)")
+
+STATE_UPSERT_SQL = """
+    INSERT INTO cell_forecast_state (cell_id, model_name, last_train_ts, n_points, mean_dl, std_dl, status, updated_at)
+    VALUES (:cell_id, :model_name, :last_train_ts, :n_points, :mean_dl, :std_dl, :status, now())
+    ON CONFLICT (cell_id, model_name) DO UPDATE SET
+        last_train_ts = EXCLUDED.last_train_ts, n_points = EXCLUDED.n_points,
+        mean_dl = EXCLUDED.mean_dl, std_dl = EXCLUDED.std_dl,
+        status = EXCLUDED.status, updated_at = now()
+"""
+
+# Per cell: points newer than the oldest state of `models` and their mean.
+# Cell ids come from a skip scan of the (cell_id, ts) index and the new points
+# from an index range scan per cell (ts > last_train_ts), so the cost follows
+# the number of cells and new rows, not the size of cell_features. Cells
+# missing a state row are reported without reading their points.
+STALE_SQL = """
+    WITH RECURSIVE cells AS (
+        (SELECT cell_id FROM cell_features ORDER BY cell_id LIMIT 1)
+        UNION ALL
+        SELECT (SELECT f.cell_id FROM cell_features f
+                WHERE f.cell_id > c.cell_id ORDER BY f.cell_id LIMIT 1)
+        FROM cells c WHERE c.cell_id IS NOT NULL
+    ), st AS (
+        SELECT cell_id, COUNT(*) AS n_models, MIN(last_train_ts) AS last_train_ts,
+               AVG(mean_dl) AS mean_dl, AVG(std_dl) AS std_dl
+        FROM cell_forecast_state
+        WHERE model_name = ANY(:models)
+        GROUP BY cell_id
+    )
+    SELECT c.cell_id, COALESCE(st.n_models, 0) AS n_models,
+           COALESCE(nw.new_points, 0) AS new_points, nw.new_mean,
+           st.mean_dl, st.std_dl
+    FROM cells c
+    LEFT JOIN st ON st.cell_id = c.cell_id
+    LEFT JOIN LATERAL (
+        SELECT COUNT(*) AS new_points, AVG(f.dl_mbps_mean) AS new_mean
+        FROM cell_features f
+        WHERE f.cell_id = c.cell_id AND f.ts > st.last_train_ts
+    ) nw ON st.n_models = :n_models
+    WHERE c.cell_id IS NOT NULL
+    ORDER BY c.cell_id
+"""
+
+SERIES_SQL = """
+    SELECT cell_id, ts, dl_mbps_mean FROM cell_features
+    WHERE cell_id = ANY(:cells)
+    ORDER BY cell_id, ts
+"""
+
+# Worker-side state: per-process engine and views on the parent's shared series.
+_ENGINE = None
+_SERIES = None
+
+
+class CellTimeout(BaseException):
+    """Raised by SIGALRM inside a worker; BaseException so per-model handlers don't swallow it."""
+
 
+def _cell_timeout(signum, frame):
+    raise CellTimeout()
 
-def save_forecast_to_db(out: pd.DataFrame, model_name: str, cell_id, horizon: str = "1 week"):
+
+def _worker_engine():
+    global _ENGINE
+    if _ENGINE is None:
+        _ENGINE = get_engine()
+    return _ENGINE
+
+
+
+def save_forecast_to_db(out: pd.DataFrame, model_name: str, cell_id, horizon: str = "1 week",
+                        replace=None):
+    """Replace the cell's rows of `replace` (default: model_name and "constant") with `out`."""
     if out is None or out.empty:
         print(f" No rows to save for {model_name} / cell {cell_id}")
         return
@@ -84,15 +216,149 @@ def save_forecast_to_db(out: pd.DataFrame, model_name: str, cell_id, horizon: st
     out["is_invalid"] = out["y_hat"] < 0
     out = out.fillna(0)
 
-    eng = get_engine()
     try:
-        with eng.begin() as con:
-            out.to_sql("cell_forecast_ts", con, if_exists="append", index=False, method="multi", chunksize=500)
+        with _worker_engine().begin() as con:
+            con.execute(text("DELETE FROM cell_forecast_ts WHERE cell_id = :cid AND model_name = ANY(:models)"),
+                        {"cid": str(cell_id), "models": list(replace or (model_name, "constant"))})
+            copy_dataframe(out, "cell_forecast_ts", con)
         print(f"{model_name} saved for cell {cell_id} ({len(out)} rows)")
     except Exception as e:
         print(f" DB save failed for {model_name}/{cell_id}: {e}")
-    finally:
-        eng.dispose()
+
+
+# -------------------------------------------------------------
+# FORECAST STATE
+# -------------------------------------------------------------
+# cell_forecast_state records, per (cell, model), the last ts and a
+# fingerprint (points, mean, std of dl_mbps_mean) of the series the current
+# forecast was trained on. A cell is re-forecast when a model has no state,
+# at least FORECAST_MIN_NEW_POINTS arrived since, or the mean of at least
+# FORECAST_DRIFT_MIN_POINTS new points is more than FORECAST_DRIFT_SIGMA standard
+# errors (training std / sqrt(new points)) away from the training mean.
+
+def series_fingerprint(ts, values) -> dict:
+    """State columns for one training series (ts: datetime-like or int64 ns)."""
+    values = np.asarray(values, dtype=float)
+    ok = ~np.isnan(values)
+    return {"last_train_ts": pd.to_datetime(pd.Series(ts).max(), utc=True),
+            "n_points": int(len(values)),
+            "mean_dl": float(values[ok].mean()) if ok.any() else None,
+            "std_dl": float(values[ok].std(ddof=1)) if ok.sum() > 1 else None}
+
+
+def save_forecast_state(con, rows: list) -> None:
+    """Upsert state rows (dicts with cell_id, model_name, status + series_fingerprint())."""
+    if rows:
+        con.execute(text(FORECAST_STATE_DDL))
+        con.execute(text(STATE_UPSERT_SQL), rows)
+
+
+def stale_cells(con, models, min_new_points: int = FORECAST_MIN_NEW_POINTS,
+                drift_sigma: float = FORECAST_DRIFT_SIGMA,
+                drift_min_points: int = FORECAST_DRIFT_MIN_POINTS) -> pd.DataFrame:
+    """Cells whose `models` forecasts need a refresh, with the reason (new / new_data / drift)."""
+    con.execute(text(FORECAST_STATE_DDL))
+    con.execute(text(FORECAST_INDEX_DDL))
+    df = pd.read_sql(text(STALE_SQL), con, params={"models": list(models), "n_models": len(models)})
+    for c in ("new_points", "new_mean", "mean_dl", "std_dl"):
+        df[c] = pd.to_numeric(df[c], errors="coerce")
+    stderr = df["std_dl"].fillna(0) / np.sqrt(df["new_points"].clip(lower=1))
+    drift = (df["new_points"] >= drift_min_points) & \
+            ((df["new_mean"] - df["mean_dl"]).abs() > drift_sigma * stderr)
+    df["reason"] = np.select([df["n_models"] < len(models), df["new_points"] >= min_new_points, drift],
+                             ["new", "new_data", "drift"], default="")
+    return df[df["reason"] != ""].reset_index(drop=True)
+
+
+# -------------------------------------------------------------
+# SHARED SERIES
+# -------------------------------------------------------------
+# The parent streams every requested series in one query (ordered by
+# cell_id, ts) into two contiguous shared-memory arrays, ts (int64 ns) and
+# dl_mbps_mean (float64); `offsets` maps cell_id → (start, stop). Workers
+# attach once in the pool initializer and slice views, so DB reads no
+# longer scale with the number of cells.
+
+class SharedSeries:
+    def __init__(self, n: int):
+        size = max(n, 1) * 8
+        self.ts = shared_memory.SharedMemory(create=True, size=size)
+        self.values = shared_memory.SharedMemory(create=True, size=size)
+        self.n = n
+        self.offsets = {}
+
+    @property
+    def names(self):
+        return self.ts.name, self.values.name, self.n
+
+    def arrays(self):
+        return (np.ndarray(self.n, dtype=np.int64, buffer=self.ts.buf),
+                np.ndarray(self.n, dtype=np.float64, buffer=self.values.buf))
+
+    def close(self):
+        for shm in (self.ts, self.values):
+            shm.close()
+            shm.unlink()
+
+
+def fetch_series(cells: list, eng=None) -> SharedSeries:
+    """Stream the dl_mbps_mean series of `cells` into shared memory (two queries total).
+
+    The COUNT that sizes the buffer and the streamed SELECT share one
+    REPEATABLE READ snapshot, so rows committed in between can neither
+    truncate the tail cells nor leave part of the buffer unfilled.
+    Cells without rows get no entry in `offsets`.
+    """
+    eng = eng or get_engine()
+    with eng.connect() as con:
+        con = con.execution_options(isolation_level="REPEATABLE READ")
+        with con.begin():
+            n = con.execute(text("SELECT COUNT(*) FROM cell_features WHERE cell_id = ANY(:cells)"),
+                            {"cells": list(cells)}).scalar() or 0
+            shared = SharedSeries(n)
+            ts_arr, val_arr = shared.arrays()
+            pos, cur, start = 0, None, 0
+            for chunk in iter_query(SERIES_SQL, {"cells": list(cells)}, con):
+                k = len(chunk)
+                if pos + k > n:
+                    shared.close()
+                    raise RuntimeError(f"series query returned more than the {n} counted rows")
+                ts_arr[pos:pos + k] = pd.DatetimeIndex(pd.to_datetime(chunk["ts"], utc=True)).as_unit("ns").asi8
+                val_arr[pos:pos + k] = pd.to_numeric(chunk["dl_mbps_mean"], errors="coerce").to_numpy(float, na_value=np.nan)
+                ids = chunk["cell_id"].astype(str).to_numpy()
+                bounds = np.r_[0, np.flatnonzero(ids[1:] != ids[:-1]) + 1, k] if k else np.zeros(1, dtype=int)
+                for b0, b1 in zip(bounds[:-1], bounds[1:]):
+                    cid = ids[b0]
+                    if cid != cur:
+                        if cur is not None:
+                            shared.offsets[cur] = (int(start), int(pos + b0))
+                        cur, start = cid, pos + b0
+                pos += k
+            if cur is not None:
+                shared.offsets[cur] = (int(start), pos)
+            shared.n = pos
+    return shared
+
+
+def _attach_series(ts_name: str, values_name: str, n: int):
+    """Pool initializer: map the parent's shared arrays into this worker (no copy)."""
+    global _SERIES
+    ts_shm = shared_memory.SharedMemory(name=ts_name)
+    val_shm = shared_memory.SharedMemory(name=values_name)
+    _SERIES = (ts_shm, val_shm,
+               np.ndarray(n, dtype=np.int64, buffer=ts_shm.buf),
+               np.ndarray(n, dtype=np.float64, buffer=val_shm.buf))
+
+
+def load_series(cell_id, start: int = None, stop: int = None) -> pd.DataFrame:
+    """(ts, dl_mbps_mean) of one cell: from shared memory when attached, else from the DB."""
+    if _SERIES is not None and start is not None:
+        _, _, ts_arr, val_arr = _SERIES
+        return pd.DataFrame({"ts": pd.to_datetime(ts_arr[start:stop], utc=True),
+                             "dl_mbps_mean": val_arr[start:stop]})
+    with _worker_engine().connect() as con:
+        return pd.read_sql(text("SELECT ts, dl_mbps_mean FROM cell_features WHERE cell_id = :cid ORDER BY ts"),
+                           con, params={"cid": str(cell_id)})
 
 
 
@@ -119,26 +385,73 @@ def _forecast_prophet(df: pd.DataFrame, steps: int):
     )
 
 
-def _forecast_arima(series: pd.Series, steps: int):
-    if series.nunique() < 2:
-        return pd.DataFrame(columns=["ts", "y_hat", "yhat_lower", "yhat_upper"])
-    model = ARIMA(series, order=(1, 1, 1)).fit()
-    fc = model.get_forecast(steps)
-    conf = fc.conf_int()
-    return pd.DataFrame({
-        "ts": pd.date_range(series.index[-1] + pd.Timedelta(minutes=15), periods=steps, freq="15min"),
-        "y_hat": fc.predicted_mean.values,
-        "yhat_lower": conf.iloc[:, 0].values,
-        "yhat_upper": conf.iloc[:, 1].values,
-    })
+# -------------------------------------------------------------
+# STATE-SPACE MODELS (ARIMA / SARIMA) WITH WARM START
+# -------------------------------------------------------------
+# Each fit leaves an artifact (utils.forecast_store): params, and the
+# predicted state + covariance after the last observation. On the next run
+#   • extend → new points directly follow last_ts and the params were fitted
+#              less than FORECAST_REFIT_DAYS of data ago: only the new points
+#              are filtered from the stored state (no optimization)
+#   • warm   → params re-estimated on the full series from start_params
+#   • cold   → no usable artifact (or the model spec changed)
+# Parameters are estimated with return_params=True and the final filter pass
+# keeps only the forecast covariance (not per-step state covariances), which
+# is what made SARIMA(…, 96) fits run out of memory.
+
+def _arima_model(series: pd.Series):
+    return ARIMA(series, order=(1, 1, 1))
 
 
-def _forecast_sarima(series: pd.Series, steps: int):
+def _sarima_model(series: pd.Series):
+    return SARIMAX(series, order=(1, 1, 0), seasonal_order=(1, 1, 0, 96),
+                   enforce_stationarity=False, enforce_invertibility=False)
+
+
+# model_name → (spec stored with the artifact, model builder, fit kwargs)
+STATE_SPACE_MODELS = {
+    "arima": ("ARIMA(1,1,1)", _arima_model, {}),
+    "sarima": ("SARIMAX(1,1,0)(1,1,0,96)", _sarima_model, {"disp": False}),
+}
+
+
+def _forecast_state_space(model_name: str, series: pd.Series, steps: int, cell_id=None):
     if series.nunique() < 2:
         return pd.DataFrame(columns=["ts", "y_hat", "yhat_lower", "yhat_upper"])
-    model = SARIMAX(series, order=(1, 1, 0), seasonal_order=(1, 1, 0, 96),
-                    enforce_stationarity=False, enforce_invertibility=False).fit(disp=False)
-    fc = model.get_forecast(steps)
+    spec, build, fit_kwargs = STATE_SPACE_MODELS[model_name]
+    art = load_artifact(cell_id, model_name) if cell_id is not None else None
+    if art is not None and art.get("spec") != spec:
+        art = None
+
+    t0 = time.perf_counter()
+    last = series.index[-1]
+    res = None
+    if art is not None:
+        prev = pd.Timestamp(int(art["last_ts"]))
+        new = series[series.index > prev]
+        fresh = last - pd.Timestamp(int(art["fitted_at"])) <= pd.Timedelta(days=FORECAST_REFIT_DAYS)
+        if len(new) and new.index[0] - prev == pd.Timedelta(minutes=15) and fresh:
+            model = build(new)
+            model.initialize_known(art["state"], art["state_cov"])
+            res = model.filter(art["params"], cov_type="none", conserve_memory=FORECAST_MEMORY)
+            mode, fitted_at, nobs = "extend", int(art["fitted_at"]), int(art["nobs"])
+    if res is None:
+        params = build(series).fit(start_params=None if art is None else art["params"],
+                                   return_params=True, **fit_kwargs)
+        res = build(series).filter(params, cov_type="none", conserve_memory=FORECAST_MEMORY)
+        mode, fitted_at, nobs = ("cold" if art is None else "warm"), last.value, len(series)
+    print(f" {model_name} {mode} in {time.perf_counter() - t0:.2f}s ({len(series)} points)")
+
+    if cell_id is not None:
+        fr = res.filter_results
+        try:
+            save_artifact(cell_id, model_name, spec=spec, params=np.asarray(res.params, dtype=float),
+                          state=fr.predicted_state[:, -1], state_cov=fr.predicted_state_cov[:, :, -1],
+                          last_ts=last.value, fitted_at=fitted_at, nobs=nobs)
+        except Exception as e:
+            print(f" Artifact save failed for {model_name}/{cell_id}: {e}")
+
+    fc = res.get_forecast(steps)
     conf = fc.conf_int()
     return pd.DataFrame({
         "ts": pd.date_range(series.index[-1] + pd.Timedelta(minutes=15), periods=steps, freq="15min"),
@@ -149,16 +462,19 @@ def _forecast_sarima(series: pd.Series, steps: int):
 
 
 
-def run_forecast_for_cell(cell_id):
+def run_forecast_for_cell(task):
+    """`task` is a cell_id, or (cell_id, start, stop) into the shared series."""
+    cell_id, start, stop = task if isinstance(task, tuple) else (task, None, None)
     steps = 4 * 24 * 7
     print(f"\n Starting forecasts for cell {cell_id}...")
 
+    timed = FORECAST_CELL_TIMEOUT_SEC > 0 and hasattr(signal, "SIGALRM")
+    if timed:
+        signal.signal(signal.SIGALRM, _cell_timeout)
+        signal.alarm(FORECAST_CELL_TIMEOUT_SEC)
+    attempted, df = {}, None
     try:
-        eng = get_engine()
-        with eng.connect() as con:
-            df = pd.read_sql(text("SELECT ts, dl_mbps_mean FROM cell_features WHERE cell_id = :cid ORDER BY ts"),
-                             con, params={"cid": str(cell_id)})
-        eng.dispose()
+        df = load_series(cell_id, start, stop)
 
         if df.empty or df["dl_mbps_mean"].nunique() < 2:
             print(f" Low variation for {cell_id}, saving constant forecast instead.")
@@ -171,28 +487,138 @@ def run_forecast_for_cell(cell_id):
                 "yhat_upper": [mean_val * 1.1] * 96,
                 "dl_mbps_mean": [mean_val] * 96
             })
-            save_forecast_to_db(dummy, "constant", cell_id)
+            save_forecast_to_db(dummy, "constant", cell_id, replace=(*PER_CELL_MODELS, "constant"))
+            attempted = {m: "constant" for m in PER_CELL_MODELS}
             return f"{cell_id}:constant_forecast"
 
         series = _prep_series(df)
         for model_name, func in [
             ("prophet", lambda: _forecast_prophet(df, steps)),
-            ("arima", lambda: _forecast_arima(series, steps)),
-            ("sarima", lambda: _forecast_sarima(series, steps)),
+            ("arima", lambda: _forecast_state_space("arima", series, steps, cell_id)),
+            ("sarima", lambda: _forecast_state_space("sarima", series, steps, cell_id)),
         ]:
             try:
                 out = func()
-                if out is not None and not out.empty:
+                saved = out is not None and not out.empty
+                if saved:
                     save_forecast_to_db(out, model_name, cell_id)
+                attempted[model_name] = "ok" if saved else "empty"
             except Exception as e:
                 print(f" {model_name.upper()} failed for {cell_id}: {e}")
+                attempted[model_name] = "failed"
 
         print(f" Done for cell {cell_id}")
         return f"{cell_id}:done"
+    except CellTimeout:
+        print(f" Timeout for {cell_id} after {FORECAST_CELL_TIMEOUT_SEC}s, skipping remaining models.")
+        # Models not reached get a "timeout" state, so the cell is not queued as new on every run.
+        for m in PER_CELL_MODELS:
+            attempted.setdefault(m, "timeout")
+        return f"{cell_id}:timeout"
     except Exception as e:
         print(f" General failure for {cell_id}: {e}")
         return f"{cell_id}:error"
-
+    finally:
+        if timed:
+            signal.alarm(0)
+        if attempted and df is not None and not df.empty:
+            # Failed and timed-out fits are recorded too, so unchanged data is not retried every run.
+            fp = series_fingerprint(df["ts"], df["dl_mbps_mean"])
+            try:
+                with _worker_engine().begin() as con:
+                    save_forecast_state(con, [{"cell_id": str(cell_id), "model_name": m, "status": st, **fp}
+                                              for m, st in attempted.items()])
+            except Exception as e:
+                print(f" State save failed for {cell_id}: {e}")
+
+
+def run_pool(tasks: list, shared: SharedSeries = None, workers: int = FORECAST_WORKERS,
+             max_tasks_per_child: int = FORECAST_MAX_TASKS_PER_CHILD) -> dict:
+    """Forecast `tasks` on one long-lived pool; returns {status: count}.
+
+    Cells are handed out one at a time (chunksize=1), so a free worker picks
+    up the next cell as soon as it finishes instead of waiting for a batch.
+    Each cell is bounded by FORECAST_CELL_TIMEOUT_SEC inside the worker; if a
+    worker is stuck where the alarm cannot interrupt it (native code) and no
+    result arrives for timeout + 60 s, the pool is terminated and the cells
+    still pending are reported as "unfinished".
+    """
+    stats = {}
+    wait = FORECAST_CELL_TIMEOUT_SEC + 60 if FORECAST_CELL_TIMEOUT_SEC > 0 else None
+    pool = mp.Pool(processes=workers, maxtasksperchild=max_tasks_per_child or None,
+                   initializer=_attach_series if shared else None,
+                   initargs=shared.names if shared else ())
+    t0 = time.perf_counter()
+    done = 0
+    try:
+        results = pool.imap_unordered(run_forecast_for_cell, tasks, chunksize=1)
+        while done < len(tasks):
+            try:
+                res = results.next(wait)
+            except mp.TimeoutError:
+                print(f" No result for {wait}s, a worker is stuck; aborting the remaining cells.")
+                stats["unfinished"] = len(tasks) - done
+                pool.terminate()
+                break
+            done += 1
+            status = res.rsplit(":", 1)[-1]
+            stats[status] = stats.get(status, 0) + 1
+            if done % 50 == 0 or done == len(tasks):
+                el = time.perf_counter() - t0
+                print(f" [{done}/{len(tasks)}] {done / el:.2f} cells/s")
+        else:
+            pool.close()
+    finally:
+        pool.join()
+    el = time.perf_counter() - t0
+    print(f"Forecast run: {done} cells in {el:.1f}s ({done / max(el, 1e-9):.2f} cells/s, "
+          f"{workers} workers) | " + ", ".join(f"{k}={v}" for k, v in sorted(stats.items())))
+    return stats
+
+
+def run_seasonal_tier(shared: SharedSeries, steps: int = sf.STEPS, eng=None) -> int:
+    """Fit the vectorized seasonal models to every cell in `shared` and replace their rows.
+
+    One (cells × time) matrix, one NumPy pass per model, one DELETE + COPY;
+    returns the number of rows written.
+    """
+    t0 = time.perf_counter()
+    ts_arr, val_arr = shared.arrays()
+    cells, Y, last_ns = sf.series_matrix(ts_arr, val_arr, shared.offsets,
+                                         history=SEASONAL_HISTORY_DAYS * sf.SEASON)
+    if not cells:
+        print("Seasonal tier: no series to forecast.")
+        return 0
+    results = sf.forecast_all(Y, sf.SEASON, steps)
+    t_fit = time.perf_counter() - t0
+
+    ts = pd.to_datetime((last_ns[:, None] + np.arange(1, steps + 1) * sf.FREQ_NS).ravel(), utc=True)
+    cell_col = np.repeat(np.array(cells, dtype=object), steps)
+    frames = []
+    for model_name, (y_hat, lower, upper) in results.items():
+        y_hat = y_hat.ravel()
+        frames.append(pd.DataFrame({
+            "ts": ts, "cell_id": cell_col,
+            "y_hat": y_hat, "yhat_lower": lower.ravel(), "yhat_upper": upper.ravel(),
+            "model_name": model_name, "horizon": "1 week", "is_invalid": y_hat < 0,
+        }))
+    out = pd.concat(frames, ignore_index=True)
+
+    state = []
+    for c in cells:
+        a, b = shared.offsets[c]
+        fp = series_fingerprint(ts_arr[a:b], val_arr[a:b])
+        state += [{"cell_id": c, "model_name": m, "status": "ok", **fp} for m in results]
+
+    eng = eng or get_engine()
+    with eng.begin() as con:
+        con.execute(text("DELETE FROM cell_forecast_ts WHERE model_name = ANY(:models) AND cell_id = ANY(:cells)"),
+                    {"models": list(results), "cells": cells})
+        copy_dataframe(out, "cell_forecast_ts", con)
+        save_forecast_state(con, state)
+    print(f"Seasonal tier: {len(cells)} cells × {len(results)} models ({', '.join(results)}) "
+          f"fitted in {t_fit:.1f}s, {len(out):,} rows saved in {time.perf_counter() - t0:.1f}s total")
+    return len(out)
 
 
 if __name__ == "__main__":
@@ -202,40 +628,43 @@ if __name__ == "__main__":
     except RuntimeError:
         pass
 
+    parser = argparse.ArgumentParser(description="Forecast job")
+    parser.add_argument("--seasonal", action="store_true",
+                        help="refresh the vectorized seasonal tier for every cell instead of the per-cell models")
+    args = parser.parse_args()
+
     eng = get_engine()
     try:
-        with eng.connect() as con:
-            cells = pd.read_sql(text("""
-                SELECT DISTINCT cf.cell_id
-                FROM cell_features cf
-                WHERE cf.cell_id NOT IN (
-                    SELECT DISTINCT cell_id FROM cell_forecast_ts
-                )
-                ORDER BY cf.cell_id
-            """), con)
+        with eng.begin() as con:
+            cells = stale_cells(con, sf.MODEL_NAMES if args.seasonal else PER_CELL_MODELS)
     finally:
         eng.dispose()
 
     all_cells = cells["cell_id"].tolist()
-    print(f"Found {len(all_cells)} unprocessed cells total.")
+    reasons = cells["reason"].value_counts().to_dict()
+    print(f"Found {len(all_cells)} cells to forecast "
+          f"({', '.join(f'{k}={v}' for k, v in reasons.items()) or 'none'}).")
 
     if not all_cells:
-        print("All cells already processed. Exiting.")
+        print("All forecasts are up to date. Exiting.")
         raise SystemExit(0)
 
-    process_count = min(4, max(1, mp.cpu_count() // 2))
-    batch_size = 15
-
-  
-    for i in range(0, len(all_cells), batch_size):
-        batch = all_cells[i:i + batch_size]
-        print(f"\n Processing batch {i//batch_size + 1} → cells {batch}")
+    t0 = time.perf_counter()
+    shared = fetch_series(all_cells)
+    print(f"Fetched {shared.n:,} points for {len(shared.offsets)} cells in one query "
+          f"({time.perf_counter() - t0:.1f}s, {shared.n * 16 / 1e6:.1f} MB shared)")
 
-        with mp.Pool(processes=process_count) as pool:
-            for res in pool.imap_unordered(run_forecast_for_cell, batch):
-                print(res)
-
-        print(f" Batch {i//batch_size + 1} completed. Cooling down 10s...\n")
-        time.sleep(10) 
+    try:
+        if args.seasonal:
+            run_seasonal_tier(shared)
+        else:
+            # A cell without rows keeps its previous forecast rather than
+            # having it replaced by a constant one.
+            tasks = [(c, *shared.offsets[c]) for c in all_cells if c in shared.offsets]
+            if len(tasks) < len(all_cells):
+                print(f" Skipping {len(all_cells) - len(tasks)} cells without feature rows.")
+            run_pool(tasks, shared)
+    finally:
+        shared.close()
 
     print("All forecasts completed safely.")
@@ -65,7 +65,8 @@ import json
 import pandas as pd
 import numpy as np
 from sqlalchemy import text
-from utils.db import get_engine
+from utils.db import get_engine, copy_dataframe, read_query
+from utils.schema import FEATURE_SCHEMA, model_matrix
 from utils.models import load_model, select_best_model
 
 
@@ -86,11 +87,7 @@ def load_models():
 def load_latest_features(limit=500):
    
     eng = get_engine()
-    with eng.connect() as con:
-        df = pd.read_sql(
-            text(f"SELECT * FROM cell_features ORDER BY ts DESC"),
-            con
-        )
+    df = read_query("SELECT * FROM cell_features ORDER BY ts DESC", con=eng, schema=FEATURE_SCHEMA)
    
     return df.sort_values("ts").reset_index(drop=True)
 
@@ -106,14 +103,11 @@ def run_inference():
         return
 
 
-    num_cols = df.select_dtypes(include=[np.number]).columns.tolist()
-    X_class = df[num_cols].reindex(columns=feat_class, fill_value=0)
-    X_class = X_class.fillna(X_class.median(numeric_only=True))
+    X_class = model_matrix(df, columns=feat_class, fill="median")
     df["class_label"] = clf.predict(X_class)
 
     
-    X_reg = df[num_cols].reindex(columns=feat_reg, fill_value=0)
-    X_reg = X_reg.fillna(X_reg.median(numeric_only=True))
+    X_reg = model_matrix(df, columns=feat_reg, fill="median")
     y_hat = regr.predict(X_reg)*0.01
 
  
@@ -133,22 +127,14 @@ def run_inference():
             "confidence", "model_name"
         ]].copy()
         forecast_rows["mape"] = None  
-        forecast_rows.to_sql(
-            "cell_forecast", con,
-            if_exists="append", index=False,
-            method="multi", chunksize=5000
-        )
+        copy_dataframe(forecast_rows, "cell_forecast", con)
 
 
         policy_rows = df[["ts", "cell_id", "class_label"]].copy()
         policy_rows["action"] = "monitor"
         policy_rows["reason"] = json.dumps({"rule": "default"})
         policy_rows["thresholds_ver"] = "v1"
-        policy_rows.to_sql(
-            "cell_policy", con,
-            if_exists="append", index=False,
-            method="multi", chunksize=5000
-        )
+        copy_dataframe(policy_rows, "cell_policy", con)
 
     print(f"Inference complete: {len(df)} rows written to DB.")
 
@@ -183,10 +169,7 @@ def run_inference():
 
 
     with eng.begin() as con:
-        df_impact.to_sql(
-            "energy_impact_summary", con,
-            if_exists="append", index=False, method="multi"
-        )
+        copy_dataframe(df_impact, "energy_impact_summary", con)
 
     print("Energy impact summary successfully recorded.")
 
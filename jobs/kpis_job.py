@@ -26,7 +26,7 @@ Core Functions:
 
 3. **Database Integration**
    - Writes summarized KPI metrics to the `cell_kpis_daily` table
-     with optimized data types and batch insertion for scalability.
+     through a bulk COPY (`utils.db.copy_dataframe`).
 
 4. **Automation**
    - Supports both manual and scheduled execution.
@@ -48,8 +48,7 @@ import pandas as pd
 import numpy as np
 import os
 from sqlalchemy import text
-from utils.db import get_engine
-from sqlalchemy.types import Date, Float, String
+from utils.db import get_engine, copy_dataframe
 
 def compute_kpis():
     eng = get_engine()
@@ -102,24 +101,7 @@ def compute_kpis():
 
   
     with eng.begin() as con:
-        kpis.to_sql(
-            "cell_kpis_daily",
-            con,
-            if_exists="append",
-            index=False,
-            method="multi",
-            chunksize=5000,
-            dtype={
-                "cell_id": String(),
-                "date": Date(),
-                "dl_mbps_mean": Float(),
-                "ul_mbps_mean": Float(),
-                "rsrp_mean": Float(),
-                "snr_mean": Float(),
-                "latency_p90": Float(),
-                "energy_kwh": Float(),
-            },
-        )
+        copy_dataframe(kpis, "cell_kpis_daily", con)
 
     print(f" KPI calculated and recorded: {len(kpis)} line")
 
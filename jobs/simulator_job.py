@@ -16,6 +16,18 @@ Core Responsibilities:
    - Simulates multiple cell sites with realistic metric ranges.
    - Includes time-dependent patterns for signal and traffic variation.
    - Randomizes anomalies, packet losses, and noise levels.
+   - `generate_ticks()` draws a whole tick (or many ticks) for all cells as
+     columns from one seeded `np.random.Generator` (`SIM_SEED`);
+     `generate_sample()` is the per-row reference.
+   - `SIM_PROFILE=uniform` (default) keeps the flat i.i.d. draws;
+     `SIM_PROFILE=realistic` opts in to the profile model: cells
+     clustered around `SIM_CITIES` cities in `SIM_REGION`, per-cell daily /
+     weekly load curves (business vs residential mix, local time
+     `SIM_TZ_OFFSET_H`), RSRP/SNR with shared shadowing (sample correlation
+     ≈ 0.7 within a cell, ≈ 0.87 pooled over cells since a cell's mean RSRP
+     also sets its SNR) and load-dependent interference, mobility classes, and
+     15-min bursts / hourly outages (`SIM_BURST_PROB`, `SIM_OUTAGE_PROB`,
+     flagged in `is_anomaly`).
 
 2. **Database Integration**
    - Writes generated records into the `cell_clean_data` table.
@@ -24,10 +36,25 @@ Core Responsibilities:
        - `SIM_INTERVAL_SEC`  → seconds between samples
        - `SIM_NUM_CELLS`     → number of simulated cells
        - `SIM_DURATION_MIN`  → total simulation duration
+       - `SIM_SEED`          → RNG seed (unset: fresh entropy)
 
 3. **Modes**
    - **Standard Mode:** continuous data generation for the configured duration.
    - **Test Mode:** limited sample generation (useful for debugging or CI tests).
+   - **Backfill Mode:** `--backfill DAYS [--seed N]` writes DAYS of history ending
+     at today's midnight UTC as fast as COPY allows (no sleeping). Batches of
+     `SIM_BACKFILL_BATCH_ROWS` rows are seeded with (seed, batch number), so a
+     backfill is reproducible; throughput is reported per batch and at the end.
+     The backfilled rows predate what feature_job already processed, so its
+     `job_watermark` is lowered to the backfill start afterwards; the next
+     incremental feature run rebuilds from there (`feature_job --full` does too).
+   - **Multi-writer:** `--writers N` (`SIM_WRITERS`) shards cells across N
+     processes, each with its own connection and COPY stream, fed through a
+     bounded queue (`SIM_QUEUE_BATCHES`) so generation is back-pressured by
+     the writers. Live metrics every `SIM_METRICS_SEC`: rows/s, queue depth
+     per writer, COPY latency p50/p95/max. Works for live and `--backfill`.
+     With SIM_PROFILE=realistic every row is a hash of (seed, cell, ts), so
+     N writers produce exactly the rows of a single one.
 
 Technical Notes:
 ----------------
@@ -38,16 +65,29 @@ Technical Notes:
 
 import os
 import time
+import queue
+import argparse
+import threading
 import random
 import numpy as np
 import pandas as pd
 from datetime import datetime, timedelta, timezone
 
-from utils.db import get_engine
+from utils.db import get_engine, copy_dataframe, lower_watermark
 
 SIM_INTERVAL_SEC = int(os.getenv("SIM_INTERVAL_SEC", "5"))     
 SIM_NUM_CELLS    = int(os.getenv("SIM_NUM_CELLS", "10"))       
 SIM_DURATION_MIN = int(os.getenv("SIM_DURATION_MIN", "120"))    
+SIM_SEED         = int(os.getenv("SIM_SEED")) if os.getenv("SIM_SEED") else None
+SIM_BACKFILL_BATCH_ROWS = int(os.getenv("SIM_BACKFILL_BATCH_ROWS", "500000"))
+
+# Traffic / radio profile model ("realistic") or the flat i.i.d. reference ("uniform").
+SIM_PROFILE      = os.getenv("SIM_PROFILE", "uniform").lower()
+SIM_REGION       = [float(v) for v in os.getenv("SIM_REGION", "36.5,39.5,26.5,30.0").split(",")]  # lat_min,lat_max,lon_min,lon_max
+SIM_CITIES       = int(os.getenv("SIM_CITIES", "8"))               # urban clusters inside the region
+SIM_TZ_OFFSET_H  = float(os.getenv("SIM_TZ_OFFSET_H", "3"))         # local time of the daily curves
+SIM_BURST_PROB   = float(os.getenv("SIM_BURST_PROB", "0.01"))       # per cell and 15-min block
+SIM_OUTAGE_PROB  = float(os.getenv("SIM_OUTAGE_PROB", "0.001"))     # per cell and hour
 
 def generate_sample(cell_id, ts):
     """Generates random but realistic metrics for a single cell."""
@@ -85,8 +125,444 @@ def generate_sample(cell_id, ts):
     }
 
 
+def cell_labels(cell_ids) -> dict:
+    """Per-cell text columns, built once and reused for every tick."""
+    cell_ids = np.asarray(cell_ids)
+    return {
+        "cell_id":   np.array([str(c) for c in cell_ids], dtype=object),
+        "cellhex":   np.array([f"CELL{c:03d}" for c in cell_ids], dtype=object),
+        "nodehex":   np.array([f"NODE{c:03d}" for c in cell_ids], dtype=object),
+        "lachex":    np.array([f"LAC{c:03d}" for c in cell_ids], dtype=object),
+        "rawcellid": np.array([f"RAW{c:03d}" for c in cell_ids], dtype=object),
+    }
+
+
+def generate_ticks(cell_ids, timestamps, rng: np.random.Generator = None, labels: dict = None) -> pd.DataFrame:
+    """Vectorized generate_sample() for every cell at every timestamp.
+
+    Same distributions as generate_sample(), drawn as whole columns from one
+    np.random.Generator. Rows are tick-major (all cells of the first tick,
+    then the next), as the per-sample loop wrote them.
+    """
+    rng = rng if rng is not None else np.random.default_rng(SIM_SEED)
+    labels = labels if labels is not None else cell_labels(cell_ids)
+    n_cells, timestamps = len(labels["cell_id"]), pd.DatetimeIndex(timestamps)
+    n_ticks = len(timestamps)
+    n = n_cells * n_ticks
+
+    ping = rng.normal(40, 10, n)
+    return pd.DataFrame({
+        "ts": timestamps.repeat(n_cells),
+        "cell_id": np.tile(labels["cell_id"], n_ticks),
+        "latitude": 37.0 + rng.random(n) / 100,
+        "longitude": 27.0 + rng.random(n) / 100,
+        "speed": rng.uniform(0, 100, n),
+        "rsrp": rng.uniform(-110, -70, n),
+        "rsrq": rng.uniform(-15, -5, n),
+        "snr": rng.uniform(0, 25, n),
+        "cqi": rng.integers(1, 16, n),
+        "dl_mbps": np.maximum(0, rng.normal(50, 20, n)),
+        "ul_mbps": np.maximum(0, rng.normal(20, 5, n)),
+        "ping_avg_ms": ping,
+        "ping_min_ms": np.maximum(5, ping - 5),
+        "ping_max_ms": ping + 5,
+        "ping_stdev_ms": rng.uniform(1, 5, n),
+        "ping_loss_pct": (rng.integers(0, 4, n) == 3).astype(np.int64),
+        "cellhex": np.tile(labels["cellhex"], n_ticks),
+        "nodehex": np.tile(labels["nodehex"], n_ticks),
+        "lachex": np.tile(labels["lachex"], n_ticks),
+        "rawcellid": np.tile(labels["rawcellid"], n_ticks),
+        "is_anomaly": np.zeros(n, dtype=bool),
+    })
+
+
+# -------------------------------------------------------------
+# REALISTIC PROFILE MODEL
+# -------------------------------------------------------------
+# Every cell gets static traits (site, urban/rural, load level, business vs
+# residential mix, radio quality, mobility); every sample is a function of
+# those traits, the local time of day / day of week, and event draws.
+# Bursts, outages and the per-sample noise come from a counter-based hash
+# of (seed, global cell index, time) instead of a stateful RNG, so a cell's
+# rows are identical no matter how ticks are batched or sharded across writers.
+
+_GOLDEN = np.uint64(0x9E3779B97F4A7C15)
+
+
+def _splitmix(z: np.ndarray, k) -> np.ndarray:
+    z = (z ^ np.asarray(k, dtype=np.uint64)) + _GOLDEN
+    z = (z ^ (z >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    z = (z ^ (z >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    return z ^ (z >> np.uint64(31))
+
+
+def _unit(z: np.ndarray) -> np.ndarray:
+    return (z >> np.uint64(11)).astype(np.float64) * 2.0 ** -53
+
+
+def _hash_bits(seed: int, *keys) -> np.ndarray:
+    z = np.full(np.broadcast(*keys).shape, (seed * 0x9E3779B97F4A7C15) % 2 ** 64, dtype=np.uint64)
+    for k in keys:
+        z = _splitmix(z, k)
+    return z
+
+
+def _hash_uniform(seed: int, *keys) -> np.ndarray:
+    """Stateless uniform [0, 1) per element (splitmix64 over the combined keys)."""
+    return _unit(_hash_bits(seed, *keys))
+
+
+class _SampleNoise:
+    """Stateless draws per sample: stream `k` (one per quantity) of the hash of
+    (seed, cell, second); two-uniform draws also use stream k + 0x80."""
+
+    def __init__(self, seed: int, cell: np.ndarray, sec: np.ndarray):
+        self.bits = _hash_bits(seed, cell, sec)
+
+    def uniform(self, k: int, low: float = 0.0, high: float = 1.0) -> np.ndarray:
+        return low + (high - low) * _unit(_splitmix(self.bits, 0x100 + k))
+
+    def normal(self, k: int) -> np.ndarray:                     # Box-Muller
+        u1, u2 = self.uniform(k), self.uniform(k + 0x80)
+        return np.sqrt(-2.0 * np.log1p(-u1)) * np.cos(2 * np.pi * u2)
+
+    def lognormal(self, k: int, sigma: float) -> np.ndarray:
+        return np.exp(sigma * self.normal(k))
+
+    def gamma2(self, k: int, scale: float) -> np.ndarray:        # shape 2 = sum of two exponentials
+        return -scale * (np.log1p(-self.uniform(k)) + np.log1p(-self.uniform(k + 0x80)))
+
+
+def make_profiles(num_cells: int, seed: int = 0, region=SIM_REGION, cities: int = SIM_CITIES) -> dict:
+    """Static per-cell traits; same (num_cells, seed) → same cells."""
+    rng = np.random.default_rng([seed, 0x5EED])
+    lat_min, lat_max, lon_min, lon_max = region
+    centers = np.column_stack([rng.uniform(lat_min, lat_max, cities), rng.uniform(lon_min, lon_max, cities)])
+    city_size = rng.pareto(1.2, cities) + 1                      # a few large cities, many small
+
+    urban = rng.random(num_cells) < 0.7
+    city = rng.choice(cities, num_cells, p=city_size / city_size.sum())
+    spread = 0.02 + 0.03 * np.sqrt(city_size[city] / city_size.max())
+    lat = np.where(urban, centers[city, 0] + rng.normal(0, 1, num_cells) * spread,
+                   rng.uniform(lat_min, lat_max, num_cells))
+    lon = np.where(urban, centers[city, 1] + rng.normal(0, 1, num_cells) * spread,
+                   rng.uniform(lon_min, lon_max, num_cells))
+
+    return {
+        "lat": np.clip(lat, lat_min, lat_max),
+        "lon": np.clip(lon, lon_min, lon_max),
+        "urban": urban,
+        "peak_mbps": rng.lognormal(np.where(urban, np.log(120), np.log(40)), 0.4),
+        "business": np.clip(rng.beta(2, 3, num_cells) + 0.3 * urban, 0, 1),   # 0 residential … 1 business
+        "weekend": rng.uniform(0.6, 1.2, num_cells),              # weekend level vs weekday
+        "rsrp": rng.normal(np.where(urban, -88, -100), 6),        # site RSRP mean (dBm)
+        "speed": rng.choice([2.0, 5.0, 30.0, 70.0], num_cells, p=[0.4, 0.3, 0.2, 0.1]),  # km/h
+    }
+
+
+def daily_load(hour: np.ndarray, weekday: np.ndarray, business: np.ndarray, weekend: np.ndarray) -> np.ndarray:
+    """Relative load in [~0.1, ~1.2] from local hour and weekday, per cell mix."""
+    def bump(center, width):
+        d = (hour - center + 12) % 24 - 12
+        return np.exp(-0.5 * (d / width) ** 2)
+    residential = 0.15 + 0.35 * bump(8.5, 1.5) + 0.85 * bump(21, 2.5)
+    office = 0.1 + 0.9 * bump(13, 3.0)
+    load = business * office + (1 - business) * residential
+    is_weekend = weekday >= 5
+    return np.where(is_weekend, load * np.where(business > 0.5, weekend * 0.6, weekend), load)
+
+
+def generate_profile_ticks(profiles: dict, timestamps, rng: np.random.Generator, labels: dict,
+                           seed: int = 0, cells: np.ndarray = None) -> pd.DataFrame:
+    """Realistic telemetry for every cell at every timestamp (tick-major rows).
+
+    `cells` are the global indices of the label / profile rows (a writer's
+    shard; default 0..n-1). Every draw is a hash of (seed, cell, timestamp),
+    so `rng` is not used and a sharded run reproduces the unsharded rows.
+    """
+    timestamps = pd.DatetimeIndex(timestamps)
+    n_cells, n_ticks = len(labels["cell_id"]), len(timestamps)
+    shape = (n_ticks, n_cells)
+    sec = (timestamps.as_unit("s").asi8 + int(SIM_TZ_OFFSET_H * 3600))[:, None]
+    hour = (sec % 86400) / 3600.0
+    weekday = (sec // 86400 + 3) % 7                              # 1970-01-01 was a Thursday
+    cell = (np.arange(n_cells) if cells is None else np.asarray(cells))[None, :]
+    noise = _SampleNoise(seed, cell, sec)
+
+    util = daily_load(hour, weekday, profiles["business"], profiles["weekend"])
+    util = util * noise.lognormal(0, 0.12)
+
+    block = sec // 900                                            # 15-min burst blocks
+    burst = _hash_uniform(seed, cell, block, 1) < SIM_BURST_PROB
+    util = np.where(burst, util * (1.5 + 2.5 * _hash_uniform(seed, cell, block, 2)), util)
+    outage = _hash_uniform(seed, cell, sec // 3600, 3) < SIM_OUTAGE_PROB
+
+    # radio: shadowing shared by RSRP and SNR (corr ≈ 0.7 within a cell, ≈ 0.87 pooled over
+    # cells via profiles["rsrp"]); SNR also drops with load (interference)
+    z1, z2 = noise.normal(1), noise.normal(2)
+    rsrp = np.clip(profiles["rsrp"] + 4.0 * z1, -140, -44)
+    snr = np.clip(12 + 0.5 * (profiles["rsrp"] + 95) - 6 * np.minimum(util, 1.5)
+                  + 3.0 * (0.7 * z1 + 0.71 * z2), -10, 35)
+    rsrq = np.clip(-11 + 0.25 * snr - 3 * np.minimum(util, 1.5) + noise.normal(3), -20, -3)
+    cqi = np.clip(np.rint(1 + (snr + 5) / 2.2), 1, 15)
+
+    dl = profiles["peak_mbps"] * util
+    ul = dl * noise.uniform(4, 0.15, 0.3)
+    ping = 18 + 35 * np.minimum(util, 2) ** 2 + noise.gamma2(5, 3.0)
+    loss = (noise.uniform(6) < 0.01 + 0.15 * np.clip(util - 0.8, 0, None)).astype(np.int64)
+
+    dl, ul = np.where(outage, 0.0, dl), np.where(outage, 0.0, ul)
+    ping = np.where(outage, np.nan, ping)
+    loss = np.where(outage, 100, loss)
+
+    speed = np.minimum(profiles["speed"] * noise.lognormal(7, 0.5), 160)
+    jitter = 0.0005 + profiles["speed"] / 70 * 0.004              # moving UEs spread further from the site
+    flat = lambda a: np.broadcast_to(a, shape).reshape(-1)
+    return pd.DataFrame({
+        "ts": timestamps.repeat(n_cells),
+        "cell_id": np.tile(labels["cell_id"], n_ticks),
+        "latitude": flat(profiles["lat"] + noise.normal(8) * jitter),
+        "longitude": flat(profiles["lon"] + noise.normal(9) * jitter),
+        "speed": flat(speed),
+        "rsrp": flat(rsrp),
+        "rsrq": flat(rsrq),
+        "snr": flat(snr),
+        "cqi": flat(cqi.astype(np.int64)),
+        "dl_mbps": flat(dl),
+        "ul_mbps": flat(ul),
+        "ping_avg_ms": flat(ping),
+        "ping_min_ms": flat(np.maximum(5, ping - 5)),
+        "ping_max_ms": flat(ping + 5 + 10 * np.minimum(util, 2)),
+        "ping_stdev_ms": flat(1 + 2 * np.minimum(util, 2) + noise.uniform(10)),
+        "ping_loss_pct": flat(loss),
+        "cellhex": np.tile(labels["cellhex"], n_ticks),
+        "nodehex": np.tile(labels["nodehex"], n_ticks),
+        "lachex": np.tile(labels["lachex"], n_ticks),
+        "rawcellid": np.tile(labels["rawcellid"], n_ticks),
+        "is_anomaly": flat(burst | outage),
+    })
+
+
+class TickGenerator:
+    """Ticks for a fixed set of cells under SIM_PROFILE ("realistic" | "uniform")."""
+
+    def __init__(self, num_cells: int, seed: int = None, profile: str = SIM_PROFILE, cell_range=None):
+        self.seed = 0 if seed is None else seed
+        self.profile = profile
+        start, stop = cell_range or (0, num_cells)                # shard: cells [start, stop) of num_cells
+        self.labels = cell_labels(range(start + 1, stop + 1))
+        self.cells = start + np.arange(stop - start)              # global cell indices of the shard
+        self.profiles = None
+        if profile == "realistic":
+            self.profiles = {k: v[start:stop] for k, v in make_profiles(num_cells, self.seed).items()}
+
+    def ticks(self, timestamps, rng: np.random.Generator) -> pd.DataFrame:
+        if self.profiles is None:
+            return generate_ticks(None, timestamps, rng, self.labels)
+        return generate_profile_ticks(self.profiles, timestamps, rng, self.labels, self.seed, self.cells)
+
+
+def backfill_stamps(days: float, interval_sec: int = SIM_INTERVAL_SEC, end=None) -> pd.DatetimeIndex:
+    """Tick timestamps of a `days` backfill ending before `end` (default: today's midnight UTC)."""
+    end = pd.Timestamp.now(tz="UTC").normalize() if end is None else pd.Timestamp(end)
+    end = end.tz_localize("UTC") if end.tzinfo is None else end.tz_convert("UTC")
+    return pd.date_range(end=end - pd.Timedelta(seconds=interval_sec),
+                         periods=int(days * 86400 // interval_sec), freq=f"{interval_sec}s")
+
+
+def backfill_batches(days: float, num_cells: int = SIM_NUM_CELLS, interval_sec: int = SIM_INTERVAL_SEC,
+                     seed: int = None, end=None, batch_rows: int = SIM_BACKFILL_BATCH_ROWS, cell_range=None):
+    """Yield (batch_no, DataFrame) covering `days` of history before `end`.
+
+    `end` defaults to today's midnight UTC and every batch draws from its own
+    Generator seeded with (seed, batch_no[, shard start]), so the same
+    arguments always produce the same rows, and batches can be generated
+    independently. `cell_range` restricts the batches to one shard of cells
+    (the realistic profile ignores the Generator: see generate_profile_ticks).
+    """
+    seed = SIM_SEED if seed is None else seed
+    seed = 0 if seed is None else seed
+    stamps = backfill_stamps(days, interval_sec, end)
+    gen = TickGenerator(num_cells, seed, cell_range=cell_range)
+    ticks_per_batch = max(1, batch_rows // len(gen.labels["cell_id"]))
+    for batch_no, start in enumerate(range(0, len(stamps), ticks_per_batch)):
+        rng = np.random.default_rng([seed, batch_no] + ([cell_range[0]] if cell_range else []))
+        yield batch_no, gen.ticks(stamps[start:start + ticks_per_batch], rng)
+
+
+def live_batches(start_ts, duration_min: float = SIM_DURATION_MIN, num_cells: int = SIM_NUM_CELLS,
+                 interval_sec: int = SIM_INTERVAL_SEC, seed: int = None, cell_range=None):
+    """Yield (tick_no, DataFrame) on the wall clock: one tick every interval_sec from start_ts."""
+    gen = TickGenerator(num_cells, seed, cell_range=cell_range)
+    rng = np.random.default_rng(None if seed is None else [seed] + ([cell_range[0]] if cell_range else []))
+    start_ts = pd.Timestamp(start_ts)
+    n_ticks = int(duration_min * 60 // interval_sec)
+    for tick in range(n_ticks):
+        cur_ts = start_ts + pd.Timedelta(seconds=tick * interval_sec)
+        delay = (cur_ts - pd.Timestamp.now(tz="UTC")).total_seconds()
+        if delay > 0:
+            time.sleep(delay)
+        yield tick, gen.ticks([cur_ts], rng)
+
+
+def backfill(days: float, seed: int = None, end=None) -> int:
+    """Write `days` of synthetic history as fast as COPY allows; no sleeping."""
+    eng = get_engine()
+    total_ticks = int(days * 86400 // SIM_INTERVAL_SEC)
+    total = total_ticks * SIM_NUM_CELLS
+    print(f"Backfill: {days} days, {SIM_NUM_CELLS} cells, every {SIM_INTERVAL_SEC}s "
+          f"-> {total:,} rows (batches of ~{SIM_BACKFILL_BATCH_ROWS:,})")
+
+    written, t_gen, t_write = 0, 0.0, 0.0
+    t0 = time.perf_counter()
+    batches = backfill_batches(days, seed=seed, end=end)
+    while True:
+        t = time.perf_counter()
+        item = next(batches, None)
+        t_gen += time.perf_counter() - t
+        if item is None:
+            break
+        batch_no, df = item
+
+        t = time.perf_counter()
+        copy_dataframe(df, "cell_clean_data", eng, chunksize=len(df))
+        t_write += time.perf_counter() - t
+
+        written += len(df)
+        elapsed = time.perf_counter() - t0
+        print(f" batch {batch_no}: {df['ts'].iloc[-1].isoformat()} | {written:,}/{total:,} rows | "
+              f"{written / elapsed:,.0f} rows/s")
+
+    elapsed = time.perf_counter() - t0
+    print(f"Backfill finished: {written:,} rows in {elapsed:.1f}s ({written / max(elapsed, 1e-9):,.0f} rows/s; "
+          f"generate {t_gen:.1f}s, COPY {t_write:.1f}s)")
+    rewind_feature_watermark(days, end, eng)
+    eng.dispose()
+    return written
+
+
+def rewind_feature_watermark(days: float, end=None, eng=None) -> None:
+    """Lower feature_job's watermark to just before the backfill start.
+
+    Backfilled rows are older than what feature_job already processed, so an
+    incremental run would never read them; with the watermark moved back the
+    next run rebuilds features from the backfill start onwards.
+    """
+    from jobs.feature_job import WATERMARK_JOB
+    stamps = backfill_stamps(days, SIM_INTERVAL_SEC, end)
+    if stamps.empty:
+        return
+    own = eng is None
+    eng = eng or get_engine()
+    try:
+        with eng.begin() as con:
+            moved = lower_watermark(con, WATERMARK_JOB, stamps[0] - pd.Timedelta(microseconds=1))
+    except Exception as e:
+        print(f" Could not lower the {WATERMARK_JOB} watermark ({e}); "
+              f"run `python jobs/feature_job.py --full` to build features for the backfilled range.")
+        return
+    finally:
+        if own:
+            eng.dispose()
+    if moved:
+        print(f" {WATERMARK_JOB} watermark lowered to {stamps[0].isoformat()}: its next incremental "
+              f"run rebuilds features from the backfill start.")
+
+
+# -------------------------------------------------------------
+# MULTI-WRITER MODE
+# -------------------------------------------------------------
+# Cells are split into SIM_WRITERS contiguous shards, one process each.
+# Inside a process a producer thread generates batches into a bounded
+# queue (SIM_QUEUE_BATCHES); the main thread drains it over one
+# long-lived connection, one COPY + commit per batch. A full queue blocks
+# the producer, so generation never runs ahead of what the database
+# absorbs. Every write is reported to the parent, which prints rows/s,
+# queue depth per writer and COPY latency every SIM_METRICS_SEC.
+
+SIM_WRITERS       = int(os.getenv("SIM_WRITERS", "1"))
+SIM_QUEUE_BATCHES = int(os.getenv("SIM_QUEUE_BATCHES", "4"))
+SIM_METRICS_SEC   = float(os.getenv("SIM_METRICS_SEC", "5"))
+
+
+def shard_range(num_cells: int, shard: int, shards: int):
+    return num_cells * shard // shards, num_cells * (shard + 1) // shards
+
+
+def _produce(batches, q: queue.Queue) -> None:
+    try:
+        for item in batches:
+            q.put(item)                                           # blocks while the queue is full
+    finally:
+        q.put(None)
+
+
+def _writer(shard: int, shards: int, mode: str, kwargs: dict, metrics) -> None:
+    cell_range = shard_range(kwargs.get("num_cells", SIM_NUM_CELLS), shard, shards)
+    batches = (backfill_batches if mode == "backfill" else live_batches)(cell_range=cell_range, **kwargs)
+    q = queue.Queue(maxsize=SIM_QUEUE_BATCHES)
+    threading.Thread(target=_produce, args=(batches, q), daemon=True).start()
+
+    eng = get_engine()
+    try:
+        with eng.connect() as con:
+            while (item := q.get()) is not None:
+                _, df = item
+                t0 = time.perf_counter()
+                with con.begin():
+                    copy_dataframe(df, "cell_clean_data", con, chunksize=len(df))
+                metrics.put((shard, len(df), time.perf_counter() - t0, q.qsize(), df["ts"].iloc[-1]))
+    finally:
+        metrics.put((shard, None, 0.0, 0, None))
+        eng.dispose()
+
+
+def run_writers(mode: str, writers: int = SIM_WRITERS, **kwargs) -> int:
+    """Run `mode` ("backfill" | "live") across `writers` processes; returns rows written."""
+    import multiprocessing as mp
+    ctx = mp.get_context("spawn")
+    metrics = ctx.Queue()
+    procs = [ctx.Process(target=_writer, args=(k, writers, mode, kwargs, metrics)) for k in range(writers)]
+    for p in procs:
+        p.start()
+    print(f"Simulator {mode}: {writers} writers, queue {SIM_QUEUE_BATCHES} batches each")
+
+    t0 = last = time.perf_counter()
+    total, window_rows, window_lat, depth, latest = 0, 0, [], {}, {}
+    running = writers
+    while running:
+        try:
+            shard, rows, lat, qsize, ts = metrics.get(timeout=SIM_METRICS_SEC)
+        except queue.Empty:
+            shard = None
+            if not any(p.is_alive() for p in procs):
+                break
+        if shard is not None:
+            if rows is None:
+                running -= 1
+            else:
+                total += rows; window_rows += rows; window_lat.append(lat)
+                depth[shard], latest[shard] = qsize, ts
+        now = time.perf_counter()
+        if now - last >= SIM_METRICS_SEC or not running:
+            lat_ms = np.array(window_lat or [0.0]) * 1e3
+            print(f" {total:,} rows | {window_rows / (now - last):,.0f} rows/s | "
+                  f"queue {sum(depth.values())} ({' '.join(str(depth.get(k, 0)) for k in range(writers))}) | "
+                  f"COPY p50 {np.percentile(lat_ms, 50):.0f} ms p95 {np.percentile(lat_ms, 95):.0f} ms "
+                  f"max {lat_ms.max():.0f} ms | at {min(latest.values()).isoformat() if latest else '-'}")
+            last, window_rows, window_lat = now, 0, []
+
+    for p in procs:
+        p.join()
+    elapsed = time.perf_counter() - t0
+    print(f"Simulator {mode} finished: {total:,} rows in {elapsed:.1f}s ({total / max(elapsed, 1e-9):,.0f} rows/s)")
+    return total
+
+
 def main(test_mode=False):
     eng = get_engine()
+    rng = np.random.default_rng(SIM_SEED)
+    gen = TickGenerator(SIM_NUM_CELLS, SIM_SEED)
     start_ts = datetime.now(timezone.utc)
 
     total_records = (SIM_DURATION_MIN * 60) // SIM_INTERVAL_SEC * SIM_NUM_CELLS
@@ -97,16 +573,12 @@ def main(test_mode=False):
 
     counter = 0 
     while cur_ts < end_ts:
-        batch = []
-        for cell_id in range(1, SIM_NUM_CELLS + 1):
-            batch.append(generate_sample(cell_id, cur_ts))
-
-        df = pd.DataFrame(batch)
-        df.to_sql("cell_clean_data", eng, if_exists="append", index=False, method="multi", chunksize=1000)
+        df = gen.ticks([cur_ts], rng)
+        copy_dataframe(df, "cell_clean_data", eng)
 
-        print(f"{cur_ts.isoformat()} -> {len(batch)} rows written")
+        print(f"{cur_ts.isoformat()} -> {len(df)} rows written")
 
-        counter += len(batch)
+        counter += len(df)
         if test_mode and counter >= 3:  
             print("Test mode: 50 kayıt üretildi, duruyor.")
             break
@@ -117,4 +589,21 @@ def main(test_mode=False):
     print("Simulator finished.")
 
 if __name__ == "__main__":
-    main()
+    ap = argparse.ArgumentParser(description="Synthetic cell telemetry generator")
+    ap.add_argument("--backfill", type=float, metavar="DAYS",
+                    help="Write DAYS of history ending at today's midnight UTC, without sleeping")
+    ap.add_argument("--seed", type=int, default=None, help="RNG seed for --backfill (default: SIM_SEED or 0)")
+    ap.add_argument("--test", action="store_true", help="Stop after the first tick")
+    ap.add_argument("--writers", type=int, default=SIM_WRITERS,
+                    help="Shard cells across N writer processes (default: SIM_WRITERS)")
+    args = ap.parse_args()
+    if args.writers > 1 and not args.test:
+        if args.backfill:
+            run_writers("backfill", args.writers, days=args.backfill, seed=args.seed)
+            rewind_feature_watermark(args.backfill)
+        else:
+            run_writers("live", args.writers, start_ts=pd.Timestamp.now(tz="UTC"), seed=SIM_SEED)
+    elif args.backfill:
+        backfill(args.backfill, seed=args.seed)
+    else:
+        main(test_mode=args.test)
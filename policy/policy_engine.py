@@ -40,7 +40,8 @@ import yaml
 import pandas as pd
 import json
 from sqlalchemy import text
-from utils.db import get_engine
+from utils.db import get_engine, copy_dataframe, iter_query
+from utils.schema import FEATURE_SCHEMA
 
 
 POLICY_FILE = "config/policy.yaml"            
@@ -112,39 +113,37 @@ def run_policy_once():
     eng = get_engine()
     rules = load_policy_rules()
 
-    with eng.connect() as con:
-        df = pd.read_sql(text("""
+    # Source rows are streamed through a server-side cursor and the
+    # resulting actions written chunk by chunk in a single transaction.
+    written = 0
+    with eng.connect() as rcon, eng.begin() as con:
+        for df in iter_query("""
             SELECT f.ts, f.cell_id, f.signal_class, f.trend_label, fc.y_hat
             FROM cell_features f
             LEFT JOIN cell_forecast fc
               ON f.cell_id = fc.cell_id AND f.ts = fc.ts
             ORDER BY f.ts ASC;
-        """), con)
-
-    if df.empty:
-        print(" Policy Engine: no new data found.")
-        return
-
-    out_rows = []
-    for _, row in df.iterrows():
-        action, reason = decide_action(row["signal_class"], row["trend_label"], rules)
-        out_rows.append({
-            "ts": row["ts"],
-            "cell_id": row["cell_id"],
-            "class_label": row["signal_class"],
-            "action": action,
-            "reason": json.dumps({"rule": reason}),
-            "model_name": "policy_engine",
-            "thresholds_ver": rules.get("thresholds_ver", "v1")
-        })
-
-    out_df = pd.DataFrame(out_rows)
-
-    with eng.begin() as con:
-        out_df.to_sql("cell_policy", con, if_exists="append", index=False, chunksize=500)
+        """, con=rcon, schema=FEATURE_SCHEMA):
+            out_rows = []
+            for _, row in df.iterrows():
+                action, reason = decide_action(row["signal_class"], row["trend_label"], rules)
+                out_rows.append({
+                    "ts": row["ts"],
+                    "cell_id": row["cell_id"],
+                    "class_label": row["signal_class"],
+                    "action": action,
+                    "reason": json.dumps({"rule": reason}),
+                    "model_name": "policy_engine",
+                    "thresholds_ver": rules.get("thresholds_ver", "v1")
+                })
+            written += copy_dataframe(pd.DataFrame(out_rows), "cell_policy", con)
+
+        if written == 0:
+            print(" Policy Engine: no new data found.")
+            return
         apply_actions_to_status(con)
 
-    print(f"Policy Engine completed successfully. {len(out_df)} actions written.")
+    print(f"Policy Engine completed successfully. {written} actions written.")
 
 
 
@@ -20,6 +20,8 @@
 --   model_registry         → Model version control registry
 --   energy_impact_summary   → Energy savings & CO₂ reduction stats
 --   cell_kpis_daily         → Daily aggregated KPIs
+--   job_watermark           → Incremental job high-water marks
+--   cell_forecast_state     → Per (cell, model) forecast training state
 --   users                   → Authentication table (FastAPI auth)
 -- =============================================================
 
@@ -131,6 +133,7 @@ CREATE TABLE cell_features (
     nrx_rsrq_mean numeric,
     rssi_mean numeric,
     grid_id text,
+    grid_key bigint,
     grid_lat_bin numeric,
     grid_lon_bin numeric,
     hour_of_day smallint,
@@ -170,6 +173,9 @@ CREATE TABLE cell_features (
     latency_ms numeric,
     signal_class text,
     dl_mbps_mean_fwd_1h double precision,
+    dl_mbps_mean_fwd_15m double precision,
+    dl_mbps_mean_fwd_60m double precision,
+    dl_mbps_mean_fwd_240m double precision,
     load_proxy boolean,
     trend_delta_mbps double precision,
     trend_pct double precision,
@@ -205,8 +211,11 @@ CREATE TABLE cell_features (
 
 CREATE INDEX IF NOT EXISTS idx_cell_features_cellid ON cell_features (cell_id);
 CREATE INDEX IF NOT EXISTS idx_cell_features_ts ON cell_features (ts DESC);
-CREATE INDEX IF NOT EXISTS idx_cell_features_cellid_ts ON cell_features (cell_id, ts DESC);
+-- (cell_id, ts) is the natural key: feature_job upserts on it (ON CONFLICT).
+CREATE UNIQUE INDEX IF NOT EXISTS uq_cell_features_cellid_ts ON cell_features (cell_id, ts);
 CREATE INDEX IF NOT EXISTS idx_cell_features_rsrp ON cell_features (rsrp_mean);
+-- spatial grid (utils.grid): map / aggregation queries group and filter on the int key
+CREATE INDEX IF NOT EXISTS idx_cell_features_grid_key ON cell_features (grid_key, ts);
 ANALYZE cell_features;
 CLUSTER cell_features USING idx_cell_features_ts;
 VACUUM ANALYZE cell_features;
@@ -318,6 +327,29 @@ CREATE TABLE IF NOT EXISTS cell_forecast_ts (
     is_invalid BOOLEAN,
     created_at TIMESTAMPTZ DEFAULT now()
 );
+CREATE INDEX IF NOT EXISTS idx_cell_forecast_ts_cell_model ON cell_forecast_ts (cell_id, model_name);
+
+-- =============================================================
+-- CELL_FORECAST_STATE — Forecast Training State
+-- -------------------------------------------------------------
+--   One row per (cell_id, model_name): last ts and fingerprint
+--   (points, mean, std of dl_mbps_mean) of the series the current
+--   forecast was trained on. forecast_job re-forecasts a cell only
+--   when new points arrived or the series drifted.
+-- Used by: forecast_job
+-- =============================================================
+
+CREATE TABLE IF NOT EXISTS cell_forecast_state (
+    cell_id       TEXT NOT NULL,
+    model_name    TEXT NOT NULL,
+    last_train_ts TIMESTAMPTZ NOT NULL,
+    n_points      BIGINT,
+    mean_dl       DOUBLE PRECISION,
+    std_dl        DOUBLE PRECISION,
+    status        TEXT,
+    updated_at    TIMESTAMPTZ DEFAULT now(),
+    PRIMARY KEY (cell_id, model_name)
+);
 
 -- =============================================================
 -- MODEL_REGISTRY — Model Version Control
@@ -442,6 +474,20 @@ CREATE TABLE IF NOT EXISTS cell_kpis_daily (
     energy_kwh DOUBLE PRECISION
 );
 
+-- =============================================================
+-- JOB_WATERMARK — Incremental Processing State
+-- -------------------------------------------------------------
+-- High-water mark (last processed ts) per periodic job, so each
+-- cycle only reads rows newer than the previous run.
+-- Used by: feature_job
+-- =============================================================
+
+CREATE TABLE IF NOT EXISTS job_watermark (
+    job_name   TEXT PRIMARY KEY,
+    last_ts    TIMESTAMPTZ NOT NULL,
+    updated_at TIMESTAMPTZ DEFAULT now()
+);
+
 -- =============================================================
 -- USERS — Authentication Table
 -- -------------------------------------------------------------
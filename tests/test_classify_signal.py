@@ -0,0 +1,60 @@
+import itertools
+import numpy as np
+import pandas as pd
+
+from jobs.feature_job import SIGNAL_THRESHOLDS, classify_signal, classify_signal_row
+
+
+def _parity(df: pd.DataFrame, thresholds: dict = None):
+    expected = df.apply(classify_signal_row, axis=1, thresholds=thresholds).to_numpy(dtype=object)
+    got = classify_signal(df, thresholds)
+    mismatch = np.flatnonzero(got != expected)
+    assert mismatch.size == 0, df.iloc[mismatch[:5]].assign(got=got[mismatch[:5]],
+                                                           expected=expected[mismatch[:5]])
+
+
+def _grid(values: dict) -> pd.DataFrame:
+    return pd.DataFrame(list(itertools.product(*values.values())), columns=list(values))
+
+
+def test_boundaries_and_nan():
+    t = SIGNAL_THRESHOLDS
+    rsrp = [t["rsrp_excellent"], t["rsrp_good"], t["rsrp_weak"]]
+    rsrq = [t["rsrq_up"], t["rsrq_down"]]
+    snr = [t["snr_good"], t["snr_weak"], t["snr_up"], t["snr_down"]]
+    eps = 1e-9
+    df = _grid({
+        "rsrp_mean": sorted({v + d for v in rsrp for d in (-eps, 0.0, eps)}) + [-150.0, -30.0, np.nan],
+        "rsrq_mean": sorted({v + d for v in rsrq for d in (-eps, 0.0, eps)}) + [-12.0, np.nan],
+        "snr_mean":  sorted({v + d for v in snr for d in (-eps, 0.0, eps)}) + [5.0, np.nan],
+    })
+    _parity(df)
+
+
+def test_object_dtype_and_strings():
+    df = pd.DataFrame({
+        "rsrp_mean": pd.Series(["-80", -95, None, "bad", -110.0, "-111"], dtype=object),
+        "rsrq_mean": pd.Series([-10, "-15", np.nan, -12, None, "x"], dtype=object),
+        "snr_mean":  pd.Series(["10", 0, "11", None, -1, 25], dtype=object),
+    })
+    _parity(df)
+
+
+def test_missing_columns():
+    _parity(pd.DataFrame({"snr_mean": [15.0, 5.0, -5.0, np.nan]}))
+    _parity(pd.DataFrame({"rsrp_mean": [-70.0, -100.0, np.nan]}))
+
+
+def test_random_with_custom_thresholds():
+    rng = np.random.default_rng(7)
+    n = 5_000
+    df = pd.DataFrame({
+        "rsrp_mean": rng.integers(-130, -60, n).astype(float),
+        "rsrq_mean": rng.integers(-25, 0, n).astype(float),
+        "snr_mean": rng.integers(-10, 30, n).astype(float),
+    })
+    for c in df:
+        df.loc[rng.random(n) < 0.1, c] = np.nan
+    _parity(df)
+    custom = {**SIGNAL_THRESHOLDS, "rsrp_excellent": -85.0, "snr_up": 15.0, "rsrq_down": -18.0}
+    _parity(df, custom)
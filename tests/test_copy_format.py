@@ -0,0 +1,75 @@
+import csv
+import io
+import numpy as np
+import pandas as pd
+
+from utils import db
+from utils.db import _coerce_for_copy, _copy_csv
+
+TYPES = {"ts": "timestamp with time zone", "cell_id": "text", "n": "integer",
+         "ok": "boolean", "x": "double precision", "horizon": "interval"}
+
+
+def _rows(df: pd.DataFrame) -> list:
+    return list(csv.reader(io.StringIO(_copy_csv(_coerce_for_copy(df, TYPES)).getvalue())))
+
+
+def test_nulls_are_empty_fields():
+    df = pd.DataFrame({
+        "ts": pd.to_datetime(["2024-01-01 10:00:00", None], utc=True),
+        "cell_id": pd.Series(["c1", None], dtype=object),
+        "n": [1.0, np.nan],
+        "ok": pd.Series([True, None], dtype=object),
+        "x": [1.5, np.nan],
+        "horizon": pd.Series(["1 week", np.nan], dtype=object),
+    })
+    rows = _rows(df)
+    assert rows[0] == ["2024-01-01 10:00:00+00:00", "c1", "1", "t", "1.5", "1 week"]
+    assert rows[1] == ["", "", "", "", "", ""]
+
+
+def test_bool_coercion():
+    df = pd.DataFrame({"ok": pd.Series([True, False, 1, 0, np.nan, None], dtype=object)})
+    assert [r[0] for r in _rows(df)] == ["t", "f", "t", "f", "", ""]
+    df = pd.DataFrame({"ok": pd.array([True, None, False], dtype="boolean")})
+    assert [r[0] for r in _rows(df)] == ["t", "", "f"]
+    df = pd.DataFrame({"ok": np.array([True, False])})
+    assert [r[0] for r in _rows(df)] == ["t", "f"]
+
+
+def test_int_and_text_coercion():
+    df = pd.DataFrame({"n": pd.Series(["3", 2.6, None, "x"], dtype=object),
+                       "cell_id": pd.Series([12, "a,b", 'q"t', pd.NA], dtype=object)})
+    rows = _rows(df)
+    assert [r[0] for r in rows] == ["3", "3", "", ""]
+    assert [r[1] for r in rows] == ["12", "a,b", 'q"t', ""]
+
+
+def test_tz_aware_timestamps_keep_offset():
+    ts = pd.Series(pd.to_datetime(["2024-06-01 12:00:00"]).tz_localize("Europe/Istanbul"))
+    rows = _rows(pd.DataFrame({"ts": ts}))
+    assert rows[0][0] == "2024-06-01 12:00:00+03:00"
+    assert pd.Timestamp(rows[0][0]) == ts.iloc[0]
+
+
+def test_temporary_engine_is_disposed(monkeypatch):
+    disposed = []
+
+    class FakeEngine(db.Engine):
+        def __init__(self):
+            pass
+
+        def begin(self):
+            raise RuntimeError("no database")
+
+        def dispose(self, close=True):
+            disposed.append(True)
+
+    monkeypatch.setattr(db, "get_engine", FakeEngine)
+    for fn in (lambda: db.copy_dataframe(pd.DataFrame({"a": [1]}), "t"),
+               lambda: db.upsert_dataframe(pd.DataFrame({"a": [1]}), "t", ["a"])):
+        try:
+            fn()
+        except RuntimeError:
+            pass
+    assert disposed == [True, True]
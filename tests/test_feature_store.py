@@ -0,0 +1,82 @@
+"""Parquet feature store: append-only part files, last write wins, compaction and coverage."""
+
+import os
+import numpy as np
+import pandas as pd
+import pytest
+
+pytest.importorskip("pyarrow")
+
+from utils import feature_store as fs
+
+
+def _frame(cells, start, periods, value, seed=0):
+    rng = np.random.default_rng(seed)
+    ts = pd.date_range(start, periods=periods, freq="15min", tz="UTC")
+    df = pd.DataFrame({
+        "cell_id": np.repeat(cells, periods),
+        "ts": np.tile(ts, len(cells)),
+        "dl_mbps_mean": value + rng.random(len(cells) * periods),
+        "signal_class": rng.choice(["Good", "Weak"], len(cells) * periods),
+        "is_weekend": False,
+    })
+    return df
+
+
+def _files_on_disk(root):
+    return sorted(os.path.relpath(os.path.join(d, f), root)
+                  for d, _, names in os.walk(root) for f in names if f.endswith(".parquet"))
+
+
+def test_writes_append_and_last_write_wins(tmp_path):
+    root = str(tmp_path)
+    first = _frame(["a", "b", "c"], "2024-05-01 20:00", 24, 10.0)
+    second = _frame(["a", "c"], "2024-05-02 01:00", 12, 1000.0, seed=1)   # overlaps the tail of `first`
+    fs.write_features(first, root, buckets=2)
+    before = set(_files_on_disk(root))
+    fs.write_features(second, root, buckets=2)
+
+    assert before <= set(_files_on_disk(root))                # nothing rewritten, only appended
+    got = fs.read_features(root=root)
+    expected = pd.concat([first, second]).drop_duplicates(["cell_id", "ts"], keep="last")
+    assert len(got) == len(expected)
+    merged = got.merge(expected, on=["cell_id", "ts"], suffixes=("", "_exp"))
+    np.testing.assert_allclose(merged["dl_mbps_mean"], merged["dl_mbps_mean_exp"], rtol=1e-6)
+    assert got["ts"].is_monotonic_increasing
+
+    sub = fs.read_features(["dl_mbps_mean"], start="2024-05-02 00:00", cell_ids=["c"], root=root)
+    assert list(sub.columns) == ["dl_mbps_mean"]
+    assert len(sub) == len(expected[(expected["cell_id"] == "c") & (expected["ts"] >= "2024-05-02")])
+
+
+def test_compact_merges_part_files(tmp_path):
+    root = str(tmp_path)
+    for i in range(4):
+        fs.write_features(_frame(["a", "b"], "2024-05-01 00:00", 8, 100.0 * i, seed=i), root, buckets=1)
+    before = fs.read_features(root=root)
+    manifest = fs._load_manifest(root)
+    assert [len(p["files"]) for p in manifest["partitions"].values()] == [4]
+
+    assert fs.compact(root, min_files=8) == 0
+    assert fs.compact(root, min_files=2) == 1
+    manifest = fs._load_manifest(root)
+    part = next(iter(manifest["partitions"].values()))
+    assert len(part["files"]) == 1 and part["rows"] == len(before) == manifest["rows"]
+    assert len(_files_on_disk(root)) == 1
+    pd.testing.assert_frame_equal(fs.read_features(root=root), before)
+    assert before["dl_mbps_mean"].min() >= 300.0
+
+
+def test_coverage_is_only_extended_by_overlapping_builds(tmp_path):
+    root = str(tmp_path)
+    fs.write_features(_frame(["a"], "2024-05-01", 4, 1.0), root)
+    t = lambda s: pd.Timestamp(s, tz="UTC")
+
+    fs.mark_coverage(t("2024-05-01 04:00"), t("2024-05-01 06:00"), root=root)     # no full build yet
+    assert not fs.covers(t("2024-05-01 04:00"), t("2024-05-01 05:00"), root=root)
+
+    fs.mark_coverage(t("2024-05-01 00:00"), t("2024-05-01 06:00"), reset=True, root=root)
+    fs.mark_coverage(t("2024-05-01 02:00"), t("2024-05-01 09:00"), root=root)     # incremental
+    fs.mark_coverage(t("2024-05-01 12:00"), t("2024-05-01 13:00"), root=root)     # gap: ignored
+    assert fs.covers(t("2024-05-01 00:00"), t("2024-05-01 09:00"), root=root)
+    assert not fs.covers(t("2024-05-01 00:00"), t("2024-05-01 13:00"), root=root)
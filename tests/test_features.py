@@ -0,0 +1,129 @@
+"""Feature spec compilation (deduplication, pruning, YAML specs) and the lag/rolling engine vs pandas."""
+
+import json
+import os
+import subprocess
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.features import FEATURE_SPEC, FULL_PLAN, compile_plan, compute_lag_rolling, load_feature_spec
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SPEC = {
+    "a_lag2":    {"source": "a", "op": "lag", "periods": 2},
+    "a_prev2":   {"source": "a", "op": "lag", "periods": 2},          # same as a_lag2
+    "a_1h_mean": {"source": "a", "op": "mean", "window": "1h"},
+    "a_60m_avg": {"source": "a", "op": "mean", "window": "60min"},    # same window, other spelling
+    "a_1h_std":  {"source": "a", "op": "std", "window": "1h"},
+    "b_2h_max":  {"source": "b", "op": "max", "window": "2h"},
+}
+
+YAML_SPEC = """\
+dl_lag12:
+  source: dl_mbps
+  op: lag
+  periods: 12
+dl_mbps_6h_max:
+  source: dl_mbps
+  op: max
+  window: 6h
+"""
+
+
+def test_compile_plan_deduplicates_equal_computations():
+    plan = compile_plan(SPEC)
+    assert plan.lags == {"a_lag2": ("a", 2)}
+    assert plan.rolling == {"a_1h_mean": ("a", "1h", "mean"), "a_1h_std": ("a", "1h", "std"),
+                            "b_2h_max": ("b", "2h", "max")}
+    assert plan.aliases == {"a_prev2": "a_lag2", "a_60m_avg": "a_1h_mean"}
+    assert sorted(plan.columns) == sorted(SPEC)
+    assert plan.max_lag == 2 and plan.max_window == pd.Timedelta("2h")
+
+
+def test_compile_plan_prunes_to_required_outputs():
+    plan = compile_plan(SPEC, required={"a_prev2", "a_60m_avg", "not_in_spec"})
+    # the first spelling is not required, so the required duplicate is computed itself
+    assert plan.lags == {"a_prev2": ("a", 2)}
+    assert plan.rolling == {"a_60m_avg": ("a", "60min", "mean")}
+    assert plan.aliases == {}
+    empty = compile_plan(SPEC, required=set())
+    assert empty.columns == [] and empty.max_lag == 0 and empty.max_window == pd.Timedelta(0)
+
+
+def test_compile_plan_rejects_bad_ops_and_names():
+    with pytest.raises(ValueError, match="unsupported op"):
+        compile_plan({"a_med": {"source": "a", "op": "median", "window": "1h"}})
+    with pytest.raises(ValueError, match="feature names"):
+        compile_plan({'a"; DROP TABLE x; --': {"source": "a", "op": "lag", "periods": 1}})
+
+
+def test_default_plan_is_the_builtin_spec():
+    assert sorted(FULL_PLAN.columns) == sorted(FEATURE_SPEC)
+    assert FULL_PLAN.max_window == pd.Timedelta("3h")
+
+
+def test_yaml_spec_drives_the_default_plan(tmp_path):
+    path = tmp_path / "features.yaml"
+    path.write_text(YAML_SPEC)
+    assert compile_plan(load_feature_spec(str(path))).columns == ["dl_lag12", "dl_mbps_6h_max"]
+
+    # FULL_PLAN (and everything built on it) is compiled from $FEATURE_SPEC_FILE at import
+    code = ("import json; from utils.features import FULL_PLAN; "
+            "from jobs.feature_job import feature_columns, feature_lookback; "
+            "print(json.dumps([FULL_PLAN.columns, FULL_PLAN.max_lag, "
+            "feature_lookback().total_seconds(), feature_columns()[-2:]]))")
+    out = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True, check=True,
+                         env={**os.environ, "FEATURE_SPEC_FILE": str(path)}).stdout
+    columns, max_lag, lookback_s, tail = json.loads(out)
+    assert columns == tail == ["dl_lag12", "dl_mbps_6h_max"]
+    assert max_lag == 12 and lookback_s == 6 * 3600
+
+
+def _irregular_frame(seed: int = 3) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    parts = []
+    for cell, n in (("a", 120), ("b", 1), ("c", 40)):
+        gaps = rng.choice([1, 2, 5, 15, 30, 60, 240], n)            # minutes, with gaps longer than a window
+        ts = pd.Timestamp("2024-05-01", tz="UTC") + pd.to_timedelta(np.cumsum(gaps), unit="min")
+        parts.append(pd.DataFrame({"cell_id": cell, "ts": ts, "x": rng.normal(10, 3, n)}))
+    df = pd.concat(parts, ignore_index=True)
+    df.loc[rng.random(len(df)) < 0.15, "x"] = np.nan
+    df.loc[df.index[:3], "x"] = np.nan                                 # leading NaNs in cell "a"
+    # rows exactly one window apart: (ts - w, ts] excludes the earlier one
+    edge = pd.Timestamp("2024-06-01", tz="UTC")
+    df = pd.concat([df, pd.DataFrame({"cell_id": "c", "ts": [edge, edge + pd.Timedelta("1h")], "x": [1.0, 2.0]})],
+                   ignore_index=True)
+    return df.sample(frac=1.0, random_state=seed).reset_index(drop=True)
+
+
+def _pandas_lag_rolling(df: pd.DataFrame, lags: dict, rolling: dict) -> pd.DataFrame:
+    out = []
+    for _, g in df.groupby("cell_id", sort=True):
+        g = g.sort_values("ts", kind="mergesort").set_index("ts")
+        for name, (col, periods) in lags.items():
+            g[name] = g[col].shift(periods)
+        for name, (col, w, stat) in rolling.items():
+            g[name] = getattr(g[col].rolling(w, min_periods=1), stat)()
+        out.append(g.reset_index())
+    return pd.concat(out, ignore_index=True)[["cell_id", "ts", "x", *lags, *rolling]]
+
+
+def test_lag_rolling_engine_matches_pandas_groupby_rolling():
+    lags = {"x_lag1": ("x", 1), "x_lag3": ("x", 3)}
+    rolling = {f"x_{w}_{stat}": ("x", w, stat)
+               for w in ("15min", "1h", "3h") for stat in ("mean", "std", "min", "max")}
+    df = _irregular_frame()
+
+    got = compute_lag_rolling(df, lags=lags, rolling=rolling)[["cell_id", "ts", "x", *lags, *rolling]]
+    expected = _pandas_lag_rolling(df, lags, rolling)
+    pd.testing.assert_frame_equal(got, expected, check_dtype=False, rtol=1e-9, atol=1e-9)
+
+    # single-sample windows: std is NaN, mean/min/max are the sample itself
+    single = got[got["cell_id"] == "b"].iloc[0]
+    assert np.isnan(single["x_1h_std"]) and np.isnan(single["x_lag1"])
+    edge = got[(got["cell_id"] == "c") & (got["ts"] == pd.Timestamp("2024-06-01 01:00", tz="UTC"))].iloc[0]
+    assert edge["x_1h_mean"] == 2.0 and np.isnan(edge["x_1h_std"]) and edge["x_3h_min"] == 1.0
@@ -0,0 +1,24 @@
+"""grid_key_range: the sargable key range plus the column filter select exactly the bbox squares."""
+
+import numpy as np
+
+from utils.grid import grid_key, grid_key_range
+
+
+def test_key_range_and_column_filter_match_bbox():
+    rng = np.random.default_rng(3)
+    lat = rng.uniform(40.0, 42.0, 20000)
+    lon = rng.uniform(28.0, 30.0, 20000)
+    keys = grid_key(lat, lon).to_numpy(dtype=np.int64)
+
+    box = (40.5, 41.25, 28.75, 29.1)
+    p = grid_key_range(*box)
+    inside = (lat >= box[0]) & (lat <= box[1]) & (lon >= box[2]) & (lon <= box[3])
+    rows, cols = np.divmod(keys, p["cols"])
+    by_rows = (rows >= p["row_lo"]) & (rows <= p["row_hi"]) & (cols >= p["col_lo"]) & (cols <= p["col_hi"])
+    by_keys = (keys >= p["key_lo"]) & (keys <= p["key_hi"]) & \
+              (keys % p["cols"] >= p["col_lo"]) & (keys % p["cols"] <= p["col_hi"])
+
+    assert by_keys.any()
+    np.testing.assert_array_equal(by_keys, by_rows)
+    assert by_keys[inside].all()
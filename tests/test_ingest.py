@@ -0,0 +1,108 @@
+"""Batched ingestion: readers, per-file fill means independent of batch size, manifest skips."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import jobs.feature_job as fj
+
+
+def _export(n: int = 53, seed: int = 11) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    ts = pd.date_range("2024-04-01 08:00", periods=n, freq="37s")
+    df = pd.DataFrame({
+        "Timestamp": ts.strftime("%Y.%m.%d_%H.%M.%S"),
+        "CellID": rng.choice(["101", "102", "103"], n),
+        "Latitude": rng.uniform(40, 41, n), "Longitude": rng.uniform(28, 29, n),
+        "Speed": rng.uniform(0, 80, n), "Operatorname": "op", "NetworkMode": "5G",
+        "RSRP": rng.uniform(-120, -70, n), "RSRQ": rng.uniform(-20, -5, n), "SNR": rng.uniform(-5, 25, n),
+        "DL_bitrate": rng.uniform(0, 300, n), "PINGAVG": rng.uniform(10, 80, n),
+    })
+    for c in ("RSRP", "SNR", "DL_bitrate", "PINGAVG"):
+        df[c] = df[c].astype(object)
+        df.loc[rng.random(n) < 0.2, c] = "-"                   # export placeholders become NaN
+    df.loc[:9, "DL_bitrate"] = "-"                              # the whole first batch is missing
+    return df
+
+
+class _Engine:
+    def dispose(self):
+        pass
+
+
+@pytest.fixture
+def sink(monkeypatch, tmp_path):
+    tables = {}
+
+    def copy(df, table, con=None):
+        tables.setdefault(table, []).append(df.copy())
+
+    monkeypatch.setattr(fj, "get_engine", lambda: _Engine())
+    monkeypatch.setattr(fj, "copy_dataframe", copy)
+    monkeypatch.setattr(fj, "INGEST_MANIFEST", str(tmp_path / "manifest.json"))
+    return tables
+
+
+def _table(tables, name):
+    return pd.concat(tables.pop(name), ignore_index=True)
+
+
+@pytest.mark.parametrize("ext", [".csv", ".parquet", ".xlsx"])
+def test_source_batches_are_bounded_and_complete(tmp_path, ext):
+    df = _export().astype(str)
+    path = tmp_path / f"export{ext}"
+    if ext == ".csv":
+        df.to_csv(path, index=False)
+    elif ext == ".parquet":
+        df.to_parquet(path, index=False)
+    else:
+        df.to_excel(path, index=False)
+
+    batches = list(fj.iter_source_batches(str(path), batch_rows=10))
+    assert [len(b) for b in batches] == [10] * 5 + [3]
+    got = pd.concat(batches, ignore_index=True)
+    assert list(got.columns) == list(df.columns)
+    assert (got["Timestamp"].astype(str) == df["Timestamp"]).all()
+    assert (got["CellID"].astype(str) == df["CellID"]).all()
+
+
+def test_fill_means_do_not_depend_on_batch_size(sink, tmp_path, monkeypatch):
+    df = _export()
+    path = tmp_path / "export.csv"
+    df.to_csv(path, index=False)
+
+    results = []
+    for batch_rows in (10, 7, 1000):
+        monkeypatch.setattr(fj, "INGEST_MANIFEST", str(tmp_path / f"manifest_{batch_rows}.json"))
+        assert fj.ingest_path(str(path), batch_rows=batch_rows) == len(df)
+        assert len(_table(sink, "cell_raw")) == len(df)
+        results.append(_table(sink, "cell_clean_data"))
+
+    # the whole-file frame written at once is the reference
+    fj.write_cell_clean(fj.clean_and_prepare_excel(pd.read_csv(path)))
+    expected = _table(sink, "cell_clean_data")
+    for got in results:
+        pd.testing.assert_frame_equal(got, expected, rtol=1e-12)
+    assert not expected["dl_mbps"].isna().any()
+
+
+def test_manifest_skips_already_ingested_files(sink, tmp_path):
+    src = tmp_path / "exports"
+    src.mkdir()
+    _export(20, seed=1).to_csv(src / "a.csv", index=False)
+    _export(15, seed=2).to_csv(src / "b.csv", index=False)
+    (src / "notes.txt").write_text("not an export")
+
+    assert fj.ingest_path(str(src), batch_rows=8) == 35
+    assert len(_table(sink, "cell_clean_data")) == 35
+    sink.clear()
+
+    # unchanged files are skipped by content hash, even when renamed
+    (src / "a.csv").rename(src / "a_renamed.csv")
+    assert fj.ingest_path(str(src), batch_rows=8) == 0
+    assert sink == {}
+
+    _export(12, seed=3).to_csv(src / "c.csv", index=False)
+    assert fj.ingest_path(str(src), batch_rows=8) == 12
+    assert len(_table(sink, "cell_clean_data")) == 12
+    assert len(fj._load_manifest(fj.INGEST_MANIFEST)) == 3
@@ -0,0 +1,69 @@
+"""parse_timestamps must match the `.map(fix_timestamp)` + `pd.to_datetime` path it replaces."""
+
+import numpy as np
+import pandas as pd
+
+import jobs.feature_job as fj
+from jobs.feature_job import fix_timestamp, parse_timestamps
+
+
+def _legacy(s: pd.Series) -> pd.Series:
+    return pd.to_datetime(s.astype(str).map(fix_timestamp), errors="coerce", utc=True)
+
+
+def _layout_strings(n: int = 5000, seed: int = 3) -> pd.Series:
+    # out-of-range fields on purpose: month 0/13, day 0/32, hour 24/25, minute/second 60
+    rng = np.random.default_rng(seed)
+    parts = [rng.integers(lo, hi, n) for lo, hi in ((1999, 2031), (0, 14), (0, 33), (0, 26), (0, 61), (0, 61))]
+    s = pd.Series([f"{y:04d}.{mo:02d}.{d:02d}_{h:02d}.{mi:02d}.{se:02d}" for y, mo, d, h, mi, se in zip(*parts)],
+                  dtype=object)
+    s[rng.random(n) < 0.05] = np.nan
+    return s
+
+
+def test_layout_parity_with_legacy_parser():
+    s = _layout_strings()
+    got = parse_timestamps(s)
+    assert 0.1 < got.isna().mean() < 0.6
+    pd.testing.assert_series_equal(got, _legacy(s))
+
+
+def test_invalid_calendar_dates_are_nat():
+    s = pd.Series(["2023.02.28_10.00.00", "2023.02.29_10.00.00", "2024.02.29_10.00.00", "2023.02.30_10.00.00",
+                   "2023.04.31_00.00.00", "2023.05.14_24.00.00", "2023.05.14_23.59.59", "2023.12.31_23.59.60"])
+    got = parse_timestamps(s)
+    assert got.isna().tolist() == [False, True, False, True, True, True, False, False]
+    assert got.iloc[7] == pd.Timestamp("2024-01-01", tz="UTC")
+    pd.testing.assert_series_equal(got, _legacy(s))
+
+
+def test_leading_nan_uses_the_layout_fast_path(monkeypatch):
+    calls = []
+    monkeypatch.setattr(fj, "fix_timestamp", lambda v: calls.append(v) or fix_timestamp(v))
+    s = pd.Series([np.nan, None, "", "2023.05.14_13.45.07", "2023.05.14_13.45.08"])
+    got = parse_timestamps(s)
+    assert got.isna().tolist() == [True, True, True, False, False]
+    assert got.iloc[3] == pd.Timestamp("2023-05-14 13:45:07", tz="UTC")
+    assert calls == []                                       # no per-row fallback
+    assert parse_timestamps(pd.Series([np.nan, None])).isna().all()
+
+
+def test_mixed_formats_fall_back_per_row(monkeypatch):
+    calls = []
+    monkeypatch.setattr(fj, "fix_timestamp", lambda v: calls.append(v) or fix_timestamp(v))
+    s = pd.Series(["2023.05.14_13.45.07", "2023-05-15 01:02:03", "2023-05-16T08:00:00Z",
+                   "2023.05.17_09.10.11", "garbage", np.nan])
+    got = parse_timestamps(s)
+    assert got.tolist()[:4] == [pd.Timestamp(t, tz="UTC") for t in
+                                ("2023-05-14 13:45:07", "2023-05-15 01:02:03", "2023-05-16 08:00:00",
+                                 "2023-05-17 09:10:11")]
+    assert got.iloc[4:].isna().all()
+    # only the values the layout decoder could not read go through fix_timestamp
+    assert calls == ["2023-05-15 01:02:03", "2023-05-16T08:00:00Z", "garbage"]
+
+    # a non-layout first value takes the vectorized rewrite; values it reads agree with the legacy parser
+    s = pd.Series([np.nan, "2023-05-15 01:02:03", "2023.05.17_09.10.11", "2023.02.30_10.00.00"])
+    got, legacy = parse_timestamps(s), _legacy(s)
+    assert got.iloc[3] is pd.NaT
+    assert (got[legacy.notna()] == legacy[legacy.notna()]).all()
+    assert got.notna().sum() == 2
@@ -0,0 +1,49 @@
+"""model_matrix must equal the select_dtypes → fillna → astype(float32) chain it replaces."""
+
+import numpy as np
+import pandas as pd
+
+from utils.schema import apply_schema, model_matrix
+
+
+def _frame(n: int = 500, seed: int = 5) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({
+        "ts": pd.date_range("2024-01-01", periods=n, freq="min", tz="UTC"),
+        "cell_id": rng.choice(["a", "b", "c"], n),
+        "signal_class": rng.choice(["Good", "Weak"], n),
+        "is_weekend": rng.integers(0, 2, n).astype(bool),
+        "hour_of_day": rng.integers(0, 24, n).astype(float),
+        "grid_key": rng.integers(0, 10**10, n),
+        "latitude": rng.uniform(36, 42, n),
+        "rsrp_mean": rng.normal(-95, 10, n),
+        "dl_mbps_mean": rng.gamma(2, 20, n),
+        "dl_lag1": rng.gamma(2, 20, n),
+    })
+    for c in ("hour_of_day", "rsrp_mean", "dl_lag1"):
+        df.loc[rng.random(n) < 0.1, c] = np.nan
+    df.loc[3, "rsrp_mean"] = np.inf
+    return apply_schema(df)
+
+
+def test_model_matrix_matches_dtype_chain():
+    df = _frame()
+    exclude = ["grid_key", "dl_lag1", "not_a_column"]
+    expected = df.select_dtypes(include=[np.number]).drop(columns=exclude, errors="ignore") \
+                 .fillna(0).astype(np.float32)
+    X = model_matrix(df, exclude=exclude)
+
+    pd.testing.assert_frame_equal(X, expected)
+    arr = X.to_numpy()
+    assert arr.dtype == np.float32 and arr.flags.f_contiguous     # one float32 block, handed over as is
+    assert np.shares_memory(arr, X.to_numpy())
+
+
+def test_model_matrix_fixed_columns_with_median_fill():
+    df = _frame()
+    features = ["dl_mbps_mean", "missing_feature", "hour_of_day", "signal_class", "rsrp_mean"]
+    num_cols = df.select_dtypes(include=[np.number]).columns.tolist()
+    expected = df[num_cols].reindex(columns=features, fill_value=0)
+    expected = expected.fillna(expected.median(numeric_only=True)).astype(np.float32)
+
+    pd.testing.assert_frame_equal(model_matrix(df, columns=features, fill="median"), expected)
@@ -0,0 +1,42 @@
+"""Realistic simulator profile: rows must not depend on how ticks are sharded or batched."""
+
+import numpy as np
+import pandas as pd
+
+from jobs.simulator_job import TickGenerator, shard_range
+
+CELLS, SEED = 24, 7
+
+
+def _stamps():
+    # 3 days at 10 min: covers many 15-min burst blocks and hourly outage draws
+    return pd.date_range("2024-03-04", periods=3 * 144, freq="10min", tz="UTC")
+
+
+def _sorted(df):
+    return df.sort_values(["ts", "cell_id"], kind="mergesort").reset_index(drop=True)
+
+
+def test_sharded_ticks_match_unsharded():
+    stamps = _stamps()
+    full = TickGenerator(CELLS, SEED, profile="realistic").ticks(stamps, np.random.default_rng(0))
+
+    parts = []
+    for shard in range(3):
+        gen = TickGenerator(CELLS, SEED, profile="realistic", cell_range=shard_range(CELLS, shard, 3))
+        # each writer also batches its ticks differently and uses its own rng
+        for i, chunk in enumerate(np.array_split(np.arange(len(stamps)), 2 + shard)):
+            parts.append(gen.ticks(stamps[chunk], np.random.default_rng([shard, i])))
+    sharded = pd.concat(parts, ignore_index=True)
+
+    assert full["is_anomaly"].any()
+    pd.testing.assert_frame_equal(_sorted(sharded), _sorted(full))
+
+
+def test_shards_draw_their_own_anomalies():
+    stamps = _stamps()
+    first = TickGenerator(CELLS, SEED, profile="realistic", cell_range=(0, 12)).ticks(stamps, None)
+    second = TickGenerator(CELLS, SEED, profile="realistic", cell_range=(12, 24)).ticks(stamps, None)
+    a = first.pivot(index="ts", columns="cell_id", values="is_anomaly").to_numpy()
+    b = second.pivot(index="ts", columns="cell_id", values="is_anomaly").to_numpy()
+    assert not (a == b).all()
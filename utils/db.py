@@ -1,6 +1,13 @@
+import io
 import os
-from sqlalchemy import create_engine
+import numpy as np
+import pandas as pd
+from sqlalchemy import create_engine, text
 from sqlalchemy.engine import Engine
+from utils.schema import apply_schema, concat_frames
+
+COPY_CHUNK_ROWS = int(os.getenv("COPY_CHUNK_ROWS", "50000"))
+READ_CHUNK_ROWS = int(os.getenv("READ_CHUNK_ROWS", "50000"))
 
 def get_engine() -> Engine:
     """Always use TCP/IP connection for PostgreSQL (Cloud Run compatible)."""
@@ -21,3 +28,254 @@ def get_engine() -> Engine:
         pool_pre_ping=True,
     )
     return engine
+
+
+# -------------------------------------------------------------
+# JOB WATERMARKS
+# -------------------------------------------------------------
+# High-water marks let periodic jobs resume from the last timestamp
+# they fully processed instead of rescanning the whole source table.
+WATERMARK_DDL = """
+CREATE TABLE IF NOT EXISTS job_watermark (
+    job_name   text PRIMARY KEY,
+    last_ts    timestamptz NOT NULL,
+    updated_at timestamptz DEFAULT now()
+)
+"""
+
+def get_watermark(con, job_name: str):
+    """Return the last processed timestamp stored for `job_name`, or None."""
+    con.execute(text(WATERMARK_DDL))
+    row = con.execute(text("SELECT last_ts FROM job_watermark WHERE job_name = :j"),
+                      {"j": job_name}).fetchone()
+    return row[0] if row else None
+
+def set_watermark(con, job_name: str, last_ts) -> None:
+    """Persist `last_ts` as the high-water mark of `job_name` (upsert)."""
+    con.execute(text(WATERMARK_DDL))
+    con.execute(text("""
+        INSERT INTO job_watermark (job_name, last_ts, updated_at)
+        VALUES (:j, :ts, now())
+        ON CONFLICT (job_name)
+        DO UPDATE SET last_ts = EXCLUDED.last_ts, updated_at = now()
+    """), {"j": job_name, "ts": last_ts})
+
+def lower_watermark(con, job_name: str, last_ts) -> bool:
+    """Move the high-water mark of `job_name` back to `last_ts` if it is later;
+    used after writing history older than what the job already processed."""
+    con.execute(text(WATERMARK_DDL))
+    res = con.execute(text("""
+        UPDATE job_watermark SET last_ts = :ts, updated_at = now()
+        WHERE job_name = :j AND last_ts > :ts
+    """), {"j": job_name, "ts": last_ts})
+    return res.rowcount > 0
+
+
+# -------------------------------------------------------------
+# ONE-TIME SCHEMA MIGRATIONS
+# -------------------------------------------------------------
+# Schema changes for tables that already exist in deployed databases
+# (init.sql only runs on an empty volume). Each named migration runs once,
+# in its own transaction under an advisory lock, and is recorded in
+# schema_migrations; jobs call apply_migrations() at start-up, not per cycle.
+MIGRATIONS_DDL = """
+CREATE TABLE IF NOT EXISTS schema_migrations (
+    name       text PRIMARY KEY,
+    applied_at timestamptz DEFAULT now()
+)
+"""
+
+def apply_migrations(migrations: list, eng=None) -> list:
+    """Apply pending `(name, [sql | (sql, params)])` migrations in order; returns applied names."""
+    own = eng is None
+    eng = eng or get_engine()
+    applied = []
+    try:
+        for name, statements in migrations:
+            with eng.begin() as con:
+                con.execute(text(MIGRATIONS_DDL))
+                con.execute(text("SELECT pg_advisory_xact_lock(hashtext(:n))"), {"n": name})
+                if con.execute(text("SELECT 1 FROM schema_migrations WHERE name = :n"), {"n": name}).first():
+                    continue
+                print(f"[MIGRATE] {name} ...")
+                for stmt in statements:
+                    sql, params = stmt if isinstance(stmt, tuple) else (stmt, {})
+                    res = con.execute(text(sql), params)
+                    if res.rowcount and res.rowcount > 0:
+                        print(f"[MIGRATE]   {sql.split()[0]} … {res.rowcount} rows")
+                con.execute(text("INSERT INTO schema_migrations (name) VALUES (:n)"), {"n": name})
+                applied.append(name)
+    finally:
+        if own:
+            eng.dispose()
+    return applied
+
+
+# -------------------------------------------------------------
+# BULK WRITES (COPY FROM STDIN)
+# -------------------------------------------------------------
+# Replacement for DataFrame.to_sql(method="multi"): rows are streamed
+# as CSV through PostgreSQL COPY in chunks of COPY_CHUNK_ROWS, after
+# coercing each column to the type of its target column.
+_INT_TYPES  = {"smallint", "integer", "bigint"}
+_BOOL_TYPES = {"boolean"}
+_TEXT_TYPES = {"text", "character varying", "character", "uuid", "jsonb", "json", "interval"}
+_column_types_cache = {}
+
+def _table_column_types(con, table: str) -> dict:
+    """Return {column: data_type} for `table` (cached per process)."""
+    if table not in _column_types_cache:
+        schema, _, name = table.rpartition(".")
+        rows = con.execute(text("""
+            SELECT column_name, data_type
+            FROM information_schema.columns
+            WHERE table_name = :t AND (:s = '' OR table_schema = :s)
+        """), {"t": name, "s": schema}).fetchall()
+        _column_types_cache[table] = {r[0]: r[1] for r in rows}
+    return _column_types_cache[table]
+
+def _coerce_for_copy(df: pd.DataFrame, types: dict) -> pd.DataFrame:
+    out = {}
+    for col in df.columns:
+        s, pg = df[col], types.get(col)
+        if pg in _INT_TYPES:
+            s = pd.to_numeric(s, errors="coerce").round().astype("Int64")
+        elif pg in _BOOL_TYPES:
+            na = s.isna().to_numpy()
+            flag = s.where(~na, False).astype(bool).to_numpy()
+            s = pd.Series(np.where(na, None, np.where(flag, "t", "f")), index=s.index, dtype=object)
+        elif pg in _TEXT_TYPES and s.dtype == object:
+            s = s.astype(str).where(s.notna(), None)
+        out[col] = s
+    return pd.DataFrame(out, index=df.index)
+
+def _copy_csv(data: pd.DataFrame) -> io.StringIO:
+    """CSV body for COPY ... (FORMAT csv): missing values are empty fields (NULL)."""
+    buf = io.StringIO()
+    data.to_csv(buf, index=False, header=False)
+    buf.seek(0)
+    return buf
+
+def copy_dataframe(df: pd.DataFrame, table: str, con=None, chunksize: int = COPY_CHUNK_ROWS) -> int:
+    """Append `df` to `table` via COPY FROM STDIN (CSV); returns rows written.
+
+    `con` may be an open Connection (joins its transaction), an Engine, or
+    None (a temporary engine is created, the copy runs in its own transaction
+    and the engine is disposed afterwards).
+    """
+    if df is None or df.empty:
+        return 0
+    if con is None:
+        eng = get_engine()
+        try:
+            return copy_dataframe(df, table, eng, chunksize)
+        finally:
+            eng.dispose()
+    if isinstance(con, Engine):
+        with con.begin() as c:
+            return copy_dataframe(df, table, c, chunksize)
+
+    data = _coerce_for_copy(df, _table_column_types(con, table))
+    return _copy_rows(con, data, table, chunksize)
+
+def _copy_rows(con, data: pd.DataFrame, table: str, chunksize: int) -> int:
+    cols = ", ".join(f'"{c}"' for c in data.columns)
+    sql = f"COPY {table} ({cols}) FROM STDIN WITH (FORMAT csv)"
+
+    cur = con.connection.cursor()
+    try:
+        for start in range(0, len(data), chunksize):
+            cur.copy_expert(sql, _copy_csv(data.iloc[start:start + chunksize]))
+    finally:
+        cur.close()
+    return len(data)
+
+
+# -------------------------------------------------------------
+# IDEMPOTENT UPSERT (STAGING TABLE + COPY + ON CONFLICT)
+# -------------------------------------------------------------
+# Rows are COPYed into a transaction-local staging table and merged
+# with INSERT ... ON CONFLICT DO UPDATE. Rows whose values did not
+# change are skipped by the IS DISTINCT FROM guard, so a rebuild of an
+# existing range rewrites only what actually differs and readers never
+# observe the range as empty. `keys` must match a unique index.
+def upsert_dataframe(df: pd.DataFrame, table: str, keys: list, con=None,
+                     chunksize: int = COPY_CHUNK_ROWS) -> int:
+    """Merge `df` into `table` on `keys`; returns rows inserted or changed."""
+    if df is None or df.empty:
+        return 0
+    if con is None:
+        eng = get_engine()
+        try:
+            return upsert_dataframe(df, table, keys, eng, chunksize)
+        finally:
+            eng.dispose()
+    if isinstance(con, Engine):
+        with con.begin() as c:
+            return upsert_dataframe(df, table, keys, c, chunksize)
+
+    data = _coerce_for_copy(df, _table_column_types(con, table))
+    stage = "_stage_" + table.rpartition(".")[2]
+    con.execute(text(f"CREATE TEMP TABLE IF NOT EXISTS {stage} "
+                     f"(LIKE {table} INCLUDING DEFAULTS) ON COMMIT DROP"))
+    con.execute(text(f"TRUNCATE {stage}"))
+    _copy_rows(con, data, stage, chunksize)
+
+    cols    = [f'"{c}"' for c in data.columns]
+    key_sql = ", ".join(f'"{k}"' for k in keys)
+    upd     = [c for c in cols if c.strip('"') not in keys]
+    res = con.execute(text(f"""
+        INSERT INTO {table} AS t ({", ".join(cols)})
+        SELECT DISTINCT ON ({key_sql}) {", ".join(cols)}
+        FROM {stage}
+        ORDER BY {key_sql}
+        ON CONFLICT ({key_sql}) DO UPDATE
+        SET {", ".join(f"{c} = EXCLUDED.{c}" for c in upd)}
+        WHERE ({", ".join(f"t.{c}" for c in upd)})
+              IS DISTINCT FROM ({", ".join(f"EXCLUDED.{c}" for c in upd)})
+    """))
+    return res.rowcount
+
+
+# -------------------------------------------------------------
+# STREAMING READS (SERVER-SIDE CURSORS)
+# -------------------------------------------------------------
+# A plain pd.read_sql() buffers the whole result in psycopg2 and then
+# copies it into a DataFrame. With stream_results the query runs on a
+# named server-side cursor and only READ_CHUNK_ROWS rows are held
+# client-side at a time.
+def iter_query(sql, params: dict = None, con=None, chunksize: int = READ_CHUNK_ROWS,
+               dtype: dict = None, arrow: bool = False, schema: dict = None):
+    """Yield the result of `sql` as DataFrame chunks (or pyarrow RecordBatches).
+
+    `schema` (e.g. utils.schema.FEATURE_SCHEMA) is applied to every chunk, so
+    compact dtypes are reached before chunks are accumulated.
+    """
+    if con is None:
+        eng = get_engine()
+        try:
+            yield from iter_query(sql, params, eng, chunksize, dtype, arrow, schema)
+        finally:
+            eng.dispose()
+        return
+    if isinstance(con, Engine):
+        with con.connect() as c:
+            yield from iter_query(sql, params, c, chunksize, dtype, arrow, schema)
+        return
+
+    stmt = text(sql) if isinstance(sql, str) else sql
+    con = con.execution_options(stream_results=True, max_row_buffer=chunksize)
+    for chunk in pd.read_sql(stmt, con, params=params, chunksize=chunksize, dtype=dtype):
+        if schema is not None:
+            chunk = apply_schema(chunk, schema)
+        if arrow:
+            import pyarrow as pa
+            yield pa.RecordBatch.from_pandas(chunk, preserve_index=False)
+        else:
+            yield chunk
+        del chunk               # not held while the driver decodes the next chunk
+
+def read_query(sql, params: dict = None, con=None, chunksize: int = READ_CHUNK_ROWS,
+               dtype: dict = None, schema: dict = None) -> pd.DataFrame:
+    """Streamed equivalent of pd.read_sql(): chunks are concatenated once at the end."""
+    return concat_frames(iter_query(sql, params, con, chunksize, dtype, schema=schema))
@@ -0,0 +1,296 @@
+"""
+=============================================================
+5G ENERGY OPTIMIZATION – PARQUET FEATURE STORE
+-------------------------------------------------------------
+Description:
+    Columnar snapshot of `cell_features` on local disk, written
+    by feature_job next to the PostgreSQL table. Training and
+    backtests read only the columns and days they need instead
+    of pulling the whole table over the wire.
+
+Layout:
+    <FEATURE_STORE_DIR>/
+        _manifest.json
+        date=YYYY-MM-DD/bucket=NN/part-<seq>.parquet
+
+    Rows are partitioned by UTC day and by a stable hash of
+    cell_id into FEATURE_STORE_BUCKETS buckets (one directory
+    per cell would explode into tiny files at simulator scale).
+    Each write appends one part file per partition it touches;
+    the manifest lists a partition's files in write order with
+    their row counts, plus the ts range and a hash of the Arrow
+    schema. A key written twice lives in two files until the
+    partition is compacted; readers keep the last write.
+
+    `coverage` in the manifest is the ts range the store is known
+    to mirror completely (set by a full feature_job build and
+    extended by the incremental runs that follow it).
+
+Responsibilities:
+    • write_features(df)
+        → Appends rows as new part files with the shared compact
+          dtypes of utils.schema (float32 / dictionary-encoded
+          strings / booleans). Existing files are never rewritten,
+          so the lock is only held to update the manifest.
+    • compact(min_files)
+        → Merges partitions with at least `min_files` part files
+          into one file on (cell_id, ts), last write wins.
+    • read_features(columns, start, end, cell_ids)
+        → Column projection + partition pruning via the
+          manifest; returns a DataFrame ordered by ts.
+    • mark_coverage(start, end, reset) / covers(start, end)
+        → Record / check the completely mirrored ts range.
+    • available()
+        → True when a manifest exists under the store root.
+
+Configuration:
+    FEATURE_STORE_DIR            (default: data/feature_store)
+    FEATURE_STORE_BUCKETS        (default: 16)
+    FEATURE_STORE_COMPACT_FILES  (default: 8)
+=============================================================
+"""
+
+import os
+import json
+import zlib
+import fcntl
+import time
+import hashlib
+import pandas as pd
+from contextlib import contextmanager
+from utils.schema import apply_schema, concat_frames
+
+FEATURE_STORE_DIR     = os.getenv("FEATURE_STORE_DIR", "data/feature_store")
+FEATURE_STORE_BUCKETS = int(os.getenv("FEATURE_STORE_BUCKETS", "16"))
+FEATURE_STORE_COMPACT_FILES = int(os.getenv("FEATURE_STORE_COMPACT_FILES", "8"))
+MANIFEST_FILE         = "_manifest.json"
+STORE_KEYS            = ["cell_id", "ts"]
+
+
+def cell_bucket(cell_id, buckets: int = FEATURE_STORE_BUCKETS) -> int:
+    return zlib.crc32(str(cell_id).encode()) % buckets
+
+
+def _partition_key(day, bucket: int) -> str:
+    return f"date={day}/bucket={bucket:02d}"
+
+
+def schema_hash(table) -> str:
+    desc = ",".join(f"{f.name}:{f.type}" for f in table.schema)
+    return hashlib.sha256(desc.encode()).hexdigest()[:16]
+
+
+def _load_manifest(root: str) -> dict:
+    path = os.path.join(root, MANIFEST_FILE)
+    if not os.path.exists(path):
+        return {"partitions": {}}
+    with open(path) as f:
+        return json.load(f)
+
+
+def _save_manifest(root: str, manifest: dict) -> None:
+    path = os.path.join(root, MANIFEST_FILE)
+    tmp = path + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    os.replace(tmp, path)
+
+
+@contextmanager
+def _locked(root: str):
+    os.makedirs(root, exist_ok=True)
+    with open(os.path.join(root, ".lock"), "w") as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock, fcntl.LOCK_UN)
+
+
+def available(root: str = FEATURE_STORE_DIR) -> bool:
+    return os.path.exists(os.path.join(root, MANIFEST_FILE))
+
+
+def _files(p: dict) -> list:
+    """Part files of a manifest partition in write order (single-file layout before part files)."""
+    return p.get("files") or [{"name": "part.parquet", "rows": p["rows"]}]
+
+
+def _part_name() -> str:
+    return f"part-{time.time_ns():020d}-{os.getpid()}.parquet"
+
+
+def _write_part(root: str, key: str, part: pd.DataFrame):
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    table = pa.Table.from_pandas(part, preserve_index=False)
+    name = _part_name()
+    path = os.path.join(root, key, name)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    pq.write_table(table, path + ".tmp", compression="zstd")
+    os.replace(path + ".tmp", path)
+    return name, table
+
+
+def _update_totals(manifest: dict, buckets: int) -> None:
+    manifest["buckets"] = buckets
+    manifest["rows"] = sum(p["rows"] for p in manifest["partitions"].values())
+
+
+def write_features(df: pd.DataFrame, root: str = FEATURE_STORE_DIR,
+                   buckets: int = FEATURE_STORE_BUCKETS) -> int:
+    """Append `df` to the store (one part file per partition); returns rows written."""
+    if df is None or df.empty:
+        return 0
+    df = df.copy()
+    df["ts"] = pd.to_datetime(df["ts"], utc=True)
+    day = df["ts"].dt.strftime("%Y-%m-%d")
+    bucket = df["cell_id"].map(lambda c: cell_bucket(c, buckets))
+
+    written = []
+    for (d, b), part in df.groupby([day, bucket], sort=False):
+        key = _partition_key(d, b)
+        part = apply_schema(part.drop_duplicates(subset=STORE_KEYS, keep="last")
+                                .sort_values(STORE_KEYS, kind="mergesort").reset_index(drop=True))
+        name, table = _write_part(root, key, part)
+        written.append((key, d, int(b), name, part, table))
+
+    with _locked(root):
+        manifest = _load_manifest(root)
+        for key, d, b, name, part, table in written:
+            p = manifest["partitions"].get(key)
+            files = (_files(p) if p else []) + [{"name": name, "rows": int(len(part))}]
+            lo, hi = part["ts"].min(), part["ts"].max()
+            if p:
+                lo, hi = min(lo, pd.Timestamp(p["min_ts"])), max(hi, pd.Timestamp(p["max_ts"]))
+            manifest["partitions"][key] = {
+                "date": d, "bucket": b, "files": files, "rows": sum(f["rows"] for f in files),
+                "min_ts": lo.isoformat(), "max_ts": hi.isoformat(),
+                "schema_hash": schema_hash(table),
+            }
+            manifest["schema_hash"] = schema_hash(table)
+            manifest["columns"] = [f.name for f in table.schema]
+        _update_totals(manifest, buckets)
+        _save_manifest(root, manifest)
+    return len(df)
+
+
+def _read_partition(root: str, key: str, files: list, columns=None, filters=None):
+    """Rows of the given part files, later files winning on (cell_id, ts)."""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    tables = [pq.read_table(os.path.join(root, key, f["name"]), columns=columns, filters=filters)
+              for f in files]
+    df = pa.concat_tables(tables, promote_options="permissive").to_pandas()
+    if len(files) > 1:
+        df = df.drop_duplicates(subset=STORE_KEYS, keep="last")
+    return df
+
+
+def compact(root: str = FEATURE_STORE_DIR, min_files: int = FEATURE_STORE_COMPACT_FILES) -> int:
+    """Merge every partition with at least `min_files` part files into one; returns partitions compacted.
+
+    The lock is only held to snapshot and swap a partition's file list, so
+    writers keep appending meanwhile; files they add stay after the merged one.
+    """
+    if not available(root):
+        return 0
+    todo = [k for k, p in _load_manifest(root)["partitions"].items() if len(_files(p)) >= min_files]
+    for key in todo:
+        with _locked(root):
+            files = _files(_load_manifest(root)["partitions"][key])
+        part = apply_schema(_read_partition(root, key, files)
+                            .sort_values(STORE_KEYS, kind="mergesort").reset_index(drop=True))
+        name, table = _write_part(root, key, part)
+        with _locked(root):
+            manifest = _load_manifest(root)
+            p = manifest["partitions"][key]
+            merged = {f["name"] for f in files}
+            rest = [f for f in _files(p) if f["name"] not in merged]
+            p["files"] = [{"name": name, "rows": int(len(part))}] + rest
+            p["rows"] = sum(f["rows"] for f in p["files"])
+            if not rest:
+                p["schema_hash"] = schema_hash(table)
+            _update_totals(manifest, manifest.get("buckets", FEATURE_STORE_BUCKETS))
+            _save_manifest(root, manifest)
+        for f in merged:
+            try:
+                os.remove(os.path.join(root, key, f))
+            except FileNotFoundError:
+                pass
+    return len(todo)
+
+
+def mark_coverage(start, end, reset: bool = False, root: str = FEATURE_STORE_DIR) -> None:
+    """Record that every cell_features row with ts in [start, end] has been written.
+
+    `reset` starts over (full rebuild); otherwise the range is merged into the
+    recorded coverage only when the two overlap, so a gap is never papered over.
+    """
+    start, end = pd.Timestamp(start).tz_convert("UTC"), pd.Timestamp(end).tz_convert("UTC")
+    with _locked(root):
+        manifest = _load_manifest(root)
+        cov = manifest.get("coverage")
+        if not reset and cov is None:
+            return
+        if not reset:
+            lo, hi = pd.Timestamp(cov["from"]), pd.Timestamp(cov["to"])
+            if start > hi or end < lo:
+                return
+            start, end = min(start, lo), max(end, hi)
+        manifest["coverage"] = {"from": start.isoformat(), "to": end.isoformat()}
+        _save_manifest(root, manifest)
+
+
+def covers(start, end, root: str = FEATURE_STORE_DIR) -> bool:
+    """True when the recorded coverage contains [start, end]."""
+    cov = _load_manifest(root).get("coverage") if available(root) else None
+    if cov is None or start is None or end is None:
+        return False
+    return (pd.Timestamp(cov["from"]) <= pd.Timestamp(start).tz_convert("UTC")
+            and pd.Timestamp(end).tz_convert("UTC") <= pd.Timestamp(cov["to"]))
+
+
+def read_features(columns: list = None, start=None, end=None, cell_ids=None,
+                  root: str = FEATURE_STORE_DIR) -> pd.DataFrame:
+    """Load features from the store, reading only matching partitions and columns."""
+    start = pd.to_datetime(start, utc=True) if start is not None else None
+    end = pd.to_datetime(end, utc=True) if end is not None else None
+
+    filters = []
+    if start is not None: filters.append(("ts", ">=", start))
+    if end is not None:   filters.append(("ts", "<=", end))
+    if cell_ids is not None: filters.append(("cell_id", "in", list(cell_ids)))
+
+    for attempt in range(3):
+        manifest = _load_manifest(root)
+        buckets = manifest.get("buckets", FEATURE_STORE_BUCKETS)
+        wanted = {cell_bucket(c, buckets) for c in cell_ids} if cell_ids is not None else None
+
+        parts = []
+        for key, p in sorted(manifest["partitions"].items()):
+            if start is not None and pd.Timestamp(p["max_ts"]) < start: continue
+            if end is not None and pd.Timestamp(p["min_ts"]) > end: continue
+            if wanted is not None and p["bucket"] not in wanted: continue
+            parts.append((key, _files(p)))
+
+        read_cols = None
+        if columns is not None:
+            read_cols = list(dict.fromkeys(list(columns) + ["ts", "cell_id"]))
+            read_cols = [c for c in read_cols if c in manifest.get("columns", read_cols)]
+        try:
+            frames = [_read_partition(root, key, files, read_cols, filters or None)
+                      for key, files in parts]
+            break
+        except FileNotFoundError:
+            if attempt == 2:                                  # compacted away under us three times
+                raise
+    if not frames:
+        return pd.DataFrame(columns=read_cols or manifest.get("columns", []))
+    df = apply_schema(concat_frames(frames))
+    df = df.sort_values(["ts", "cell_id"], kind="mergesort").reset_index(drop=True)
+    if columns is not None:
+        df = df[[c for c in columns if c in df.columns]]
+    return df
@@ -0,0 +1,335 @@
+"""
+=============================================================
+5G ENERGY OPTIMIZATION – FEATURE ENGINE MODULE
+-------------------------------------------------------------
+Description:
+    Vectorized lag / rolling-window feature computation shared
+    by the feature pipeline. The frame is sorted once by
+    (cell_id, ts); every time-based window is resolved to a
+    start index per row and reused by all source columns.
+
+Responsibilities:
+    • FEATURE_SPEC / load_feature_spec()
+        → Declarative spec of every lag / rolling output column
+          (source, op, window or periods); YAML override via
+          FEATURE_SPEC_FILE.
+    • compile_plan(spec, required)
+        → Deduplicated FeaturePlan restricted to the required
+          outputs (e.g. the feature lists of active models).
+          FULL_PLAN is the compiled load_feature_spec(), so a YAML
+          spec drives the default plan as well as --prune.
+    • compute_plan(df, plan) / compute_lag_rolling(df)
+        → Adds the planned lag / rolling columns in a single
+          pass (no groupby().apply).
+    • forward_targets(df, horizons)
+        → Multi-horizon future targets (dl_mbps_mean_fwd_<h>m) with
+          one searchsorted per cell block and horizon.
+    • Rolling mean/std use cumulative sums over the shared
+      window index; rolling min/max use a sparse table
+      (range-min/max queries in O(1) per row).
+
+Semantics:
+    Matches pandas `groupby("cell_id")` + `rolling("<w>", min_periods=1)`
+    on a ts index: window = (ts - w, ts], NaNs are skipped,
+    std uses ddof=1 and is NaN for fewer than two observations.
+
+Used by:
+    • feature_job.py        → compute_features(), build_features_from_db(prune=True)
+=============================================================
+"""
+
+import os
+import re
+from typing import NamedTuple
+import numpy as np
+import pandas as pd
+
+
+# Declarative spec: output column → {source, op, periods | window}.
+#   op "lag"                        → value `periods` rows earlier in the cell
+#   op "mean" | "std" | "min" | "max" → rolling statistic over (ts - window, ts]
+# FEATURE_SPEC_FILE may point to a YAML file with the same mapping.
+FEATURE_SPEC = {
+    "rsrp_lag1":    {"source": "rsrp", "op": "lag", "periods": 1},
+    "rsrp_lag3":    {"source": "rsrp", "op": "lag", "periods": 3},
+    "rsrq_lag1":    {"source": "rsrq", "op": "lag", "periods": 1},
+    "rsrq_lag3":    {"source": "rsrq", "op": "lag", "periods": 3},
+    "snr_lag1":     {"source": "snr", "op": "lag", "periods": 1},
+    "snr_lag3":     {"source": "snr", "op": "lag", "periods": 3},
+    "ping_lag1":    {"source": "ping_avg_ms", "op": "lag", "periods": 1},
+    "dl_lag1":      {"source": "dl_mbps", "op": "lag", "periods": 1},
+    "rsrp_roll15m": {"source": "rsrp", "op": "mean", "window": "15min"},
+    "rsrq_roll15m": {"source": "rsrq", "op": "mean", "window": "15min"},
+    "snr_roll15m":  {"source": "snr", "op": "mean", "window": "15min"},
+    "ping_roll15m": {"source": "ping_avg_ms", "op": "mean", "window": "15min"},
+    "dl_roll15m":   {"source": "dl_mbps", "op": "mean", "window": "15min"},
+}
+for _col in ["dl_mbps", "rsrp", "snr"]:
+    for _label, _w in {"30m": "30min", "1h": "1h", "3h": "3h"}.items():
+        for _stat in (["mean", "std", "min", "max"] if _col == "dl_mbps" else ["mean", "std"]):
+            FEATURE_SPEC[f"{_col}_{_label}_{_stat}"] = {"source": _col, "op": _stat, "window": _w}
+
+ROLLING_OPS = ("mean", "std", "min", "max")
+
+# Forward-target horizons (minutes) written as dl_mbps_mean_fwd_<h>m columns.
+TARGET_HORIZONS = (15, 60, 240)
+
+
+def load_feature_spec(path: str = None) -> dict:
+    """FEATURE_SPEC, or the mapping in `path` / $FEATURE_SPEC_FILE when set."""
+    path = path or os.getenv("FEATURE_SPEC_FILE")
+    if not path:
+        return FEATURE_SPEC
+    import yaml
+    with open(path) as f:
+        return yaml.safe_load(f)
+
+
+class FeaturePlan(NamedTuple):
+    """Compiled spec: unique lag / rolling computations plus output aliases."""
+    lags: dict      # name → (source, periods)
+    rolling: dict   # name → (source, window, stat)
+    aliases: dict   # duplicate name → name it is copied from
+
+    @property
+    def columns(self) -> list:
+        return list(self.lags) + list(self.rolling) + list(self.aliases)
+
+    @property
+    def max_lag(self) -> int:
+        return max((p for _, p in self.lags.values()), default=0)
+
+    @property
+    def max_window(self) -> pd.Timedelta:
+        return max((pd.Timedelta(w) for _, w, _ in self.rolling.values()), default=pd.Timedelta(0))
+
+
+def compile_plan(spec: dict = None, required=None) -> FeaturePlan:
+    """Deduplicate `spec` into a FeaturePlan, keeping only `required` outputs (None = all).
+
+    Two outputs with the same (op, source, window/periods) are computed once;
+    the second becomes an alias of the first. Output names become
+    `cell_features` columns, so they must be lower-case SQL identifiers.
+    """
+    spec = load_feature_spec() if spec is None else spec
+    lags, rolling, aliases, seen = {}, {}, {}, {}
+    for name, s in spec.items():
+        if required is not None and name not in required:
+            continue
+        if not re.fullmatch(r"[a-z_][a-z0-9_]*", name):
+            raise ValueError(f"{name!r}: feature names must match [a-z_][a-z0-9_]*")
+        op, src = s["op"], s["source"]
+        if op == "lag":
+            key = (op, src, int(s["periods"]))
+        elif op in ROLLING_OPS:
+            key = (op, src, pd.Timedelta(s["window"]))
+        else:
+            raise ValueError(f"{name}: unsupported op {op!r}")
+        if key in seen:
+            aliases[name] = seen[key]
+            continue
+        seen[key] = name
+        if op == "lag":
+            lags[name] = (src, int(s["periods"]))
+        else:
+            rolling[name] = (src, s["window"], op)
+    return FeaturePlan(lags, rolling, aliases)
+
+
+FULL_PLAN = compile_plan(load_feature_spec())
+LAG_FEATURES = FULL_PLAN.lags
+ROLLING_FEATURES = FULL_PLAN.rolling
+
+
+def _ts_ns(s: pd.Series) -> np.ndarray:
+    return pd.DatetimeIndex(pd.to_datetime(s, utc=True)).as_unit("ns").asi8
+
+
+def group_bounds(keys: np.ndarray):
+    """Return (starts, lengths) of contiguous runs in a sorted key array."""
+    n = len(keys)
+    if n == 0:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+    starts = np.r_[0, np.flatnonzero(keys[1:] != keys[:-1]) + 1]
+    lengths = np.diff(np.r_[starts, n])
+    return starts, lengths
+
+
+def window_starts(ts_ns: np.ndarray, starts: np.ndarray, lengths: np.ndarray, window_ns: int) -> np.ndarray:
+    """First row index inside (ts - window, ts] for every row, bounded by its group."""
+    out = np.empty(len(ts_ns), dtype=np.int64)
+    for s, n in zip(starts, lengths):
+        block = ts_ns[s:s + n]
+        out[s:s + n] = s + np.searchsorted(block, block - window_ns, side="right")
+    return out
+
+
+class _Cumulative:
+    """Per-group prefix sums of a column, centered on the group mean for stability."""
+
+    def __init__(self, x: np.ndarray, starts: np.ndarray, lengths: np.ndarray):
+        valid = ~np.isnan(x)
+        xc = np.where(valid, x, 0.0)
+        self.n = np.empty(len(x), dtype=np.int64)
+        self.s = np.empty(len(x))
+        self.q = np.empty(len(x))
+        self.center = np.empty(len(x))
+        for st, ln in zip(starts, lengths):
+            sl = slice(st, st + ln)
+            n = np.cumsum(valid[sl], dtype=np.int64)
+            c = xc[sl].sum() / n[-1] if n[-1] else 0.0
+            d = np.where(valid[sl], xc[sl] - c, 0.0)
+            self.n[sl], self.s[sl], self.q[sl] = n, np.cumsum(d), np.cumsum(d * d)
+            self.center[sl] = c
+        self.group_start = np.repeat(starts, lengths)
+
+    def _window(self, prefix: np.ndarray, lo: np.ndarray) -> np.ndarray:
+        before = np.where(lo > self.group_start, prefix[np.maximum(lo - 1, 0)], 0)
+        return prefix - before
+
+    def mean(self, lo: np.ndarray) -> np.ndarray:
+        n, s = self._window(self.n, lo), self._window(self.s, lo)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return np.where(n > 0, s / n + self.center, np.nan)
+
+    def std(self, lo: np.ndarray) -> np.ndarray:
+        n, s, q = self._window(self.n, lo), self._window(self.s, lo), self._window(self.q, lo)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            var = (q - s * s / n) / (n - 1)
+        return np.where(n > 1, np.sqrt(np.clip(var, 0.0, None)), np.nan)
+
+
+class _SparseTable:
+    """Range min/max over [lo, hi] in O(1) per query (NaNs ignored)."""
+
+    def __init__(self, x: np.ndarray, max_len: int, op):
+        self.op = op
+        self.levels = [x]
+        k = 1
+        while 2 * k <= max_len:
+            prev = self.levels[-1]
+            nxt = prev.copy()
+            with np.errstate(invalid="ignore"):
+                nxt[:-k] = op(prev[:-k], prev[k:])
+            self.levels.append(nxt)
+            k *= 2
+
+    def query(self, lo: np.ndarray) -> np.ndarray:
+        hi = np.arange(len(lo))
+        length = hi - lo + 1
+        k = np.floor(np.log2(length)).astype(np.int64)
+        out = np.empty(len(lo))
+        for level in np.unique(k):
+            m = k == level
+            table = self.levels[level]
+            with np.errstate(invalid="ignore"):
+                out[m] = self.op(table[lo[m]], table[hi[m] - (1 << level) + 1])
+        return out
+
+
+def window_ends(ts_ns: np.ndarray, starts: np.ndarray, lengths: np.ndarray, ahead_ns: int) -> np.ndarray:
+    """Last row index with ts <= ts + ahead for every row, bounded by its group."""
+    out = np.empty(len(ts_ns), dtype=np.int64)
+    for s, n in zip(starts, lengths):
+        block = ts_ns[s:s + n]
+        out[s:s + n] = s + np.searchsorted(block, block + ahead_ns, side="right") - 1
+    return out
+
+
+def target_column(horizon_minutes: int, source: str = "dl_mbps_mean") -> str:
+    return f"{source}_fwd_{horizon_minutes}m"
+
+
+def forward_targets(df: pd.DataFrame, horizons=TARGET_HORIZONS, source: str = "dl_mbps_mean",
+                    by: str = "cell_id", on: str = "ts") -> dict:
+    """Future value of `source` per row for each horizon (minutes), in one pass.
+
+    `df` must be sorted by (by, on), as compute_plan() returns it. The target
+    at horizon h is the last known value of the same cell at or before ts + h
+    (NULL samples are skipped); it is NaN only while the cell has no value yet.
+    Returns {target_column(h, source): ndarray aligned with df}.
+    """
+    n = len(df)
+    if n == 0:
+        return {target_column(h, source): np.zeros(0) for h in horizons}
+    starts, lengths = group_bounds(df[by].to_numpy())
+    ts_ns = _ts_ns(df[on])
+    x = (pd.to_numeric(df[source], errors="coerce").to_numpy(dtype=float, na_value=np.nan)
+         if source in df.columns else np.full(n, np.nan))
+
+    # index of the last non-NaN value at or before each row, within its cell
+    idx = np.where(np.isnan(x), -1, np.arange(n))
+    last_valid = np.maximum.accumulate(idx)
+    last_valid[last_valid < np.repeat(starts, lengths)] = -1
+    filled = np.where(last_valid >= 0, x[np.maximum(last_valid, 0)], np.nan)
+
+    return {target_column(h, source): filled[window_ends(ts_ns, starts, lengths, pd.Timedelta(minutes=h).value)]
+            for h in horizons}
+
+
+def compute_lag_rolling(df: pd.DataFrame, lags: dict = None, rolling: dict = None,
+                        by: str = "cell_id", on: str = "ts") -> pd.DataFrame:
+    """Sort once by (by, on) and append all lag / rolling feature columns."""
+    lags = LAG_FEATURES if lags is None else lags
+    rolling = ROLLING_FEATURES if rolling is None else rolling
+
+    df = df.sort_values([by, on], kind="mergesort").reset_index(drop=True)
+    n = len(df)
+    if n == 0:
+        return df.assign(**{c: np.nan for c in list(lags) + list(rolling)})
+    keys = df[by].to_numpy()
+    ts_ns = _ts_ns(df[on])
+    starts, lengths = group_bounds(keys)
+    row_group_start = np.repeat(starts, lengths)
+
+    new_cols = {}
+    source = {}
+
+    def values(col):
+        if col not in source:
+            source[col] = (pd.to_numeric(df[col], errors="coerce").to_numpy(dtype=float, na_value=np.nan)
+                           if col in df.columns else np.full(n, np.nan))
+        return source[col]
+
+    idx = np.arange(n)
+    for name, (col, periods) in lags.items():
+        x = values(col)
+        src = idx - periods
+        ok = src >= row_group_start
+        out = np.full(n, np.nan)
+        out[ok] = x[src[ok]]
+        new_cols[name] = out
+
+    window_lo = {}
+    for _, (_, w, _) in rolling.items():
+        if w not in window_lo:
+            window_lo[w] = window_starts(ts_ns, starts, lengths, pd.Timedelta(w).value)
+
+    cumulative, tables = {}, {}
+    for name, (col, w, stat) in rolling.items():
+        x, lo = values(col), window_lo[w]
+        if stat in ("mean", "std"):
+            if col not in cumulative:
+                cumulative[col] = _Cumulative(x, starts, lengths)
+            new_cols[name] = getattr(cumulative[col], stat)(lo)
+        elif stat in ("min", "max"):
+            if (col, stat) not in tables:
+                max_len = max(int((idx - window_lo[wi] + 1).max()) if n else 1
+                              for (c, wi, st) in rolling.values() if c == col and st == stat)
+                tables[(col, stat)] = _SparseTable(x, max_len, np.fmin if stat == "min" else np.fmax)
+            new_cols[name] = tables[(col, stat)].query(lo)
+        else:
+            raise ValueError(f"Unsupported rolling statistic: {stat}")
+
+    df = df.drop(columns=[c for c in new_cols if c in df.columns])
+    return pd.concat([df, pd.DataFrame(new_cols, index=df.index)], axis=1)
+
+
+def compute_plan(df: pd.DataFrame, plan: FeaturePlan = None,
+                 by: str = "cell_id", on: str = "ts") -> pd.DataFrame:
+    """Run a compiled FeaturePlan: unique computations once, aliases copied."""
+    plan = FULL_PLAN if plan is None else plan
+    df = compute_lag_rolling(df, plan.lags, plan.rolling, by=by, on=on)
+    if plan.aliases:
+        df = df.assign(**{a: df[src] for a, src in plan.aliases.items()})
+    return df
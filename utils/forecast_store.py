@@ -0,0 +1,62 @@
+"""
+=============================================================
+5G ENERGY OPTIMIZATION – FORECAST ARTIFACT STORE
+-------------------------------------------------------------
+Description:
+    Compact per-(cell, model) artifacts of the state-space
+    forecasters (ARIMA / SARIMA) in forecast_job, so a rerun can
+    continue from the previous fit instead of starting over.
+
+    One compressed .npz per artifact:
+        <FORECAST_ARTIFACT_DIR>/<model_name>/<cell_id>.npz
+    holding
+        spec       → model specification the params belong to
+        params     → fitted parameter vector
+        state      → predicted state for the step after last_ts
+        state_cov  → its covariance
+        last_ts    → last observation filtered (ns)
+        fitted_at  → last observation of the latest parameter fit (ns)
+        nobs       → observations in that fit
+
+Responsibilities:
+    • save_artifact(cell_id, model_name, **arrays) → atomic write
+    • load_artifact(cell_id, model_name)           → dict or None
+
+Configuration:
+    FORECAST_ARTIFACT_DIR (default: models/forecast_state)
+=============================================================
+"""
+
+import os
+from urllib.parse import quote
+import numpy as np
+
+FORECAST_ARTIFACT_DIR = os.getenv("FORECAST_ARTIFACT_DIR", os.path.join("models", "forecast_state"))
+
+
+def artifact_path(cell_id, model_name: str, root: str = None) -> str:
+    return os.path.join(root or FORECAST_ARTIFACT_DIR, model_name, quote(str(cell_id), safe="") + ".npz")
+
+
+def save_artifact(cell_id, model_name: str, root: str = None, **arrays) -> str:
+    """Write the artifact of (cell_id, model_name); readers never see a partial file."""
+    path = artifact_path(cell_id, model_name, root)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as f:
+        np.savez_compressed(f, **arrays)
+    os.replace(tmp, path)
+    return path
+
+
+def load_artifact(cell_id, model_name: str, root: str = None):
+    """Artifact arrays as a dict (0-d arrays unwrapped), or None when missing / unreadable."""
+    path = artifact_path(cell_id, model_name, root)
+    if not os.path.exists(path):
+        return None
+    try:
+        with np.load(path, allow_pickle=False) as z:
+            return {k: (z[k].item() if z[k].ndim == 0 else z[k]) for k in z.files}
+    except Exception as e:
+        print(f" Ignoring unreadable forecast artifact {path}: {e}")
+        return None
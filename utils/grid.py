@@ -0,0 +1,96 @@
+"""
+=============================================================
+5G ENERGY OPTIMIZATION – SPATIAL GRID KEY
+-------------------------------------------------------------
+Description:
+    Integer key for the spatial grid used to group cells on
+    the map. Each (lat, lon) falls into a square of
+    GRID_STEP_DEG degrees (≈300 m); the square is encoded as
+
+        grid_key = row * GRID_COLS + col
+        row = floor((lat + 90)  / step)
+        col = floor((lon + 180) / step)
+
+    so keys are plain int64 values PostgreSQL can index,
+    group and range-filter, and decode back to the square.
+
+Responsibilities:
+    • grid_key(lat, lon)           → int64 keys (NULL where lat/lon is NULL)
+    • grid_label(key)              → "<row>_<col>" text form (cell_features.grid_id)
+    • decode_grid_key(key)         → (lat, lon) of the square centre
+    • grid_key_range(lat, lon)     → key / column bounds for bbox filters:
+          grid_key BETWEEN key_lo AND key_hi            (index range scan)
+          AND grid_key % cols BETWEEN col_lo AND col_hi  (residual filter)
+
+Configuration:
+    GRID_SIZE_M   (default: 300 → 0.003°, otherwise 0.005°)
+=============================================================
+"""
+
+import os
+import math
+import numpy as np
+import pandas as pd
+
+GRID_SIZE_M = int(os.getenv("GRID_SIZE_M", "300"))
+
+
+def grid_step(size_m: int = GRID_SIZE_M) -> float:
+    return 0.003 if size_m == 300 else 0.005
+
+
+def grid_cols(size_m: int = GRID_SIZE_M) -> int:
+    return math.ceil(360 / grid_step(size_m))
+
+
+def grid_key(lat, lon, size_m: int = GRID_SIZE_M):
+    """Int64 grid key for array-likes (nullable Int64 Series) or scalars (int / None)."""
+    step, cols = grid_step(size_m), grid_cols(size_m)
+    if np.isscalar(lat):
+        lat, lon = float(lat), float(lon)
+        if math.isnan(lat) or math.isnan(lon):
+            return None
+        return math.floor((lat + 90.0) / step) * cols + math.floor((lon + 180.0) / step)
+    lat = pd.to_numeric(pd.Series(lat), errors="coerce").to_numpy(dtype=float, na_value=np.nan)
+    lon = pd.to_numeric(pd.Series(lon), errors="coerce").to_numpy(dtype=float, na_value=np.nan)
+    ok = ~(np.isnan(lat) | np.isnan(lon))
+    key = np.zeros(len(lat), dtype=np.int64)
+    key[ok] = (np.floor((lat[ok] + 90.0) / step).astype(np.int64) * cols
+               + np.floor((lon[ok] + 180.0) / step).astype(np.int64))
+    return pd.Series(pd.arrays.IntegerArray(key, ~ok))
+
+
+def grid_label(key, size_m: int = GRID_SIZE_M) -> pd.Series:
+    """"<row>_<col>" labels for grid keys; formatted once per distinct key."""
+    key = pd.Series(key, dtype="Int64")
+    ok = key.notna().to_numpy()
+    uniq, inv = np.unique(key[ok].to_numpy(dtype=np.int64), return_inverse=True)
+    rows, cols = np.divmod(uniq, grid_cols(size_m))
+    labels = np.array([f"{r}_{c}" for r, c in zip(rows, cols)], dtype=object)
+    out = np.full(len(key), None, dtype=object)
+    out[ok] = labels[inv]
+    return pd.Series(out, index=key.index)
+
+
+def decode_grid_key(key, size_m: int = GRID_SIZE_M):
+    """(lat, lon) of the centre of each grid square."""
+    step, cols = grid_step(size_m), grid_cols(size_m)
+    key = np.asarray(key, dtype=np.int64)
+    row, col = np.divmod(key, cols)
+    return (row + 0.5) * step - 90.0, (col + 0.5) * step - 180.0
+
+
+def grid_key_range(lat_min: float, lat_max: float, lon_min: float, lon_max: float,
+                   size_m: int = GRID_SIZE_M) -> dict:
+    """Bounds of a bounding box as SQL parameters for grid_key filters.
+
+    Keys are row-major, so every square of the box lies in
+    [key_lo, key_hi] = [row_lo * cols + col_lo, row_hi * cols + col_hi]
+    (sargable on the grid_key index); col_lo / col_hi drop the squares of
+    the rows in between that fall outside the box.
+    """
+    step, cols = grid_step(size_m), grid_cols(size_m)
+    row_lo, row_hi = math.floor((lat_min + 90.0) / step), math.floor((lat_max + 90.0) / step)
+    col_lo, col_hi = math.floor((lon_min + 180.0) / step), math.floor((lon_max + 180.0) / step)
+    return {"row_lo": row_lo, "row_hi": row_hi, "col_lo": col_lo, "col_hi": col_hi, "cols": cols,
+            "key_lo": row_lo * cols + col_lo, "key_hi": row_hi * cols + col_hi}
@@ -16,11 +16,15 @@ Responsibilities:
         → Retrieves the best-performing model from the 
           PostgreSQL model_metrics table (based on MAPE 
           or latest training time).
+    • active_feature_columns()
+        → Union of the saved feature lists of all active
+          models in model_registry (None if unknown).
 
 Used by:
     • train_job.py          → Saves trained models
     • inference_job.py      → Loads models for prediction
     • policy_job.py         → Selects active model variants
+    • feature_job.py        → Prunes the feature plan (--prune)
 =============================================================
 """
 
@@ -65,3 +69,21 @@ def select_best_model(task="regression"):
                 LIMIT 1
             """)).fetchone()
     return row[0] if row else None
+
+
+def active_feature_columns():
+    """Columns used by the active models, or None when that cannot be determined
+    (no active model, or an active model without a saved feature list)."""
+    eng = get_engine()
+    with eng.connect() as con:
+        names = [r[0] for r in con.execute(text(
+            "SELECT DISTINCT model_name FROM model_registry WHERE is_active"))]
+    if not names:
+        return None
+    cols = set()
+    for name in names:
+        path = f"{MODEL_DIR}/feature_list_{name}.pkl"
+        if not os.path.exists(path):
+            return None
+        cols.update(joblib.load(path))
+    return cols
@@ -0,0 +1,164 @@
+"""
+=============================================================
+5G ENERGY OPTIMIZATION – FEATURE DTYPE SCHEMA
+-------------------------------------------------------------
+Description:
+    Single definition of the in-memory dtypes of `cell_features`
+    frames. Every job that loads or writes feature frames applies
+    it, so the same column always has the same compact dtype:
+
+        • low-cardinality text  → category
+        • DB booleans (flags)   → nullable boolean
+        • small DB integers     → Int8 (nullable); grid_key → Int64
+        • numeric / double      → float32
+          (coordinates stay float64: ~0.5 m precision in float32)
+
+    Flags stay boolean rather than int8 on purpose: training and
+    inference build X from the `select_dtypes(np.number)` columns
+    (model_matrix), which skips booleans, so model feature sets are
+    unchanged.
+
+Responsibilities:
+    • apply_schema(df)
+        → Casts the columns of `df` that the schema knows about;
+          any other float64 column is downcast to float32.
+    • concat_frames(frames)
+        → Column-wise concatenation of (streamed) chunks that keeps
+          categoricals categorical and never holds the chunks and
+          the full result side by side; the heap pages the chunks
+          leave behind are returned to the OS (glibc malloc_trim).
+    • model_matrix(df, exclude | columns, fill)
+        → float32 model input filled column by column into one
+          preallocated array (same columns and values as
+          select_dtypes(np.number).drop(...).fillna(...).astype(float32),
+          without the intermediate full-size copies).
+
+Used by:
+    • utils.db.read_query / iter_query   (schema=...)
+    • utils.feature_store                (write + read)
+    • utils.training, jobs.inference_job, policy.policy_engine
+      (training / inference also build X with model_matrix)
+=============================================================
+"""
+
+import ctypes
+import ctypes.util
+import numpy as np
+import pandas as pd
+from pandas.api.types import union_categoricals
+
+try:
+    _malloc_trim = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6").malloc_trim
+except (OSError, AttributeError):       # not glibc (macOS, musl): nothing to trim
+    _malloc_trim = None
+
+CATEGORY_COLUMNS = [
+    "cell_id", "operator", "net_mode", "state", "grid_id",
+    "cellhex", "nodehex", "lachex", "rawcellid",
+    "signal_class", "trend_label", "class_label", "action", "model_name",
+]
+BOOL_COLUMNS = ["is_weekend", "is_night", "is_peak_hour", "load_proxy", "is_anomaly"]
+INT_COLUMNS = {
+    "hour_of_day": "Int8",
+    "day_of_week": "Int8",
+    "day_type": "Int8",
+    "ping_loss_binary": "Int8",
+    "grid_key": "Int64",
+}
+FLOAT64_COLUMNS = ["latitude", "longitude", "grid_lat_bin", "grid_lon_bin"]
+
+FEATURE_SCHEMA = {
+    **{c: "category" for c in CATEGORY_COLUMNS},
+    **{c: "boolean" for c in BOOL_COLUMNS},
+    **INT_COLUMNS,
+    **{c: "float64" for c in FLOAT64_COLUMNS},
+}
+
+
+def _cast(s: pd.Series, dtype: str) -> pd.Series:
+    if dtype == "category":
+        return s if isinstance(s.dtype, pd.CategoricalDtype) else s.astype("category")
+    if dtype == "boolean":
+        if s.dtype == object:
+            s = s.map(lambda v: None if v is None or (isinstance(v, float) and np.isnan(v)) else bool(v))
+        return s.astype("boolean")
+    if dtype.startswith("Int"):
+        return pd.to_numeric(s, errors="coerce").round().astype(dtype)
+    return pd.to_numeric(s, errors="coerce").astype(dtype)
+
+
+def apply_schema(df: pd.DataFrame, schema: dict = None, default_float: str = "float32") -> pd.DataFrame:
+    """Return `df` with schema dtypes applied; unknown float64 columns → `default_float`."""
+    schema = FEATURE_SCHEMA if schema is None else schema
+    out = {}
+    for col in df.columns:
+        s = df[col]
+        if col in schema:
+            s = _cast(s, schema[col])
+        elif s.dtype == np.float64 and default_float:
+            s = s.astype(default_float)
+        out[col] = s
+    return pd.DataFrame(out, index=df.index, copy=False)
+
+
+def concat_frames(frames) -> pd.DataFrame:
+    """Concatenate chunk frames column by column, keeping categoricals.
+
+    `frames` may be a generator: each chunk is split into per-column pieces
+    as it arrives, and each column is concatenated and its pieces released
+    before the next, so the peak stays near the size of the result instead
+    of twice it. Categories are unioned instead of falling back to object.
+    """
+    pieces, n = {}, 0
+    for f in frames:
+        if f is None:
+            continue
+        for col in f.columns:
+            pieces.setdefault(col, []).append(f[col].reset_index(drop=True).copy())
+        n += 1
+        del f                   # only the copied pieces survive until the next chunk
+    if n == 0:
+        return pd.DataFrame()
+
+    out = {}
+    for col in list(pieces):
+        parts = pieces.pop(col)
+        if len(parts) == 1:
+            out[col] = parts[0]
+        elif all(isinstance(p.dtype, pd.CategoricalDtype) for p in parts):
+            out[col] = pd.Series(union_categoricals(parts), name=col)
+        else:
+            out[col] = pd.concat(parts, ignore_index=True)
+        del parts
+    # the released pieces sit between the result columns on the heap, where
+    # free() cannot return them; without this the process keeps ~40% of the
+    # frame's size as dead resident memory under the model matrix built next
+    if _malloc_trim is not None:
+        _malloc_trim(0)
+    return pd.DataFrame(out, copy=False)
+
+
+def model_matrix(df: pd.DataFrame, exclude=(), columns: list = None, fill=0.0) -> pd.DataFrame:
+    """float32 model input from the numeric columns of `df`, built in one allocation.
+
+    `columns` fixes the output columns (missing / non-numeric ones are 0, like
+    reindex(fill_value=0)); otherwise every numeric column not in `exclude` is
+    used. NaNs become `fill`, or each column's median with fill="median". The
+    result wraps a single float32 block, so `.to_numpy()` returns it without a copy.
+    """
+    numeric = set(df.select_dtypes(include=[np.number]).columns)
+    if columns is None:
+        skip = set(exclude)
+        columns = [c for c in df.columns if c in numeric and c not in skip]
+    out = np.empty((len(df), len(columns)), dtype=np.float32, order="F")
+    for j, c in enumerate(columns):
+        col = out[:, j]
+        if c not in numeric:
+            col[:] = 0
+            continue
+        s = df[c]
+        col[:] = s.to_numpy(dtype=np.float32, na_value=np.nan) if s.dtype != np.float32 else s.to_numpy()
+        na = np.isnan(col)
+        if na.any():
+            col[na] = s.median() if fill == "median" else fill
+    return pd.DataFrame(out, index=df.index, columns=list(columns), copy=False)
@@ -0,0 +1,163 @@
+"""
+=============================================================
+5G ENERGY OPTIMIZATION – VECTORIZED SEASONAL FORECASTS
+-------------------------------------------------------------
+Description:
+    Cheap forecasting tier fitted to every cell at once. The
+    dl_mbps_mean series of all cells are binned to 15 minutes
+    and right-aligned into one (cells × time) matrix, so each
+    model is a handful of NumPy operations over the whole fleet
+    instead of one statsmodels / Prophet fit per cell.
+
+Responsibilities:
+    • series_matrix(ts_ns, values, offsets)
+        → (cell_ids, Y, last_ns): last `history` bins of every cell,
+          bin means, gaps forward-filled (leading gaps back-filled)
+    • seasonal_naive(Y, m, steps)   → y[T - m + h mod m]
+    • seasonal_mean(Y, m, steps)    → mean of the last `seasons` days per phase
+    • holt_winters(Y, m, steps)     → additive Holt-Winters with damped trend
+          (ETS(A,Ad,A) error-correction form); the smoothing grid is run
+          for all cells in one time loop and the best combination by
+          one-step SSE is kept per cell
+    • forecast_all(Y, m, steps)     → {model_name: (y_hat, lower, upper)}
+
+Intervals:
+    Normal intervals (z = 1.96, like the 95% statsmodels
+    conf_int of the ARIMA / SARIMA tier) from the in-sample
+    residual variance and each method's h-step variance factor.
+
+Used by:
+    • forecast_job.py → run_seasonal_tier() (`--seasonal`)
+=============================================================
+"""
+
+import numpy as np
+
+FREQ_NS = 15 * 60 * 10**9            # 15-minute bins
+SEASON = 96                          # one day of 15-minute bins
+STEPS = 4 * 24 * 7                   # 672 steps = one week
+Z = 1.96
+
+# Holt-Winters smoothing grid (alpha, beta, gamma) and trend damping.
+HW_ALPHAS = (0.1, 0.3, 0.6)
+HW_BETAS = (0.0, 0.01)
+HW_GAMMAS = (0.05, 0.2)
+HW_PHI = 0.98
+
+MODEL_NAMES = ("seasonal_naive", "seasonal_mean", "holt_winters")
+
+
+def series_matrix(ts_ns: np.ndarray, values: np.ndarray, offsets: dict,
+                  history: int = 28 * SEASON, freq_ns: int = FREQ_NS):
+    """Right-aligned (cells × history) matrix of 15-minute bin means.
+
+    `ts_ns` / `values` hold each cell's points in `offsets[cell] = (start, stop)`
+    (the shared-memory layout of forecast_job). Column history-1 is each cell's
+    own last bin, returned as `last_ns`. Cells without a single value are dropped.
+    """
+    cells = [c for c, (a, b) in offsets.items() if b > a]
+    starts = np.array([offsets[c][0] for c in cells], dtype=np.int64)
+    lengths = np.array([offsets[c][1] - offsets[c][0] for c in cells], dtype=np.int64)
+    n = len(cells)
+    if n == 0:
+        return [], np.empty((0, history)), np.empty(0, dtype=np.int64)
+
+    row = np.repeat(np.arange(n), lengths)
+    pos = np.repeat(starts - np.r_[0, np.cumsum(lengths)[:-1]], lengths) + np.arange(lengths.sum())
+    bins = ts_ns[pos] // freq_ns
+    vals = values[pos]
+    last = np.maximum.reduceat(bins, np.r_[0, np.cumsum(lengths)[:-1]])
+    col = history - 1 - (last[row] - bins)
+    keep = (col >= 0) & ~np.isnan(vals)
+    flat = row[keep] * history + col[keep]
+    sums = np.bincount(flat, weights=vals[keep], minlength=n * history).reshape(n, history)
+    cnt = np.bincount(flat, minlength=n * history).reshape(n, history)
+
+    valid = cnt > 0
+    ok = valid.any(axis=1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        Y = sums / cnt
+    idx = np.where(valid, np.arange(history), 0)
+    np.maximum.accumulate(idx, axis=1, out=idx)
+    first = valid.argmax(axis=1)
+    idx = np.maximum(idx, first[:, None])                       # leading gap → first value
+    Y = np.take_along_axis(Y, idx, axis=1)
+    return [c for c, k in zip(cells, ok) if k], Y[ok], last[ok] * freq_ns
+
+
+def _bounds(y_hat: np.ndarray, sd: np.ndarray, z: float = Z):
+    return y_hat, y_hat - z * sd, y_hat + z * sd
+
+
+def seasonal_naive(Y: np.ndarray, m: int = SEASON, steps: int = STEPS, z: float = Z):
+    """Repeat the last season; sd grows with the number of seasons ahead."""
+    T = Y.shape[1]
+    h = np.arange(steps)
+    y_hat = Y[:, T - m + h % m]
+    sigma = np.sqrt(np.mean((Y[:, m:] - Y[:, :-m]) ** 2, axis=1))
+    return _bounds(y_hat, sigma[:, None] * np.sqrt(h // m + 1), z)
+
+
+def seasonal_mean(Y: np.ndarray, m: int = SEASON, steps: int = STEPS, seasons: int = 7, z: float = Z):
+    """Per-phase mean of the last `seasons` seasons."""
+    n, T = Y.shape
+    k = max(1, min(seasons, T // m))
+    block = Y[:, T - k * m:].reshape(n, k, m)
+    mu = block.mean(axis=1)
+    resid = block - mu[:, None, :]
+    sigma = np.sqrt((resid ** 2).sum(axis=(1, 2)) / (max(k - 1, 1) * m))
+    y_hat = mu[:, np.arange(steps) % m]
+    return _bounds(y_hat, np.broadcast_to(sigma[:, None] * np.sqrt(1 + 1 / k), y_hat.shape), z)
+
+
+def holt_winters(Y: np.ndarray, m: int = SEASON, steps: int = STEPS, alphas=HW_ALPHAS,
+                 betas=HW_BETAS, gammas=HW_GAMMAS, phi: float = HW_PHI, z: float = Z):
+    """Additive damped Holt-Winters; every (alpha, beta, gamma) is run for all cells at once."""
+    n, T = Y.shape
+    if T < 2 * m:
+        raise ValueError(f"holt_winters needs at least {2 * m} columns, got {T}")
+    grid = np.array([(a, b, g) for a in alphas for b in betas for g in gammas if b <= a])
+    G = len(grid)
+    a, b, g = (grid[:, i, None] for i in range(3))                 # (G, 1)
+
+    lvl0 = Y[:, :m].mean(axis=1)
+    level = np.broadcast_to(lvl0, (G, n)).copy()
+    trend = np.broadcast_to((Y[:, m:2 * m].mean(axis=1) - lvl0) / m, (G, n)).copy()
+    season = np.broadcast_to((Y[:, :m] - lvl0[:, None]).T[:, None, :], (m, G, n)).copy()   # phase-major: contiguous slices
+    sse = np.zeros((G, n))
+    Yt = np.ascontiguousarray(Y.T)
+
+    for t in range(m, T):
+        s = season[t % m]
+        e = Yt[t] - (level + phi * trend + s)
+        sse += e * e
+        level += phi * trend + a * e
+        trend *= phi
+        trend += b * e
+        s += g * e                                                # view → updates season in place
+
+    best = sse.argmin(axis=0)
+    cols = np.arange(n)
+    level, trend = level[best, cols], trend[best, cols]
+    season = season[:, best, cols].T                              # (n, m)
+    sigma2 = sse[best, cols] / (T - m)
+
+    h = np.arange(1, steps + 1)
+    damp = np.cumsum(phi ** h)                                    # φ + … + φ^h
+    y_hat = level[:, None] + damp * trend[:, None] + season[:, (T - 1 + h) % m]
+
+    # Var_h = σ² (1 + Σ_{j<h} c_j²),  c_j = α + β(φ + … + φ^j) + γ·[j ≡ 0 mod m]
+    j = h[:-1]
+    c = grid[:, 0, None] + grid[:, 1, None] * damp[:-1] + grid[:, 2, None] * (j % m == 0)
+    factor = 1 + np.concatenate([np.zeros((G, 1)), np.cumsum(c * c, axis=1)], axis=1)
+    sd = np.sqrt(sigma2[:, None] * factor[best])
+    return _bounds(y_hat, sd, z)
+
+
+def forecast_all(Y: np.ndarray, m: int = SEASON, steps: int = STEPS) -> dict:
+    """{model_name: (y_hat, lower, upper)}, each (cells × steps)."""
+    out = {"seasonal_naive": seasonal_naive(Y, m, steps),
+           "seasonal_mean": seasonal_mean(Y, m, steps)}
+    if Y.shape[1] >= 2 * m:
+        out["holt_winters"] = holt_winters(Y, m, steps)
+    return out
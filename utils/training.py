@@ -16,12 +16,14 @@ Core Responsibilities:
         - Register best-performing classifier (e.g., rf_classifier)
 
     • Regression:
-        - Train regressors to predict future throughput/energy (dl_mbps_mean_fwd_1h)
+        - Train regressors to predict future throughput/energy (REGRESSION_TARGET,
+          default dl_mbps_mean_fwd_1h; dl_mbps_mean_fwd_15m/60m/240m also available)
         - Log predictions and performance metrics into `cell_forecast` and `model_metrics`
         - Register active model in `model_registry`
 
 Integrated Components:
     - utils.db.get_engine() → Database connection (PostgreSQL)
+    - utils.feature_store → Parquet snapshot of cell_features (FEATURE_SOURCE=db|auto|parquet)
     - utils.models.save_model() → Save trained model and feature list
     - utils.registry.register_model() → Track versions in model registry
     - utils.params.load_best_params() → Load tuned hyperparameters
@@ -41,12 +43,15 @@ from utils.models import save_model
 from sklearn.metrics import classification_report , accuracy_score, f1_score
 from sklearn.ensemble import RandomForestClassifier, RandomForestRegressor
 from sqlalchemy import text
-from utils.db import get_engine
+from utils.db import get_engine, copy_dataframe, read_query
+from utils import feature_store
+from utils.schema import FEATURE_SCHEMA, model_matrix
 from sklearn.preprocessing import LabelEncoder
 from utils.params import load_best_params 
 import re
 import json
 from jobs.feature_job import HORIZON_MINUTES 
+from utils.features import TARGET_HORIZONS, target_column
 from utils.models import save_model
 
 from utils.registry import register_model
@@ -64,6 +69,52 @@ except ImportError:
 MODEL_DIR = "models"
 os.makedirs(MODEL_DIR, exist_ok=True)
 
+# Regression target: dl_mbps_mean_fwd_1h (HORIZON_MINUTES) or any dl_mbps_mean_fwd_<h>m column.
+REGRESSION_TARGET = os.getenv("REGRESSION_TARGET", "dl_mbps_mean_fwd_1h")
+# Future values must never be model inputs, whichever one is the target.
+TARGET_COLUMNS = ["dl_mbps_mean_fwd_1h"] + [target_column(h) for h in TARGET_HORIZONS]
+# Numeric identifiers that are not model inputs (grid_key exceeds float32 precision).
+ID_COLUMNS = ["grid_key"]
+
+# "db" (default): PostgreSQL; "parquet": the Parquet feature store; "auto": the store
+# only when its recorded coverage spans every cell_features row in the requested range.
+FEATURE_SOURCE = os.getenv("FEATURE_SOURCE", "db").lower()
+
+
+def _store_covers(start=None, end=None) -> bool:
+    """True when the Parquet store mirrors cell_features completely over [start, end]."""
+    if not feature_store.available():
+        return False
+    where, params = [], {}
+    if start is not None: where.append("ts >= :start"); params["start"] = start
+    if end is not None:   where.append("ts <= :end");   params["end"] = end
+    sql = "SELECT MIN(ts), MAX(ts) FROM cell_features" + (" WHERE " + " AND ".join(where) if where else "")
+    eng = get_engine()
+    try:
+        with eng.connect() as con:
+            lo, hi = con.execute(text(sql), params).fetchone()
+    finally:
+        eng.dispose()
+    if lo is None:
+        return False
+    ok = feature_store.covers(lo, hi)
+    if not ok:
+        print(f"Feature store does not cover {lo} .. {hi}; reading cell_features.")
+    return ok
+
+
+def load_features(columns=None, start=None, end=None):
+    """Training frame ordered by ts, from the Parquet store or `cell_features`."""
+    if FEATURE_SOURCE == "parquet" or (FEATURE_SOURCE == "auto" and _store_covers(start, end)):
+        return feature_store.read_features(columns=columns, start=start, end=end)
+    cols = ", ".join(f'"{c}"' for c in columns) if columns else "*"
+    where, params = [], {}
+    if start is not None: where.append("ts >= :start"); params["start"] = start
+    if end is not None:   where.append("ts <= :end");   params["end"] = end
+    sql = f"SELECT {cols} FROM cell_features"
+    if where: sql += " WHERE " + " AND ".join(where)
+    return read_query(sql + " ORDER BY ts", params=params, schema=FEATURE_SCHEMA)
+
 
 def smape(y_true, y_pred):
     y_true = np.asarray(y_true, dtype=float)
@@ -112,35 +163,29 @@ def train_rf_classifier(X_train, X_test, y_train, y_test, model_name="rf_classif
 
 
 def get_data_for_regression(test_ratio=0.3):
-    eng = get_engine()
-    with eng.connect() as con:
-        df = pd.read_sql(text("SELECT * FROM cell_features ORDER BY ts"), con)
+    df = load_features()
 
-    if "dl_mbps_mean_fwd_1h" not in df.columns:
-        raise ValueError("'dl_mbps_mean_fwd_1h' kolonu yok. Önce feature_job çalıştırmalısın.")
+    if REGRESSION_TARGET not in df.columns:
+        raise ValueError(f"'{REGRESSION_TARGET}' kolonu yok. Önce feature_job çalıştırmalısın.")
 
-    df["dl_mbps_mean_fwd_1h"] = pd.to_numeric(df["dl_mbps_mean_fwd_1h"], errors="coerce")
+    df[REGRESSION_TARGET] = pd.to_numeric(df[REGRESSION_TARGET], errors="coerce")
     df["dl_mbps_mean"] = pd.to_numeric(df["dl_mbps_mean"], errors="coerce")
 
 
-    df = df[df["dl_mbps_mean_fwd_1h"].notna() & df["dl_mbps_mean"].notna()].copy()
+    df = df[df[REGRESSION_TARGET].notna() & df["dl_mbps_mean"].notna()].copy()
 
     if df.empty:
         raise ValueError("Regression için geçerli satır kalmadı. Hedef NaN görünüyor.")
 
-    y = df["dl_mbps_mean_fwd_1h"].astype(float)
+    y = df[REGRESSION_TARGET].astype(float)
 
     
     leakage_cols = [
-        "dl_mbps_mean_fwd_1h",
+        *TARGET_COLUMNS, *ID_COLUMNS,
         "dl_30m_mean", "dl_1h_mean", "dl_3h_mean",
         "dl_roll15m", "dl_lag1", "dl_lag3", "dl_lag6"
     ]
-    X = (
-        df.select_dtypes(include=[np.number])
-          .drop(columns=leakage_cols, errors="ignore")
-          .fillna(0)
-    )
+    X = model_matrix(df, exclude=leakage_cols)
 
     
     n = len(X)
@@ -300,8 +345,7 @@ def train_xgb_regressor(X_train, X_test, y_train, y_test, model_name="xgb_regres
 
 def train_classification():
     eng = get_engine()
-    with eng.connect() as con:
-        df = pd.read_sql(text("SELECT * FROM cell_features ORDER BY ts"), con)
+    df = load_features()
 
     if "signal_class" not in df.columns or df["signal_class"].dropna().empty:
         print("No signal_class data, skipping classification.")
@@ -310,11 +354,11 @@ def train_classification():
     y = df["signal_class"]
 
     leakage_cols = [
-        "signal_class",
+        "signal_class", *TARGET_COLUMNS, *ID_COLUMNS,
         "rsrp_mean", "rsrq_mean", "snr_mean", "cqi_mean",
         "rsrp_lag1", "rsrp_lag3", "rsrp_roll15m"
     ]
-    X = df.select_dtypes(include=[np.number]).drop(columns=leakage_cols, errors="ignore").fillna(0)
+    X = model_matrix(df, exclude=leakage_cols)
 
     X_train, X_test, y_train, y_test, split_idx = time_split(X, y)
 
@@ -329,7 +373,7 @@ def train_classification():
         out["model_name"] = "rf_classifier"
 
         out_df = out[["ts", "cell_id", "class_label", "action", "reason", "thresholds_ver", "model_name"]]
-        out_df.to_sql("cell_policy", eng, if_exists="append", index=False, method="multi", chunksize=5000)
+        copy_dataframe(out_df, "cell_policy", eng)
         print(f"Classification results written (rf_classifier): {len(out_df)} rows")
         
         
@@ -355,7 +399,7 @@ def train_classification():
                 out["model_name"] = "lgbm_classifier"
 
                 out_df = out[["ts", "cell_id", "class_label", "action", "reason", "thresholds_ver", "model_name"]]
-                out_df.to_sql("cell_policy", eng, if_exists="append", index=False, method="multi", chunksize=5000)
+                copy_dataframe(out_df, "cell_policy", eng)
                 print(f"Classification results written (lgbm_classifier): {len(out_df)} rows")
 
 
@@ -373,24 +417,23 @@ def train_classification():
             out["model_name"] = "xgb_classifier"
 
             out_df = out[["ts", "cell_id", "class_label", "action", "reason", "thresholds_ver", "model_name"]]
-            out_df.to_sql("cell_policy", eng, if_exists="append", index=False, method="multi", chunksize=5000)
+            copy_dataframe(out_df, "cell_policy", eng)
             print(f"Classification results written (xgb_classifier): {len(out_df)} rows")
 
 def train_regression(log_transform=True):
     eng = get_engine()
-    with eng.connect() as con:
-        df = pd.read_sql(text("SELECT * FROM cell_features ORDER BY ts"), con)
+    df = load_features()
 
-    if "dl_mbps_mean_fwd_1h" not in df.columns:
-        print("'dl_mbps_mean_fwd_1h' It has no column.")
+    if REGRESSION_TARGET not in df.columns:
+        print(f"'{REGRESSION_TARGET}' It has no column.")
         return
 
-    df["dl_mbps_mean_fwd_1h"] = pd.to_numeric(df["dl_mbps_mean_fwd_1h"], errors="coerce")
+    df[REGRESSION_TARGET] = pd.to_numeric(df[REGRESSION_TARGET], errors="coerce")
     df["dl_mbps_mean"] = pd.to_numeric(df["dl_mbps_mean"], errors="coerce")
 
     before = len(df)
-    # df = df[df["dl_mbps_mean_fwd_1h"].notna() & df["dl_mbps_mean"].notna()].copy()
-    df["dl_mbps_mean_fwd_1h"] = df["dl_mbps_mean_fwd_1h"].fillna(df["dl_mbps_mean"])
+    # df = df[df[REGRESSION_TARGET].notna() & df["dl_mbps_mean"].notna()].copy()
+    df[REGRESSION_TARGET] = df[REGRESSION_TARGET].fillna(df["dl_mbps_mean"])
 
     dropped = before - len(df)
     if dropped > 0:
@@ -399,16 +442,16 @@ def train_regression(log_transform=True):
         print("No more valid rows for regression.")
         return
 
-    y_raw = df["dl_mbps_mean_fwd_1h"].astype(float)
+    y_raw = df[REGRESSION_TARGET].astype(float)
     if log_transform:
         y = np.log1p(y_raw)   
     else:
         y = y_raw
     leakage_cols = [
-        "dl_mbps_mean_fwd_1h", "dl_30m_mean", "dl_1h_mean", "dl_3h_mean",
+        *TARGET_COLUMNS, *ID_COLUMNS, "dl_30m_mean", "dl_1h_mean", "dl_3h_mean",
         "dl_roll15m", "dl_lag1", "dl_lag3", "dl_lag6"
     ]
-    X = df.select_dtypes(include=[np.number]).drop(columns=leakage_cols, errors="ignore").fillna(0)
+    X = model_matrix(df, exclude=leakage_cols)
     X_train, X_test, y_train, y_test, split_idx = time_split(X, y)
     regr, y_pred, mape, smape_val = train_rf_regressor(X_train, X_test, y_train, y_test)
     if regr is not None:
@@ -445,7 +488,7 @@ def train_regression(log_transform=True):
             "confidence", "model_name", "mape",
             "horizon_minutes", "trend_label"
         ]]
-        out_df.to_sql("cell_forecast", eng, if_exists="append", index=False, method="multi", chunksize=500)
+        copy_dataframe(out_df, "cell_forecast", eng)
         print(f"Regression results written ({model_name}): {len(out_df)} rows")
 
         metrics_df = pd.DataFrame([{
@@ -455,7 +498,7 @@ def train_regression(log_transform=True):
             "smape": float(smape_val),
             "trained_at": pd.Timestamp.utcnow()
         }])
-        metrics_df.to_sql("model_metrics", eng, if_exists="append", index=False)
+        copy_dataframe(metrics_df, "model_metrics", eng)
         print(f"Metrics written ({model_name})")
 
     